@@ -36,6 +36,11 @@ void MQTTHandler::publish(const char* topic, const char* message) {
     _mqttClient.publish(topic, message);
 }
 
+// Publish binary payload to topic
+void MQTTHandler::publish(const char* topic, const uint8_t* payload, unsigned int length) {
+    _mqttClient.publish(topic, payload, length);
+}
+
 // Subscribe to topic
 void MQTTHandler::subscribe(const char* topic) {
     _mqttClient.subscribe(topic);
@@ -14,6 +14,7 @@ public:
   void loop();                                                          // Handle incoming/outgoing MQTT traffic
   bool isConnected();                                                   // Check if MQTT is connected
   void publish(const char* topic, const char* message);                 // Publish to topic
+  void publish(const char* topic, const uint8_t* payload, unsigned int length);  // Publish binary payload
   void subscribe(const char* topic);                                    // Subscribe to topic
   void setCallback(MQTT_CALLBACK_SIGNATURE);                            // Set callback for incoming messages
 
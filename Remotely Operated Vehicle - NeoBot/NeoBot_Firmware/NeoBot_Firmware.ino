@@ -30,12 +30,51 @@ DisplayManager displayManager;
 #define TOPIC_IMU_ACCEL "roboai/neobot/sensor/imu/accel"
 #define TOPIC_IMU_GYRO "roboai/neobot/sensor/imu/gyro"
 #define TOPIC_DISTANCE "roboai/neobot/sensor/distance"
+#define TOPIC_COMMAND "roboai/neobot/command"
+#define TOPIC_ACK "roboai/neobot/ack"
+
+// Binary frame with every channel in one publish (decoded by app/telemetry_frame.py)
+#define TOPIC_TELEMETRY "roboai/neobot/telemetry"
+#define TELEMETRY_FRAME_VERSION 1
+
+// Keep publishing the per-sensor text topics for older dashboards and HiveMQ debugging
+#define PUBLISH_LEGACY_TOPICS 1
+
+struct __attribute__((packed)) TelemetryFrame {
+  char magic[2];          // "NB"
+  uint8_t version;        // TELEMETRY_FRAME_VERSION
+  uint8_t flags;          // Reserved, 0
+  uint32_t seq;           // Incremented on every frame
+  uint32_t timestampMs;   // millis() when the sample was taken
+  float temperature;
+  float humidity;
+  uint16_t ldr;
+  uint16_t gas;
+  float distanceCM;
+  float accel[3];
+  float gyro[3];
+};
+
+uint32_t telemetrySeq = 0;
+TelemetryFrame lastFrame;  // Newest sample, also used for the text topics
+
+// Frames carry distance and IMU for the dashboard's driving assists and map,
+// which need several readings a second. DHT11 values are cached by the
+// library for 2 s, so a frame costs at most the 25 ms echo timeout.
+unsigned long lastFramePublishTime = 0;
+const unsigned long FRAME_PUBLISH_INTERVAL = 100;  // 10 Hz
 
 unsigned long lastSensorPublishTime = 0;
-const unsigned long SENSOR_PUBLISH_INTERVAL = 2000;  // 2 seconds
+const unsigned long SENSOR_PUBLISH_INTERVAL = 2000;  // Text topics and OLED, 2 seconds
 
 String cmd = "None";
 
+// Dead-man stop: the dashboard resends the held command every 200 ms, so
+// stop the motors if nothing arrives for this long while driving
+const unsigned long DEADMAN_TIMEOUT = 600;  // ms
+unsigned long lastCommandTime = 0;
+bool deadmanArmed = false;
+
 // Callback function to handle incoming MQTT messages
 void onMqttMessage(char* topic, byte* payload, unsigned int length) {
   Serial.print("MQTT Message received on topic: ");
@@ -47,45 +86,84 @@ void onMqttMessage(char* topic, byte* payload, unsigned int length) {
     msg += (char)payload[i];
   }
 
-  if (String(topic) == "roboai/neobot/command") {
+  if (String(topic) == TOPIC_COMMAND) {
     Serial.print("Command received: ");
     Serial.println(msg);
-    // Handle command
-    if (msg == "FWD") motor.moveForward();
-    else if (msg == "BWD") motor.moveBackward();
-    else if (msg == "LFT") motor.turnLeft();
-    else if (msg == "RHT") motor.turnRight();
-    else if (msg == "STP") motor.stop();
-
-    cmd = msg;
+
+    // "FWD#42": echo the sequence number so the dashboard can time the round trip.
+    // Plain "FWD" from older dashboards is still accepted, without ack or dead-man.
+    int sep = msg.indexOf('#');
+    String action = sep >= 0 ? msg.substring(0, sep) : msg;
+    if (sep >= 0) {
+      mqttHandler.publish(TOPIC_ACK, msg.substring(sep + 1).c_str());
+    }
+
+    // Handle command; a repeat of the current one is only a keepalive
+    if (action != cmd) {
+      if (action == "FWD") motor.moveForward();
+      else if (action == "BWD") motor.moveBackward();
+      else if (action == "LFT") motor.turnLeft();
+      else if (action == "RHT") motor.turnRight();
+      else if (action == "STP") motor.stop();
+    }
+
+    lastCommandTime = millis();
+    deadmanArmed = sep >= 0 && action != "STP";
+    cmd = action;
   }
   Serial.println();
 }
 
-void publishSensorData() {
+void publishTelemetryFrame() {
   float temperature = sensors.readTemperature();
   float humidity = sensors.readHumidity();
   int ldrValue = sensors.readLightIntensity();
   int gasValue = sensors.readAirQuality();
   float distanceCM = sensors.readDistanceCM();
 
-  mqttHandler.publish(TOPIC_TEMP, String(temperature, 2).c_str());
-  mqttHandler.publish(TOPIC_HUMIDITY, String(humidity, 2).c_str());
-  mqttHandler.publish(TOPIC_LDR, String(ldrValue).c_str());
-  mqttHandler.publish(TOPIC_GAS_AIR, String(gasValue).c_str());
-  mqttHandler.publish(TOPIC_DISTANCE, String(distanceCM, 2).c_str());
-
-
   // IMU Data
   sensors.readIMU();  // Always update latest values
 
+  // Batched binary frame
+  TelemetryFrame& frame = lastFrame;
+  frame.magic[0] = 'N';
+  frame.magic[1] = 'B';
+  frame.version = TELEMETRY_FRAME_VERSION;
+  frame.flags = 0;
+  frame.seq = telemetrySeq++;
+  frame.timestampMs = millis();
+  frame.temperature = temperature;
+  frame.humidity = humidity;
+  frame.ldr = ldrValue;
+  frame.gas = gasValue;
+  frame.distanceCM = distanceCM;
+  frame.accel[0] = sensors.getAccelX();
+  frame.accel[1] = sensors.getAccelY();
+  frame.accel[2] = sensors.getAccelZ();
+  frame.gyro[0] = sensors.getGyroX();
+  frame.gyro[1] = sensors.getGyroY();
+  frame.gyro[2] = sensors.getGyroZ();
+  mqttHandler.publish(TOPIC_TELEMETRY, (const uint8_t*)&frame, sizeof(frame));
+}
+
+void publishSensorData() {
+#if PUBLISH_LEGACY_TOPICS
+  // Values of the newest frame, at the old 2 s rate
+  const TelemetryFrame& frame = lastFrame;
+  mqttHandler.publish(TOPIC_TEMP, String(frame.temperature, 2).c_str());
+  mqttHandler.publish(TOPIC_HUMIDITY, String(frame.humidity, 2).c_str());
+  mqttHandler.publish(TOPIC_LDR, String(frame.ldr).c_str());
+  mqttHandler.publish(TOPIC_GAS_AIR, String(frame.gas).c_str());
+  mqttHandler.publish(TOPIC_DISTANCE, String(frame.distanceCM, 2).c_str());
+
   // Format accel: "x,y,z"
-  String accelData = String(sensors.getAccelX(), 2) + "," + String(sensors.getAccelY(), 2) + "," + String(sensors.getAccelZ(), 2);
+  String accelData = String(frame.accel[0], 2) + "," + String(frame.accel[1], 2) + "," + String(frame.accel[2], 2);
   // Format gyro: "x,y,z"
-  String gyroData = String(sensors.getGyroX(), 2) + "," + String(sensors.getGyroY(), 2) + "," + String(sensors.getGyroZ(), 2);
+  String gyroData = String(frame.gyro[0], 2) + "," + String(frame.gyro[1], 2) + "," + String(frame.gyro[2], 2);
 
   mqttHandler.publish(TOPIC_IMU_ACCEL, accelData.c_str());
   mqttHandler.publish(TOPIC_IMU_GYRO, gyroData.c_str());
+#endif
 }
 
 void displaySensorData() {
@@ -139,7 +217,7 @@ void setup() {
     Serial.println("MQTT connected successfully.");
 
     // Subscribe to control topic
-    mqttHandler.subscribe("roboai/neobot/command");
+    mqttHandler.subscribe(TOPIC_COMMAND);
 
     // Publish startup message
     mqttHandler.publish("roboai/neobot/log", "System started.");
@@ -164,8 +242,23 @@ void loop() {
     mqttHandler.connect();
   }
 
-  // Handle periodic sensor publishing
+  // Handle incoming MQTT messages first, so keepalives that arrived while the
+  // previous pass was busy reading sensors count before the dead-man check
+  mqttHandler.loop();
+
+  // Stop if the dashboard went quiet while driving
   unsigned long currentMillis = millis();
+  if (deadmanArmed && currentMillis - lastCommandTime > DEADMAN_TIMEOUT) {
+    motor.stop();
+    cmd = "STP";
+    deadmanArmed = false;
+  }
+
+  // Handle periodic sensor publishing
+  if (currentMillis - lastFramePublishTime >= FRAME_PUBLISH_INTERVAL) {
+    lastFramePublishTime = currentMillis;
+    publishTelemetryFrame();
+  }
   if (currentMillis - lastSensorPublishTime >= SENSOR_PUBLISH_INTERVAL) {
     lastSensorPublishTime = currentMillis;
     publishSensorData();          // Publish to MQTT or OLED
@@ -173,7 +266,4 @@ void loop() {
   }
 
   displayManager.update(wifiManager.isConnected(), mqttHandler.isConnected(), cmd);
-
-  // Handle incoming MQTT messages
-  mqttHandler.loop();
 }
@@ -2,6 +2,7 @@
 #include <DHT.h>
 
 #define DHTTYPE DHT11         // Or DHT22
+#define ECHO_TIMEOUT_US 25000  // 400 cm * 2 / 0.0343 cm/us = 23.3 ms, rounded up
 DHT dhtInstance(0, DHTTYPE);  // Dummy, will set pin in constructor
 
 SensorManager::SensorManager(int dhtPin, int mqPin, int ldrPin, int trigPin, int echoPin)
@@ -52,7 +53,9 @@ float SensorManager::readDistanceCM() {
   delayMicroseconds(10);
   digitalWrite(_trigPin, LOW);
 
-  long duration = pulseIn(_echoPin, HIGH);
+  // 25 ms covers the 4 m range there and back; without an echo pulseIn would
+  // otherwise block the loop for its default 1 s. Timeout returns 0 (no echo).
+  long duration = pulseIn(_echoPin, HIGH, ECHO_TIMEOUT_US);
   return duration * 0.0343 / 2;
 }
 
@@ -0,0 +1,95 @@
+# benchmarks/bench_camera_frames.py
+#
+# Camera frame path: the old per-frame resize -> cvtColor -> QImage.copy ->
+# QPixmap chain against the pooled path (resize into a preallocated
+# BGR888 buffer, QImage wrapping it, painted directly). Also checks that the
+# pooled path allocates nothing in steady state: NumPy allocations through
+# tracemalloc and the set of distinct pixel buffers the frames live in.
+#
+#   python benchmarks/bench_camera_frames.py [--json results.json]
+
+import os
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+
+from harness import bench, parse_args, save_results
+
+from PyQt5.QtGui import QImage, QPainter, QPixmap
+from PyQt5.QtWidgets import QApplication
+
+from camera_capture import FramePool, LatestFrameSlot, convert_frame
+
+SOURCE = (640, 480)
+TARGET = (310, 220)
+FRAMES = 2000
+
+
+def numpy_bytes_per_frame(step, n=FRAMES):
+    """Bytes still allocated by NumPy/OpenCV arrays per call, after n calls"""
+    step()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    peak_before = tracemalloc.get_traced_memory()[1]
+    for _ in range(n):
+        step()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (current - before) / n, peak - peak_before
+
+
+def main():
+    args = parse_args("Camera frame pipeline benchmark")
+    app = QApplication([])
+    frame = np.random.default_rng(0).integers(0, 255, size=(SOURCE[1], SOURCE[0], 3), dtype=np.uint8)
+    target = QImage(TARGET[0], TARGET[1], QImage.Format_RGB32)  # Stands in for the widget surface
+
+    # --- Old path: three allocations plus a pixmap per frame
+    def legacy():
+        pixmap = QPixmap.fromImage(convert_frame(frame, TARGET))
+        painter = QPainter(target)
+        painter.drawPixmap(0, 0, pixmap)
+        painter.end()
+
+    # --- Pooled path: capture thread converts into a free buffer, GUI paints it and releases the previous one
+    pool = FramePool(TARGET)
+    slot = LatestFrameSlot()
+    shown = [None]
+    buffers_seen = set()
+
+    def pooled():
+        buf = pool.acquire()
+        pool.convert(frame, buf)
+        _, replaced = slot.put(buf)
+        if replaced is not None:
+            replaced.release()
+        current = slot.take()
+        if shown[0] is not None:
+            shown[0].release()
+        shown[0] = current
+        buffers_seen.add(current.array.ctypes.data)
+        painter = QPainter(target)
+        painter.drawImage(target.rect(), current.image)
+        painter.end()
+
+    results = [
+        bench("legacy: resize + cvtColor + copy + QPixmap", legacy, number=FRAMES),
+        bench("pooled: resize into buffer + drawImage", pooled, number=FRAMES),
+    ]
+
+    for name, step in [("legacy", legacy), ("pooled", pooled)]:
+        per_frame, peak = numpy_bytes_per_frame(step)
+        print(f"{name + ' numpy bytes retained / peak growth':<48} {per_frame:>12.1f} / {peak}")
+        results.append({"name": f"{name} numpy allocation", "bytes_per_frame": per_frame, "peak_growth": peak})
+
+    # Every pooled frame lived in one of the pool's buffers
+    print(f"{'pooled distinct pixel buffers':<48} {len(buffers_seen):>12}")
+    results.append({"name": "pooled distinct pixel buffers", "buffers": len(buffers_seen)})
+    save_results(args.json, "camera_frames", results)
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# benchmarks/bench_control_loop.py
+#
+# The assisted driving loop: what one tick and one sensor update cost, tick
+# jitter and overruns at 50-200 Hz with an idle process and with a "GUI"
+# thread busy in pure Python (holding the GIL), and two closed-loop runs
+# against a simulated robot fed through SensorFeed like the network thread
+# does. In the first, the operator holds FWD towards a wall and we check
+# where the robot stops, with the firmware's 10 Hz frames and with readings
+# only every 2 s (the text topics alone), where the assist must report that
+# it cannot act. In the second, the robot drifts while driving straight and
+# we compare the heading error with and without heading hold.
+#
+#   python benchmarks/bench_control_loop.py [--json results.json]
+
+import math
+import threading
+import time
+
+from harness import bench, parse_args, save_results
+
+from control_loop import ControlLoop, HeadingHold, SensorFeed, StopBeforeObstacle
+from telemetry import TOPIC_TELEMETRY
+from telemetry_frame import encode_frame
+
+RATES = [50, 100, 200]
+DURATION = 5.0
+SENSOR_HZ = 10  # Firmware telemetry frames
+LINK_DELAY = 0.03  # s each way, dashboard <-> robot
+SPEED_CM_S = 40.0
+TURN_RATE = 1.2
+
+
+def frame(seq, distance, gz):
+    return encode_frame(seq, seq * 20, 21.5, 40.0, 512, 180, distance, (0.0, 0.0, 9.81), (0.0, 0.0, gz))
+
+
+def bench_costs():
+    feed = SensorFeed()
+    payload = frame(1, 120.0, 0.01)
+    feed.on_message(TOPIC_TELEMETRY, payload, time.time())
+    loop = ControlLoop(feed, lambda command: None, [StopBeforeObstacle(), HeadingHold()])
+    loop.stop()
+    loop.operator = "FWD"
+    return [
+        bench("SensorFeed.on_message (binary frame)", lambda: feed.on_message(TOPIC_TELEMETRY, payload, time.time()),
+              number=20000),
+        bench("ControlLoop tick (2 behaviours)", loop._evaluate, number=20000),
+    ]
+
+
+def busy_gui(stop):
+    """Pure-Python work, as a busy GUI thread would do between events"""
+    while not stop.is_set():
+        sum(i * i for i in range(20000))
+
+
+def run_timing(rate_hz, busy):
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_gui, args=(stop,), daemon=True) if busy else None
+    if worker:
+        worker.start()
+    loop = ControlLoop(SensorFeed(), lambda command: None, [StopBeforeObstacle(), HeadingHold()], rate_hz=rate_hz)
+    loop.jitter.reset()
+    loop.tick_time.reset()
+    time.sleep(DURATION)
+    loop.stop()
+    stop.set()
+    if worker:
+        worker.join()
+    stats = loop.stats()
+    result = {
+        "name": f"loop {rate_hz} Hz, {'busy GUI thread' if busy else 'idle'}",
+        "rate_hz": rate_hz,
+        "ticks_per_s": stats["ticks"] / DURATION,
+        "jitter_ms_p50": stats["jitter"]["p50_ms"],
+        "jitter_ms_p99": stats["jitter"]["p99_ms"],
+        "jitter_ms_max": stats["max_jitter_ms"],
+        "overruns": stats["overruns"],
+        "missed": stats["missed"],
+    }
+    print(f"{result['name']:<36} {result['ticks_per_s']:6.1f} ticks/s  jitter p50 {result['jitter_ms_p50']:5.2f} "
+          f"p99 {result['jitter_ms_p99']:5.2f} max {result['jitter_ms_max']:5.2f} ms  "
+          f"overruns {result['overruns']} missed {result['missed']}")
+    return result
+
+
+class SimRobot:
+    """Robot in a corridor with a wall ahead: commands arrive after LINK_DELAY, readings leave every 1/SENSOR_HZ"""
+
+    def __init__(self, feed, wall_cm=200.0, drift=0.0, sensor_hz=SENSOR_HZ):
+        self.feed = feed
+        self.sensor_hz = sensor_hz
+        self.wall_cm = wall_cm
+        self.drift = drift  # rad/s while driving, e.g. one motor weaker
+        self.x = 0.0
+        self.heading = 0.0
+        self.command = "STP"
+        self.inbox = []  # (deliver at, command)
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def send(self, command):
+        """ControlLoop output: what TeleopChannel would publish"""
+        with self.lock:
+            self.sent.append(command)
+            self.inbox.append((time.time() + LINK_DELAY, command))
+
+    def run(self, seconds, step_hz=50):
+        """Moves the robot at step_hz, publishes readings at sensor_hz"""
+        dt = 1.0 / step_hz
+        every = max(1, round(step_hz / self.sensor_hz))
+        outbox = []
+        start = time.time()
+        next_step = start
+        seq = 0
+        while next_step - start < seconds:
+            time.sleep(max(0.0, next_step - time.time()))
+            now = time.time()
+            with self.lock:
+                while self.inbox and self.inbox[0][0] <= now:
+                    self.command = self.inbox.pop(0)[1]
+            gz = {"LFT": TURN_RATE, "RHT": -TURN_RATE}.get(self.command, 0.0)
+            if self.command in ("FWD", "BWD"):
+                gz += self.drift
+                sign = 1 if self.command == "FWD" else -1
+                self.x += sign * SPEED_CM_S * dt * math.cos(self.heading)
+            self.heading += gz * dt
+            seq += 1
+            if seq % every == 0:
+                distance = max(0.0, (self.wall_cm - self.x) / max(math.cos(self.heading), 0.1))
+                outbox.append((now + LINK_DELAY, frame(seq, distance, gz)))
+            while outbox and outbox[0][0] <= now:
+                self.feed.on_message(TOPIC_TELEMETRY, outbox.pop(0)[1], now)
+            next_step += dt
+
+
+def run_stop(sensor_hz):
+    feed = SensorFeed()
+    robot = SimRobot(feed, wall_cm=220.0, sensor_hz=sensor_hz)
+    behaviour = StopBeforeObstacle()
+    loop = ControlLoop(feed, robot.send, [behaviour], rate_hz=50)
+    loop.set_operator("FWD")  # Held for the whole run
+    robot.run(7.0)
+    loop.stop()
+    stale = sum(1 for event in loop.take_events() if event.detail == "stale")
+    result = {
+        "name": f"stop-before-obstacle, FWD held at a wall 220 cm away, readings at {sensor_hz:g} Hz",
+        "sensor_hz": sensor_hz,
+        "stop_cm": behaviour.stop_cm,
+        "final_gap_cm": robot.wall_cm - robot.x,
+        "commands_sent": len(robot.sent),
+        "sequence": robot.sent,
+        "stale_reports": stale,
+    }
+    print(f"{result['name']:<72} {result['final_gap_cm']:6.1f} cm from the wall at the end "
+          f"(target {behaviour.stop_cm:.0f} cm), commands {' '.join(robot.sent)}, stale reported {stale}x")
+    return result
+
+
+def run_heading(hold):
+    feed = SensorFeed()
+    robot = SimRobot(feed, wall_cm=10000.0, drift=0.15)
+    loop = ControlLoop(feed, robot.send, [HeadingHold()] if hold else [], rate_hz=50)
+    loop.set_operator("FWD")
+    robot.run(5.0)
+    loop.stop()
+    result = {
+        "name": f"heading drift 0.15 rad/s for 5 s, {'heading hold' if hold else 'no assist'}",
+        "heading_error_deg": math.degrees(robot.heading),
+        "commands_sent": len(robot.sent),
+        "overrides": loop.overrides.get("heading-hold", 0),
+    }
+    print(f"{result['name']:<72} heading error {result['heading_error_deg']:+6.1f} deg  "
+          f"commands {result['commands_sent']}  corrections {result['overrides']}")
+    return result
+
+
+def main():
+    args = parse_args("Assisted driving control loop benchmark")
+    results = bench_costs()
+    results += [run_timing(rate, busy) for busy in (False, True) for rate in RATES]
+    results += [run_stop(SENSOR_HZ), run_stop(0.5), run_heading(False), run_heading(True)]
+    save_results(args.json, "control_loop", results)
+
+
+if __name__ == "__main__":
+    main()
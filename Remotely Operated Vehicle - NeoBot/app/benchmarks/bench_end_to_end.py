@@ -0,0 +1,105 @@
+# benchmarks/bench_end_to_end.py
+#
+# Firmware simulator -> local MQTT broker -> dashboard, all on this machine.
+# Runs the real RobotControlUI offscreen at increasing publish rates and
+# reports publish-to-apply latency percentiles, applied message throughput
+# and ingest queue drops. Frames carry wall-clock milliseconds so latency is
+# measured against the simulator's send time.
+#
+#   python benchmarks/bench_end_to_end.py [--json results.json]
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+
+from harness import parse_args, save_results
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+
+from main import RobotControlUI
+from telemetry import TOPIC_TELEMETRY
+from tools.firmware_sim import FirmwareSimulator
+from tools.local_broker import LocalBroker
+
+RATES_HZ = [10, 100, 1000]
+DURATION = 5.0
+SETTLE = 1.0  # Let connections and subscriptions finish before measuring
+
+
+def run_rate(app, broker, rate_hz, duration=DURATION):
+    window = RobotControlUI(broker_ip=broker.host, port=broker.port)
+    latencies = []
+    applied = [0]
+    apply_message = window.apply_message
+
+    def timed_apply(message):
+        apply_message(message)
+        applied[0] += 1
+        if message.topic == TOPIC_TELEMETRY and message.value is not None:
+            now_ms = int(time.time() * 1000) & 0xFFFFFFFF
+            latencies.append(((now_ms - message.value.timestamp_ms) & 0xFFFFFFFF))
+
+    window.apply_message = timed_apply
+
+    # Let the dashboard connect before the simulator starts publishing
+    QTimer.singleShot(int(SETTLE * 1000), app.quit)
+    app.exec_()
+
+    sim = FirmwareSimulator(broker.host, broker.port, rate_hz=rate_hz, payload="both", epoch_timestamps=True)
+    time.sleep(SETTLE)
+    start = time.perf_counter()
+    sim.start(duration)
+    QTimer.singleShot(int((duration + SETTLE) * 1000), app.quit)
+    app.exec_()
+    elapsed = time.perf_counter() - start
+    sim.stop()
+
+    stats = window.mqtt_client.stats()
+    window.mqtt_client.stop()
+    window.close()
+    window.deleteLater()
+
+    lat = np.array(latencies, dtype=np.float64)
+    result = {
+        "name": f"end_to_end_{rate_hz}hz",
+        "rate_hz": rate_hz,
+        "published": sim.published,
+        "applied": applied[0],
+        "applied_per_sec": applied[0] / elapsed,
+        "late_ticks": sim.late_ticks,
+        "frames": len(lat),
+        "latency_ms_p50": float(np.percentile(lat, 50)) if len(lat) else None,
+        "latency_ms_p95": float(np.percentile(lat, 95)) if len(lat) else None,
+        "latency_ms_p99": float(np.percentile(lat, 99)) if len(lat) else None,
+        "latency_ms_max": float(lat.max()) if len(lat) else None,
+        "ingest": stats,
+    }
+    p = [result[f"latency_ms_{k}"] for k in ("p50", "p95", "p99")]
+    p = "  ".join("-" if v is None else f"{v:7.1f}" for v in p)
+    print(f"{rate_hz:>6} Hz  {sim.published:>8} sent  {applied[0]:>8} applied  "
+          f"p50/p95/p99 {p} ms  dropped {stats['dropped']}  coalesced {stats['coalesced']}")
+    return result
+
+
+def main():
+    args = parse_args("End-to-end simulator -> broker -> dashboard benchmark")
+    app = QApplication(sys.argv[:1])
+    broker = LocalBroker("127.0.0.1", 0).start_in_thread()
+    print(f"Local broker on {broker.host}:{broker.port}")
+
+    results = []
+    try:
+        for rate_hz in RATES_HZ:
+            results.append(run_rate(app, broker, rate_hz))
+    finally:
+        broker.stop()
+    save_results(args.json, "end_to_end", results)
+
+
+if __name__ == "__main__":
+    main()
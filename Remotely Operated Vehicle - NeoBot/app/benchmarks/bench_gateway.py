@@ -0,0 +1,203 @@
+# benchmarks/bench_gateway.py
+#
+# Load test for gateway.py: firmware simulator -> local broker -> gateway
+# (its own process) -> hundreds of WebSocket viewers, a few SSE viewers and
+# a few stalled viewers that never read. Reports, per viewer count, the
+# delta rate every healthy viewer received, tick-to-viewer latency, gateway
+# CPU use and how the stalled viewers were handled (resynced, then dropped)
+# while no healthy viewer was.
+#
+#   python benchmarks/bench_gateway.py [--json results.json]
+
+import asyncio
+import base64
+import json
+import os
+import re
+import socket
+import struct
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from harness import APP_DIR, parse_args, save_results
+
+from tools.firmware_sim import FirmwareSimulator
+from tools.local_broker import LocalBroker
+
+VIEWERS = [50, 200, 500]  # WebSocket viewers per run
+SSE_VIEWERS = 20
+STALLED_VIEWERS = 5
+ROBOTS = 4
+ROBOT_RATE_HZ = 50
+GATEWAY_RATE_HZ = 10
+DURATION = 10.0
+SETTLE = 2.0
+LATENCY_EVERY = 10  # Every 10th viewer decodes JSON to time deltas, the rest only count frames
+
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class Viewer:
+    def __init__(self, timed):
+        self.timed = timed
+        self.deltas = 0
+        self.snapshots = 0
+        self.closed = False
+        self.latencies = []
+
+    def on_payload(self, payload):
+        if payload.startswith(b'{"type":"delta"'):
+            self.deltas += 1
+            if self.timed:
+                self.latencies.append(time.time() - json.loads(payload)["t"])
+        elif payload.startswith(b'{"type":"snapshot"'):
+            self.snapshots += 1
+
+
+async def open_viewer(port, path, rcvbuf=None):
+    sock = socket.socket()
+    if rcvbuf:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", port))
+    reader, writer = await asyncio.open_connection(sock=sock)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                 f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode())
+    await reader.readuntil(b"\r\n\r\n")
+    return reader, writer
+
+
+async def ws_viewer(port, viewer, stop):
+    reader, writer = await open_viewer(port, "/ws")
+    try:
+        while not stop.is_set():
+            head = await reader.readexactly(2)
+            length = head[1] & 0x7F
+            if length == 126:
+                length, = struct.unpack("!H", await reader.readexactly(2))
+            elif length == 127:
+                length, = struct.unpack("!Q", await reader.readexactly(8))
+            viewer.on_payload(await reader.readexactly(length))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        viewer.closed = True
+    writer.close()
+
+
+async def sse_viewer(port, viewer, stop):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /events HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n")
+    await reader.readuntil(b"\r\n\r\n")
+    try:
+        while not stop.is_set():
+            line = await reader.readline()
+            if not line:
+                viewer.closed = True
+                break
+            if line.startswith(b"data: "):
+                viewer.on_payload(line[6:])
+    except ConnectionError:
+        viewer.closed = True
+    writer.close()
+
+
+async def stalled_viewer(port, stop):
+    """Upgrades, then never reads another byte"""
+    _, writer = await open_viewer(port, "/ws", rcvbuf=4096)
+    await stop.wait()
+    writer.transport.abort()
+
+
+async def http_get_json(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+async def load(port, pid, n_ws):
+    stop = asyncio.Event()
+    ws = [Viewer(i % LATENCY_EVERY == 0) for i in range(n_ws)]
+    sse = [Viewer(True) for _ in range(SSE_VIEWERS)]
+    tasks = [asyncio.create_task(ws_viewer(port, v, stop)) for v in ws]
+    tasks += [asyncio.create_task(sse_viewer(port, v, stop)) for v in sse]
+    tasks += [asyncio.create_task(stalled_viewer(port, stop)) for _ in range(STALLED_VIEWERS)]
+    await asyncio.sleep(SETTLE)
+
+    for viewer in ws + sse:
+        viewer.deltas = 0
+        viewer.latencies.clear()
+    cpu0, t0 = cpu_seconds(pid), time.monotonic()
+    await asyncio.sleep(DURATION)
+    cpu = (cpu_seconds(pid) - cpu0) / (time.monotonic() - t0)
+    stats = await http_get_json(port, "/stats")
+
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    healthy = ws + sse
+    rates = np.array([v.deltas / DURATION for v in healthy])
+    lat = np.array([x for v in healthy for x in v.latencies]) * 1000
+    return {
+        "name": f"gateway {n_ws} ws + {SSE_VIEWERS} sse + {STALLED_VIEWERS} stalled",
+        "ws_viewers": n_ws,
+        "expected_deltas_per_s": ROBOTS * GATEWAY_RATE_HZ,
+        "deltas_per_s_min": float(rates.min()),
+        "deltas_per_s_mean": float(rates.mean()),
+        "latency_ms_p50": float(np.percentile(lat, 50)),
+        "latency_ms_p95": float(np.percentile(lat, 95)),
+        "latency_ms_p99": float(np.percentile(lat, 99)),
+        "gateway_cpu_percent": cpu * 100,
+        "healthy_closed": sum(v.closed for v in healthy),
+        "healthy_resynced": sum(v.snapshots > 1 for v in healthy),
+        "gateway_resyncs": stats["resyncs"],
+        "gateway_dropped": stats["dropped"],
+        "tick_p99_ms": stats["tick"]["p99_ms"],
+        "mqtt_received": stats["mqtt_received"],
+    }
+
+
+def run_gateway(broker, n_ws):
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(APP_DIR, "gateway.py"), "--broker", broker.host, "--port", str(broker.port),
+         "--http-port", "0", "--rate", str(GATEWAY_RATE_HZ)],
+        cwd=APP_DIR, stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        port = int(re.search(r":(\d+) ", proc.stdout.readline()).group(1))
+        result = asyncio.run(load(port, proc.pid, n_ws))
+    finally:
+        proc.terminate()
+        proc.wait()
+    print(f"{result['name']:<36} deltas/s min {result['deltas_per_s_min']:5.1f} "
+          f"(expected {result['expected_deltas_per_s']})  latency p50 {result['latency_ms_p50']:6.1f} ms "
+          f"p99 {result['latency_ms_p99']:6.1f} ms  gateway CPU {result['gateway_cpu_percent']:5.1f} %  "
+          f"tick p99 {result['tick_p99_ms']:5.1f} ms  healthy closed/resynced "
+          f"{result['healthy_closed']}/{result['healthy_resynced']}  stalled resyncs {result['gateway_resyncs']} "
+          f"dropped {result['gateway_dropped']}")
+    return result
+
+
+def main():
+    args = parse_args("Telemetry gateway fan-out load test")
+    broker = LocalBroker("127.0.0.1", 0).start_in_thread()
+    sim = FirmwareSimulator(broker.host, broker.port, robots=ROBOTS, rate_hz=ROBOT_RATE_HZ, payload="binary")
+    sim.start()
+    results = [run_gateway(broker, n_ws) for n_ws in VIEWERS]
+    sim.stop()
+    broker.stop()
+    save_results(args.json, "gateway", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# benchmarks/bench_occupancy_map.py
+#
+# Occupancy mapping on a simulated drive: a 6 x 4 m room with a box in it,
+# 50 Hz binary frames whose distance is ray traced from the true pose, gyro
+# with noise and the drive commands the dashboard would have sent. Reports
+# ray casting throughput, how many times faster than real time a recording
+# is mapped (tools/build_map.py path, .ntr on disk), how far occupied cells
+# land from the true walls (also with readings only every 2 s, from motors
+# turning slower than the nominal rate), sparse tile memory against one
+# dense array for a long L-shaped drive, and what the map panel spends per
+# refresh when only dirty tiles are re-rendered versus a full reload.
+#
+#   python benchmarks/bench_occupancy_map.py [--json results.json]
+
+import math
+import os
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+
+from harness import bench, parse_args, save_results
+
+from mqtt_ingest import parse_message
+from occupancy_map import (
+    CELL_CM, DRIVE_SPEED_CM_S, TURN_RATE, OccupancyMapper, TiledGrid, cast_rays
+)
+from telemetry import TOPIC_COMMAND, TOPIC_TELEMETRY, robot_topic
+from telemetry_frame import encode_frame
+from telemetry_recorder import RecordingReader, TelemetryRecorder
+from tools.build_map import build_map
+
+RATE_HZ = 50
+KEEPALIVE = 0.2  # s, like teleop.py
+ROOM = (-150.0, -200.0, 450.0, 200.0)  # x0, y0, x1, y1 in cm, the robot starts at the origin facing +x
+BOX = (200.0, 60.0, 240.0, 100.0)
+QUARTER = math.pi / 2 / TURN_RATE
+# One look around, then laps of a 120 x 80 cm rectangle
+SCRIPT = [("LFT", 2 * math.pi / TURN_RATE)] + [("FWD", 3.0), ("LFT", QUARTER), ("FWD", 2.0), ("LFT", QUARTER),
+                                               ("FWD", 3.0), ("LFT", QUARTER), ("FWD", 2.0), ("LFT", QUARTER)] * 4
+
+
+def trace(x, y, heading):
+    """Distance from (x, y) along heading to the first room wall or box face"""
+    dx, dy = math.cos(heading), math.sin(heading)
+    best = math.inf
+    x0, y0, x1, y1 = ROOM
+    for wall, origin, d in ((x0, x, dx), (x1, x, dx), (y0, y, dy), (y1, y, dy)):
+        if d and (wall - origin) / d > 0:
+            best = min(best, (wall - origin) / d)
+    # Slab test for the box
+    bx0, by0, bx1, by1 = BOX
+    t_near, t_far = -math.inf, math.inf
+    for lo, hi, origin, d in ((bx0, bx1, x, dx), (by0, by1, y, dy)):
+        if abs(d) < 1e-12:
+            if not lo <= origin <= hi:
+                return best
+            continue
+        a, b = (lo - origin) / d, (hi - origin) / d
+        t_near, t_far = max(t_near, min(a, b)), min(t_far, max(a, b))
+    if t_near <= t_far and t_near > 0:
+        best = min(best, t_near)
+    return best
+
+
+def simulate(script, robot="neobot", start=1_700_000_000.0, seed=0, distance=trace, frame_hz=RATE_HZ,
+             turn_rate=TURN_RATE):
+    """[(t, topic, payload)] as main.py --record would have stored them, and the true final pose"""
+    every = max(1, round(RATE_HZ / frame_hz))
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / RATE_HZ
+    x = y = heading = 0.0
+    t = start
+    seq = 0
+    records = []
+    frame_topic = robot_topic(TOPIC_TELEMETRY, robot)
+    command_topic = robot_topic(TOPIC_COMMAND, robot)
+    commands = 0
+    for action, seconds in script:
+        next_command = t
+        steps = int(round(seconds * RATE_HZ))
+        for _ in range(steps):
+            if t >= next_command:
+                commands += 1
+                records.append((t, command_topic, f"{action}#{commands}"))
+                next_command += KEEPALIVE
+            t += dt
+            gz = turn_rate if action == "LFT" else -turn_rate if action == "RHT" else 0.0
+            heading += gz * dt
+            speed = DRIVE_SPEED_CM_S if action == "FWD" else -DRIVE_SPEED_CM_S if action == "BWD" else 0.0
+            x += speed * dt * math.cos(heading)
+            y += speed * dt * math.sin(heading)
+            seq += 1
+            if seq % every:
+                continue
+            reading = distance(x, y, heading) + rng.normal(0, 1.0)
+            gyro = (0.0, 0.0, gz + rng.normal(0, 0.02))
+            records.append((t, frame_topic, encode_frame(seq, seq * 20, 21.5, 40.0, 512, 180, reading,
+                                                         (0.0, 0.0, 9.81), gyro)))
+        commands += 1
+        records.append((t, command_topic, f"STP#{commands}"))
+    return records, (x, y, heading)
+
+
+def wall_error(grid):
+    """Distance (cm) from each occupied cell centre to the nearest true wall or box face"""
+    log_odds, cx0, cy0 = grid.to_array()
+    rows, cols = np.nonzero(log_odds > 1.0)
+    px = (cols + cx0 + 0.5) * CELL_CM
+    py = (rows + cy0 + 0.5) * CELL_CM
+    x0, y0, x1, y1 = ROOM
+    room = np.min([np.abs(px - x0), np.abs(px - x1), np.abs(py - y0), np.abs(py - y1)], axis=0)
+    bx0, by0, bx1, by1 = BOX
+    outside = np.hypot(np.maximum(np.maximum(bx0 - px, px - bx1), 0), np.maximum(np.maximum(by0 - py, py - by1), 0))
+    inside = np.minimum(np.minimum(px - bx0, bx1 - px), np.minimum(py - by0, by1 - py))
+    box = np.where(outside > 0, outside, np.abs(inside))
+    return np.minimum(room, box)
+
+
+def bench_cast():
+    rng = np.random.default_rng(1)
+    results = []
+    for rays in (64, 1024):
+        x = rng.uniform(-100, 100, rays)
+        y = rng.uniform(-100, 100, rays)
+        heading = rng.uniform(-math.pi, math.pi, rays)
+        ranges = rng.uniform(20, 250, rays)
+        grid = TiledGrid()
+        results.append(bench(f"cast_rays + grid update ({rays} rays)",
+                             lambda: grid.update(*cast_rays(x, y, heading, ranges)), number=200, items=rays))
+    mapper = OccupancyMapper()
+    records, _ = simulate(SCRIPT[:3])
+    frames = [parse_message(topic, payload, t) for t, topic, payload in records]
+    i = [0]
+
+    def one_message():
+        mapper.process((frames[i[0] % len(frames)],))
+        i[0] += 1
+
+    results.append(bench("OccupancyMapper.process (1 message)", one_message, number=5000))
+    return results
+
+
+def run_replay(frame_hz=RATE_HZ, turn_rate=TURN_RATE):
+    records, truth = simulate(SCRIPT, frame_hz=frame_hz, turn_rate=turn_rate)
+    duration = records[-1][0] - records[0][0]
+    fd, path = tempfile.mkstemp(suffix=".ntr")
+    os.close(fd)
+    try:
+        recorder = TelemetryRecorder(path)
+        for t, topic, payload in records:
+            recorder.record(topic, payload, t)
+        recorder.close()
+        reader = RecordingReader(path)
+        start = time.perf_counter()
+        mapper = build_map(reader)
+        elapsed = time.perf_counter() - start
+        reader.close()
+    finally:
+        os.remove(path)
+
+    robot_map = mapper.maps["neobot"]
+    pose = robot_map.pose
+    errors = wall_error(robot_map.grid)
+    result = {
+        "name": f"replay {duration:.0f} s drive, {frame_hz:g} Hz frames, turning at {turn_rate:g} rad/s",
+        "records": len(records),
+        "rays": mapper.rays,
+        "seconds": elapsed,
+        "realtime_factor": duration / elapsed,
+        "pose_error_cm": math.hypot(pose.x - truth[0], pose.y - truth[1]),
+        "heading_error_deg": math.degrees(abs(math.remainder(pose.heading - truth[2], 2 * math.pi))),
+        "occupied_cells": len(errors),
+        "wall_error_cm_p50": float(np.percentile(errors, 50)),
+        "wall_error_cm_p95": float(np.percentile(errors, 95)),
+    }
+    print(f"{result['name']:<60} {elapsed:6.2f} s = {result['realtime_factor']:5.0f}x real time  "
+          f"pose error {result['pose_error_cm']:5.1f} cm {result['heading_error_deg']:4.1f} deg  "
+          f"{len(errors)} occupied cells, wall error p50 {result['wall_error_cm_p50']:4.1f} "
+          f"p95 {result['wall_error_cm_p95']:4.1f} cm")
+    return result
+
+
+def run_memory():
+    """Long L-shaped drive with something always 150 cm ahead: tiles follow the path, a dense grid the bounds"""
+    leg = 60.0
+    records, _ = simulate([("FWD", leg), ("LFT", QUARTER), ("FWD", leg)], distance=lambda x, y, h: 150.0)
+    mapper = OccupancyMapper()
+    mapper.process([parse_message(topic, payload, t) for t, topic, payload in records])
+    mapper.flush()
+    stats = mapper.stats()["neobot"]
+    result = {
+        "name": f"memory, L-shaped drive 2 x {leg * DRIVE_SPEED_CM_S / 100:.0f} m",
+        "tiles": stats["tiles"],
+        "sparse_kib": stats["bytes"] / 1024,
+        "dense_kib": stats["dense_bytes"] / 1024,
+    }
+    print(f"{result['name']:<48} {stats['tiles']} tiles {result['sparse_kib']:7.0f} KiB  "
+          f"dense {result['dense_kib']:7.0f} KiB ({result['dense_kib'] / result['sparse_kib']:.1f}x)")
+    return result
+
+
+def bench_panel():
+    """Map panel over a 32 x 32 m explored area, the robot at its centre"""
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtGui import QImage
+    from panels.map_panel import MapPanel, tile_image
+
+    rng = np.random.default_rng(2)
+    mapper = OccupancyMapper()
+    grid = mapper.get("neobot").grid
+    rays = 20000
+    grid.update(*cast_rays(rng.uniform(-1600, 1600, rays), rng.uniform(-1600, 1600, rays),
+                           rng.uniform(-math.pi, math.pi, rays), rng.uniform(20, 250, rays)))
+
+    app = QApplication.instance() or QApplication([])
+    panel = MapPanel(mapper, "neobot")
+    panel.timer.stop()
+    panel.show()
+    app.processEvents()
+    canvas = QImage(panel.size(), QImage.Format_RGB32)
+    tile = grid.tiles[0, 0]
+
+    def dirty_refresh():
+        grid.dirty.add((0, 0))  # What a refresh interval of readings around the robot touches
+        grid.dirty.add((-1, 0))
+        panel.refresh()
+
+    def full_reload():
+        panel.reload = True
+        panel.refresh()
+
+    results = [
+        bench("tile_image (64x64 log-odds -> QImage)", lambda: tile_image(tile), number=2000),
+        bench("MapPanel.refresh (2 dirty tiles)", dirty_refresh, number=500),
+        bench(f"MapPanel.refresh (reload, {len(grid.tiles)} tiles)", full_reload, number=50),
+        bench("MapPanel paint", lambda: panel.render(canvas), number=500),
+    ]
+    panel.close()
+    return results
+
+
+def main():
+    args = parse_args("Occupancy grid mapping benchmark")
+    results = bench_cast()
+    results += [run_replay(), run_replay(0.5, 1.0), run_memory()]
+    results += bench_panel()
+    save_results(args.json, "occupancy_map", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# benchmarks/bench_orientation.py
+#
+# Samples per second of the orientation filter, stepped live one sample at a
+# time and replayed over a recorded log in one vectorized call.
+#
+#   python benchmarks/bench_orientation.py [--json results.json]
+
+import numpy as np
+
+from harness import bench, parse_args, save_results
+
+from orientation import ComplementaryFilter
+
+SAMPLES = 100000
+
+
+def synthetic_log(n, rate_hz=100.0, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / rate_hz
+    accel = rng.normal([0.0, 0.0, 9.81], 0.3, size=(n, 3))
+    gyro = rng.normal(0.0, 0.05, size=(n, 3))
+    return accel, gyro, t
+
+
+def main():
+    args = parse_args("Orientation filter benchmark")
+    accel, gyro, t = synthetic_log(SAMPLES)
+    accel_list, gyro_list, t_list = accel.tolist(), gyro.tolist(), t.tolist()
+
+    def live_steps():
+        f = ComplementaryFilter()
+        for i in range(SAMPLES):
+            f.update(accel_list[i], gyro_list[i], t_list[i])
+
+    def vectorized_replay():
+        ComplementaryFilter().replay(accel, gyro, t)
+
+    results = [
+        bench(f"live update(), {SAMPLES} samples", live_steps, number=1, repeat=3, items=SAMPLES),
+        bench(f"replay(), {SAMPLES} samples", vectorized_replay, number=5, repeat=3, items=SAMPLES),
+    ]
+    save_results(args.json, "orientation", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/bench_reconnect.py
+#
+# Broker outages against the local broker: the broker is stopped while the
+# dashboard is driving, teleop and camera config keep publishing into the
+# offline queue, and the broker is restarted on the same port. Reports how
+# long loss detection and the reconnect after the restart took, and checks
+# that queued messages arrive in publish order, that no drive command older
+# than its TTL is replayed, and that the final STP gets through.
+#
+#   python benchmarks/bench_reconnect.py [--json results.json]
+
+import os
+import struct
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from harness import bench, parse_args, save_results
+
+from mqtt_client import MQTTClient
+from mqtt_transport import CONNECTED
+from teleop import MOTION_TTL, STOP, TeleopChannel
+from telemetry import TOPIC_CAMERA_CONFIG, TOPIC_COMMAND, robot_topic
+from tools.local_broker import LocalBroker
+
+OUTAGES = [1.0, 3.0, 8.0]  # s the broker stays down
+COMMAND_TOPIC = robot_topic(TOPIC_COMMAND, "neobot")
+CONFIG_TOPIC = robot_topic(TOPIC_CAMERA_CONFIG, "neobot")
+
+
+class RecordingBroker(LocalBroker):
+    """LocalBroker that also keeps (arrival time, topic, payload) of every publish"""
+
+    def __init__(self, host, port, log):
+        super().__init__(host, port)
+        self.log = log
+
+    def handle_publish(self, writer, flags, body):
+        topic_len, = struct.unpack_from("!H", body, 0)
+        pos = 2 + topic_len + (2 if (flags >> 1) & 0x03 else 0)
+        self.log.append((time.monotonic(), body[2:2 + topic_len].decode(), body[pos:].decode()))
+        super().handle_publish(writer, flags, body)
+
+
+def wait_until(predicate, timeout):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.002)
+    return True
+
+
+def run_outage(client, broker, log, outage):
+    host, port = broker.host, broker.port
+    sent = []  # (publish time, payload) of every drive command
+
+    def publish(topic, payload, qos=0, ttl=None):
+        sent.append((time.monotonic(), payload))
+        client.publish(topic, payload, qos, ttl)
+
+    teleop = TeleopChannel(publish, COMMAND_TOPIC)
+    teleop.set_command("FWD")
+    time.sleep(0.3)
+
+    broker.stop()
+    down = time.monotonic()
+    wait_until(lambda: client.transport.state != CONNECTED, 5.0)
+    detected = time.monotonic() - down
+    log_start = len(log)
+
+    client.publish(CONFIG_TOPIC, "55")  # Default TTL, must survive every outage here
+    time.sleep(max(0.0, outage - 0.4))
+    teleop.set_command(STOP)  # Released the key 0.4 s before the broker is back
+    time.sleep(min(0.4, outage))
+
+    broker = RecordingBroker(host, port, log).start_in_thread()
+    up = time.monotonic()
+    wait_until(lambda: client.transport.state == CONNECTED, 60.0)
+    reconnect = time.monotonic() - up
+    time.sleep(0.3)  # Flushed messages reach the broker
+    teleop.stop()
+
+    status = client.connection_status()
+    queued_sent, expired = status["last_flush"]
+    commands = [payload for _, topic, payload in log[log_start:] if topic == COMMAND_TOPIC]
+    seqs = [int(payload.split("#")[1]) for payload in commands]
+    sent_at = {payload: t for t, payload in sent}
+    flush_time = up + reconnect
+    # Polling sees CONNECTED a little after the flush, hence the margin
+    stale = [p for p in commands if not p.startswith(STOP) and sent_at[p] < flush_time - MOTION_TTL - 0.05]
+    config_delivered = any(topic == CONFIG_TOPIC for _, topic, _ in log[log_start:])
+    result = {
+        "name": f"broker down {outage:.0f} s",
+        "detect_ms": detected * 1000,
+        "reconnect_after_restart_ms": reconnect * 1000,
+        "outage_s": status["last_outage"],
+        "flushed": queued_sent,
+        "expired": expired,
+        "in_order": seqs == sorted(seqs),
+        "stale_motion_delivered": len(stale),
+        "stop_delivered": bool(commands) and commands[-1].startswith(STOP),
+        "config_delivered": config_delivered,
+    }
+    print(f"{result['name']:<20} loss detected {result['detect_ms']:6.1f} ms  "
+          f"reconnect {result['reconnect_after_restart_ms']:7.1f} ms after restart  "
+          f"outage {result['outage_s']:5.2f} s  flushed {queued_sent:>3}  expired {expired:>3}  "
+          f"in order {result['in_order']}  stale drive {len(stale)}  "
+          f"STP {result['stop_delivered']}  config {config_delivered}")
+    return broker, result
+
+
+def bench_publish(client):
+    """UI-thread cost of publish(): the hand-over to the transport loop"""
+    return bench("MQTTClient.publish (hand-over only)", lambda: client.publish(CONFIG_TOPIC, "55"), number=5000)
+
+
+def main():
+    args = parse_args("MQTT reconnect and offline queue benchmark")
+    log = []
+    broker = RecordingBroker("127.0.0.1", 0, log).start_in_thread()
+    client = MQTTClient(broker.host, broker.port)
+    wait_until(lambda: client.transport.state == CONNECTED, 10.0)
+
+    results = [bench_publish(client)]
+    for outage in OUTAGES:
+        broker, result = run_outage(client, broker, log, outage)
+        results.append(result)
+
+    client.stop()
+    broker.stop()
+    save_results(args.json, "reconnect", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/bench_sensor_rules.py
+#
+# Sensor status rules: per-reading evaluation, bulk classification of long
+# series against a scalar loop, and SensorPanel updates when the status
+# bucket stays the same (value text only) versus when it flips every sample.
+#
+#   python benchmarks/bench_sensor_rules.py [--json results.json]
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+
+from harness import bench, parse_args, save_results
+
+from PyQt5.QtWidgets import QApplication
+
+from sensor_rules import load_rules
+
+SERIES = 1_000_000
+
+
+def bench_evaluate(rules):
+    temperature, gas = rules["temperature"], rules["air_quality"]
+    return [
+        bench("SensorRule.evaluate (float)", lambda: temperature.evaluate(21.5, 1), number=100000),
+        bench("SensorRule.evaluate (int ADC)", lambda: gas.evaluate(180, 0), number=100000),
+        bench("SensorRule.evaluate (text label)", lambda: gas.evaluate("Poor", 2), number=100000),
+    ]
+
+
+def bench_bulk(rules):
+    rule = rules["temperature"]
+    rng = np.random.default_rng(0)
+    # Slow drift across both thresholds plus sensor noise, so many readings sit in a hysteresis band
+    values = 22.5 + 10 * np.sin(np.linspace(0, 40 * np.pi, SERIES)) + rng.normal(0, 0.4, SERIES)
+    as_list = values.tolist()
+
+    def scalar():
+        current = None
+        for v in as_list:
+            current = rule.evaluate(v, current)[0]
+
+    banded = int(((np.abs(values - 15) < rule.hysteresis) | (np.abs(values - 30) < rule.hysteresis)).sum())
+    print(f"{'readings inside a hysteresis band':<48} {banded:>12} / {SERIES}")
+    return [
+        bench(f"SensorRule.classify ({SERIES} readings)", lambda: rule.classify(values),
+              number=1, repeat=3, items=SERIES),
+        bench(f"scalar evaluate loop ({SERIES} readings)", scalar, number=1, repeat=3, items=SERIES),
+        {"name": "readings in hysteresis band", "banded": banded, "total": SERIES},
+    ]
+
+
+def bench_panel():
+    from panels.sensor_panel import SensorPanel
+    panel = SensorPanel(temp_val=0, humidity_val=0, air_quality_val="Poor", light_val="Day")
+    i = [0]
+
+    def same_bucket():
+        i[0] += 1
+        panel.set_temperature(20.0 + (i[0] & 7) * 0.1)
+
+    def flipping_bucket():
+        i[0] += 1
+        panel.set_temperature(10.0 if i[0] & 1 else 35.0)
+
+    return [
+        bench("SensorPanel.set_temperature (same bucket)", same_bucket, number=20000),
+        bench("SensorPanel.set_temperature (bucket flips)", flipping_bucket, number=5000),
+    ]
+
+
+def main():
+    args = parse_args("Sensor status rules benchmark")
+    app = QApplication([])
+    rules = load_rules()
+    results = bench_evaluate(rules) + bench_bulk(rules) + bench_panel()
+    save_results(args.json, "sensor_rules", results)
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/bench_startup.py
+#
+# Dashboard startup time, each run in a fresh interpreter so import costs
+# are real. Breaks startup into: importing main.py, constructing
+# RobotControlUI, the first paint of the window, and the lazily built
+# panels (IMU, camera, history) being ready. Runs the default lazy path and
+# the eager one (every panel built in the constructor) for comparison.
+#
+#   python benchmarks/bench_startup.py [--runs 5] [--json results.json]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from harness import save_results
+
+HERE = os.path.abspath(__file__)
+
+
+def child(eager):
+    """Runs in the subprocess: measures one startup and prints it as JSON"""
+    t_start = time.perf_counter()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import QEvent, QObject, QTimer
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+    t_qt = time.perf_counter()
+
+    import main
+    t_import = time.perf_counter()
+
+    # Nothing listens on this port: connecting must not hold up the window
+    window = main.RobotControlUI(broker_ip="127.0.0.1", port=1, lazy_panels=not eager)
+    t_construct = time.perf_counter()
+
+    marks = {}
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and "paint" not in marks:
+                marks["paint"] = time.perf_counter()
+            return False
+
+    paint_filter = FirstPaint()
+    window.installEventFilter(paint_filter)
+    window.show()
+
+    def check_ready():
+        if "paint" in marks and all(p.panel is not None for p in window.lazy_panels):
+            marks["ready"] = time.perf_counter()
+            app.quit()
+        else:
+            QTimer.singleShot(1, check_ready)
+
+    QTimer.singleShot(0, check_ready)
+    QTimer.singleShot(20000, app.quit)
+    app.exec_()
+
+    ready = marks.get("ready", time.perf_counter())
+    result = {
+        "qt_init_ms": (t_qt - t_start) * 1000,
+        "import_ms": (t_import - t_qt) * 1000,
+        "construct_ms": (t_construct - t_import) * 1000,
+        "first_paint_ms": (marks.get("paint", ready) - t_start) * 1000,
+        "panels_ready_ms": (ready - t_start) * 1000,
+        "panel_build_ms": {p.name: (p.build_time or 0.0) * 1000 for p in window.lazy_panels},
+    }
+    print("RESULT " + json.dumps(result), flush=True)
+    os._exit(0)  # Skip joining the camera / MQTT threads
+
+
+def run_child(eager):
+    cmd = [sys.executable, HERE, "--child"] + (["--eager"] if eager else [])
+    out = subprocess.run(cmd, capture_output=True, text=True, timeout=60).stdout
+    for line in out.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise RuntimeError("startup child produced no result")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="write results to this JSON file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.eager)
+        return
+
+    keys = ["qt_init_ms", "import_ms", "construct_ms", "first_paint_ms", "panels_ready_ms"]
+    print(f"{'mode':<8}" + "".join(f"{k:>18}" for k in keys))
+    results = []
+    for eager in (False, True):
+        runs = [run_child(eager) for _ in range(args.runs)]
+        mode = "eager" if eager else "lazy"
+        # Median per stage
+        summary = {k: sorted(r[k] for r in runs)[len(runs) // 2] for k in keys}
+        print(f"{mode:<8}" + "".join(f"{summary[k]:>18.1f}" for k in keys))
+        results.append({"name": f"startup_{mode}", "runs": runs, **summary})
+    save_results(args.json, "startup", results)
+
+
+if __name__ == "__main__":
+    main()
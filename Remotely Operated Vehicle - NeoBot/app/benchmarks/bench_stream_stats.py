@@ -0,0 +1,131 @@
+# benchmarks/bench_stream_stats.py
+#
+# Derived telemetry channels: RollingWindow cost per sample, StreamProcessor
+# throughput on batches of binary frames (every channel, every window), the
+# error of the block-summarised windows against exact NumPy statistics over
+# the same span, and anomaly detection on a simulated gas spike and a wall
+# approach.
+#
+#   python benchmarks/bench_stream_stats.py [--json results.json]
+
+import math
+import time
+
+import numpy as np
+
+from harness import bench, parse_args, save_results
+
+from mqtt_ingest import parse_message
+from stream_stats import WINDOWS, RollingWindow, StreamProcessor
+from telemetry import TOPIC_TELEMETRY
+from telemetry_frame import encode_frame
+
+RATE_HZ = 1000
+BATCH = 17  # Frames per ingest batch at 1000 Hz and 60 batches/s
+
+
+def bench_window():
+    window = RollingWindow(60.0)
+    i = [0]
+
+    def add():
+        i[0] += 1
+        window.add(i[0] * 0.001, math.sin(i[0] * 0.01))
+
+    return [
+        bench("RollingWindow.add (60 s window)", add, number=100000),
+        bench("RollingWindow.summary", window.summary, number=100000),
+    ]
+
+
+def make_frames(n, start=0.0, rate_hz=RATE_HZ, seed=0):
+    rng = np.random.default_rng(seed)
+    messages = []
+    for i in range(n):
+        t = start + i / rate_hz
+        payload = encode_frame(i, int(t * 1000), 24 + rng.normal(0, 0.1), 45 + rng.normal(0, 0.3),
+                               2000, 150 + int(rng.normal(0, 8)), 120.0, (0.0, 0.0, 9.81), (0.0, 0.0, 0.0))
+        messages.append(parse_message(TOPIC_TELEMETRY, payload, t))
+    return messages
+
+
+def bench_processor():
+    messages = make_frames(BATCH * 200)
+    batches = [messages[i:i + BATCH] for i in range(0, len(messages), BATCH)]
+    processor = StreamProcessor()
+    runs = [0]
+
+    def run():
+        # Keep time moving forward across repeats so windows keep sliding
+        shift = runs[0] * len(messages) / RATE_HZ
+        for batch in batches:
+            processor.process([m._replace(received_at=m.received_at + shift) for m in batch])
+        runs[0] += 1
+
+    result = bench(f"StreamProcessor.process ({len(messages)} frames)", run, number=1, repeat=5, items=len(messages))
+    samples_per_frame = processor.samples / (runs[0] * len(messages))
+    print(f"{'samples per frame (channels)':<48} {samples_per_frame:>12.0f}")
+    print(f"{'frames/s one core can absorb':<48} {1e9 / result['ns_per_item']:>12,.0f}")
+    return [result]
+
+
+def check_accuracy():
+    """Block-summarised windows against exact statistics over the same samples"""
+    rng = np.random.default_rng(1)
+    n = 200_000
+    t = np.arange(n) / RATE_HZ
+    x = 50 + 10 * np.sin(t / 7) + rng.normal(0, 2, n)
+    windows = [RollingWindow(length) for length in WINDOWS]
+    for ti, xi in zip(t.tolist(), x.tolist()):
+        for window in windows:
+            window.add(ti, xi)
+
+    results = []
+    for window in windows:
+        count, mean, std, lo, hi = window.summary()
+        exact = x[-count:]
+        errors = {
+            "mean": abs(mean - exact.mean()),
+            "std": abs(std - exact.std(ddof=1)),
+            "min": abs(lo - exact.min()),
+            "max": abs(hi - exact.max()),
+        }
+        span = t[-1] - t[-count]
+        print(f"{'window ' + format(window.length, 'g') + ' s':<48} span {span:7.2f} s  "
+              + "  ".join(f"{k} err {v:.2e}" for k, v in errors.items())
+              + f"  blocks {len(window.blocks)}")
+        results.append(dict(name=f"accuracy {window.length:g} s", span=span, blocks=len(window.blocks), **errors))
+    return results
+
+
+def check_anomalies():
+    processor = StreamProcessor()
+    events = []
+    t0 = time.time()
+    for i in range(20 * RATE_HZ):
+        t = t0 + i / RATE_HZ
+        gas = 150 + (400 if i == 15 * RATE_HZ else 0)
+        # Drive towards a wall at 40 cm/s from 200 cm during the last 5 s
+        distance = 200.0 - 40.0 * max(0.0, (i - 15 * RATE_HZ) / RATE_HZ)
+        payload = encode_frame(i, i, 24.0, 45.0, 2000, gas, distance, (0.0, 0.0, 9.81), (0.0, 0.0, 0.0))
+        for message in processor.process([parse_message(TOPIC_TELEMETRY, payload, t)]):
+            if message.value["changed"]:
+                events.append((round(t - t0, 3), message.value["channel"], message.value["anomaly"],
+                               message.value["value"]))
+    for event in events:
+        print(f"{'anomaly event':<48} t={event[0]:7.3f} s  {event[1]:<9} {str(event[2]):<9} value {event[3]:.1f}")
+    approach = [e for e in events if e[2] == "approach"]
+    # 100 cm and 1.5 s to contact: flagged around 60 cm, i.e. 3.5 s after the approach starts
+    return [{"name": "anomaly events", "events": events,
+             "gas_spike_flagged": any(e[1] == "gas" and e[2] == "spike" for e in events),
+             "approach_flagged_at_cm": approach[0][3] if approach else None}]
+
+
+def main():
+    args = parse_args("Derived telemetry stream benchmark")
+    results = bench_window() + bench_processor() + check_accuracy() + check_anomalies()
+    save_results(args.json, "stream_stats", results)
+
+
+if __name__ == "__main__":
+    main()
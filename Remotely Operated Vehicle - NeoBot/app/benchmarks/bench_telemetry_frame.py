@@ -0,0 +1,64 @@
+# benchmarks/bench_telemetry_frame.py
+#
+# Compares decoding one sample sent as seven text topics against one binary
+# frame, and per-frame struct decoding against a batched NumPy pass.
+#
+#   python benchmarks/bench_telemetry_frame.py [--json results.json]
+
+from harness import bench, parse_args, save_results
+
+from telemetry import (
+    TOPIC_TEMP, TOPIC_HUMIDITY, TOPIC_GAS_AIR, TOPIC_LDR,
+    TOPIC_IMU_ACCEL, TOPIC_IMU_GYRO, TOPIC_DISTANCE, parse_payload
+)
+from telemetry_frame import decode_frame, decode_frames, encode_frame, frame_to_topics
+
+BATCH = 10000
+
+TEXT_SAMPLE = [
+    (TOPIC_TEMP, b"24.50"),
+    (TOPIC_HUMIDITY, b"41.00"),
+    (TOPIC_LDR, b"733"),
+    (TOPIC_GAS_AIR, b"187"),
+    (TOPIC_DISTANCE, b"57.31"),
+    (TOPIC_IMU_ACCEL, b"0.12,-0.34,9.81"),
+    (TOPIC_IMU_GYRO, b"0.01,0.02,-0.03"),
+]
+
+
+def make_frame(seq):
+    return encode_frame(seq, seq * 20, 24.5, 41.0, 733, 187, 57.31,
+                        (0.12, -0.34, 9.81), (0.01, 0.02, -0.03))
+
+
+def main():
+    args = parse_args("Telemetry frame decoding benchmark")
+    frame = make_frame(1)
+    batch = b"".join(make_frame(i) for i in range(BATCH))
+
+    def text_sample():
+        for topic, payload in TEXT_SAMPLE:
+            parse_payload(topic, payload.decode())
+
+    def binary_sample():
+        frame_to_topics(decode_frame(frame))
+
+    def binary_batch_loop():
+        for i in range(0, len(batch), len(frame)):
+            decode_frame(batch[i:i + len(frame)])
+
+    def binary_batch_numpy():
+        frames = decode_frames(batch)
+        frames["temperature"].mean()
+
+    results = [
+        bench("text: 7 topics -> 1 sample", text_sample, number=20000, items=1),
+        bench("binary: 1 frame -> 1 sample", binary_sample, number=20000, items=1),
+        bench(f"binary: {BATCH} frames, struct loop", binary_batch_loop, number=5, items=BATCH),
+        bench(f"binary: {BATCH} frames, numpy pass", binary_batch_numpy, number=50, items=BATCH),
+    ]
+    save_results(args.json, "telemetry_frame", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# benchmarks/bench_timeseries_buffer.py
+#
+# Append and view cost of the plot ring buffers, plus a tracemalloc check
+# that steady-state appends do not allocate.
+#
+#   python benchmarks/bench_timeseries_buffer.py [--json results.json]
+
+import tracemalloc
+
+from harness import bench, parse_args, save_results
+
+from timeseries_buffer import TimeSeriesBuffer
+
+CAPACITY = 131072
+APPENDS = 100000
+
+
+def allocated_bytes_per_append(buf, n=APPENDS):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(n):
+        buf.append(1.0, 2.0)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename")
+                if stat.traceback[0].filename.endswith("timeseries_buffer.py"))
+    return grown / n
+
+
+def main():
+    args = parse_args("Time-series ring buffer benchmark")
+    buf = TimeSeriesBuffer(CAPACITY)
+
+    def append_batch():
+        for i in range(1000):
+            buf.append(0.5, 1.5)
+
+    results = [
+        bench("append", append_batch, number=200, items=1000),
+        bench("view (zero-copy slice)", buf.view, number=100000),
+    ]
+
+    per_append = allocated_bytes_per_append(buf)
+    print(f"{'allocated bytes per append':<48} {per_append:>12.3f}")
+    results.append({"name": "allocated bytes per append", "bytes": per_append})
+    save_results(args.json, "timeseries_buffer", results)
+
+
+if __name__ == "__main__":
+    main()
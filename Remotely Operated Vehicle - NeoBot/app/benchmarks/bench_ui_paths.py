@@ -0,0 +1,154 @@
+# benchmarks/bench_ui_paths.py
+#
+# The dashboard's GUI-thread data paths under an offscreen Qt platform, with
+# no camera or broker: message handling through handle_mqtt_message, sensor
+# card updates, IMU orientation, radar blips over long runs (with scene item
+# counts), log ingestion at 10k+ messages and camera frame conversion.
+#
+#   python benchmarks/bench_ui_paths.py [--json results.json]
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+
+from harness import bench, parse_args, save_results
+
+from PyQt5.QtWidgets import QApplication
+
+from telemetry import TOPIC_TEMP, TOPIC_IMU_ACCEL, TOPIC_TELEMETRY
+from telemetry_frame import encode_frame
+
+RADAR_BLIPS = 100000
+LOG_MESSAGES = 20000
+
+
+def bench_messages(window):
+    # Consecutive sequence numbers, so the frame-loss tracker sees a healthy stream
+    frames = [encode_frame(seq, seq * 10, 21.5, 40.0, 512, 180, 120.0, (0.1, 0.2, 9.8), (0.0, 0.01, 0.02))
+              for seq in range(1, 8193)]
+    i = [0]
+
+    def binary_frame():
+        window.handle_mqtt_message(TOPIC_TELEMETRY, frames[i[0] & 8191])
+        i[0] += 1
+
+    results = [
+        bench("handle_mqtt_message (scalar text)",
+              lambda: window.handle_mqtt_message(TOPIC_TEMP, b"21.50"), number=5000),
+        bench("handle_mqtt_message (vector text)",
+              lambda: window.handle_mqtt_message(TOPIC_IMU_ACCEL, b"0.10,0.20,9.81"), number=5000),
+        bench("handle_mqtt_message (binary frame)", binary_frame, number=5000),
+        bench("dispatcher flush (all routes dirty)", lambda: (
+            binary_frame(), window.dispatcher.flush()), number=2000),
+    ]
+    window.log_panel.flush()
+    return results
+
+
+def bench_sensor_panel(panel):
+    return [
+        bench("SensorPanel.evaluate_sensor (4 sensors)", lambda: (
+            panel.evaluate_sensor("temperature", 21.5),
+            panel.evaluate_sensor("humidity", 45.0),
+            panel.evaluate_sensor("air_quality", 180),
+            panel.evaluate_sensor("light", 512),
+        ), number=20000, items=4),
+        bench("SensorPanel.set_* (4 sensors)", lambda: (
+            panel.set_temperature(21.5),
+            panel.set_humidity(45.0),
+            panel.set_air_quality(180),
+            panel.set_light(512),
+        ), number=5000, items=4),
+    ]
+
+
+def bench_imu(panel):
+    angles = np.random.default_rng(0).uniform(-np.pi, np.pi, size=(1024, 3)).tolist()
+    i = [0]
+
+    def update():
+        yaw, pitch, roll = angles[i[0] & 1023]
+        i[0] += 1
+        panel.update_orientation(yaw, pitch, roll)
+
+    return [bench("IMUPanel.update_orientation", update, number=5000)]
+
+
+def bench_radar(panel):
+    scene = panel.scene
+    items_before = len(scene.items())
+    i = [0]
+
+    def blip():
+        i[0] += 1
+        panel.add_blip(i[0] % 360, 20 + i[0] % 180)
+
+    results = [
+        bench("RadarPanel.add_blip", blip, number=RADAR_BLIPS // 5),
+        bench("RadarPanel.update_radar", panel.update_radar, number=20000),
+    ]
+    items_after = len(scene.items())
+    print(f"{'radar scene items before / after':<48} {items_before:>12} / {items_after}")
+    results.append({"name": "radar scene items", "before": items_before, "after": items_after,
+                    "blips": i[0]})
+    return results
+
+
+def bench_log(panel):
+    i = [0]
+
+    def add_and_flush():
+        for _ in range(1000):
+            i[0] += 1
+            panel.add_log(f"[roboai/neobot/sensor/dht/temperature] {i[0]}", topic="roboai/neobot/sensor/dht/temperature")
+        panel.flush()
+
+    results = [bench(f"LogPanel.add_log + flush ({LOG_MESSAGES} msgs/round)", add_and_flush,
+                     number=LOG_MESSAGES // 1000, repeat=3, items=1000)]
+    rows = panel.model.rowCount()
+    print(f"{'log rows kept':<48} {rows:>12}")
+    results.append({"name": "log rows kept", "rows": rows, "added": i[0]})
+    return results
+
+
+def bench_camera():
+    from camera_capture import FramePool, convert_frame
+    frame = np.random.default_rng(0).integers(0, 255, size=(480, 640, 3), dtype=np.uint8)
+    pool = FramePool((310, 220))
+
+    def pooled():
+        pool.convert(frame, pool.acquire()).release()
+
+    return [
+        bench("convert_frame 640x480 -> 310x220", lambda: convert_frame(frame, (310, 220)), number=2000),
+        bench("FramePool.convert 640x480 -> 310x220", pooled, number=2000),
+    ]
+
+
+def main():
+    args = parse_args("Dashboard GUI data path benchmark (offscreen)")
+    app = QApplication([])
+
+    import main as dashboard
+    from panels.imu_panel import IMUPanel
+    from panels.log_panel import LogPanel
+    from panels.radar_panel import RadarPanel
+
+    window = dashboard.RobotControlUI(connect_mqtt=False)
+    results = []
+    results += bench_messages(window)
+    results += bench_sensor_panel(window.sensor_panel)
+    results += bench_imu(IMUPanel())
+    radar = RadarPanel()
+    radar.timer.stop()
+    results += bench_radar(radar)
+    results += bench_log(LogPanel())
+    results += bench_camera()
+    save_results(args.json, "ui_paths", results)
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
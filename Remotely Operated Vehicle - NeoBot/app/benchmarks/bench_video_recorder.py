@@ -0,0 +1,218 @@
+# benchmarks/bench_video_recorder.py
+#
+# Camera recording: what submit() costs the capture thread, process CPU and
+# frames displayed with and without recording while a 640x480 camera at
+# 30 fps goes through CaptureWorker.deliver() and a display thread takes
+# the latest frame at 60 Hz, nearest-frame lookups over an hour of index,
+# whether the frame read back for a time is the right one, and disk usage
+# under rolling retention.
+#
+#   python benchmarks/bench_video_recorder.py [--json results.json]
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from harness import bench, parse_args, save_results
+
+from camera_capture import CaptureWorker
+from video_recorder import INDEX_DTYPE, SEGMENT_EXT, SEGMENT_PREFIX, VideoIndex, VideoRecorder, index_path
+
+CAMERA_SIZE = (640, 480)
+CAMERA_FPS = 30
+DISPLAY_HZ = 60
+DURATION = 5.0
+HOUR_FPS = 15
+
+
+def make_frames(count=30, size=CAMERA_SIZE, seed=0):
+    """Noisy frames, so the encoder has realistic work"""
+    w, h = size
+    rng = np.random.default_rng(seed)
+    base = np.empty((h, w, 3), np.uint8)
+    base[:] = np.linspace(60, 190, w, dtype=np.uint8)[None, :, None]
+    return [cv2.add(base, rng.integers(0, 24, base.shape, dtype=np.uint8)) for _ in range(count)]
+
+
+def bench_submit(directory):
+    results = []
+    for size in (CAMERA_SIZE, (1280, 720)):
+        frame = make_frames(1, size)[0]
+        recorder = VideoRecorder(os.path.join(directory, f"submit-{size[0]}"), max_fps=1000.0)
+        recorder.submit_time.reset()
+
+        def submit():
+            recorder.submit(frame)
+            time.sleep(0.002)  # Let the encoder keep a slot free, as at camera rate
+
+        results.append(bench(f"VideoRecorder.submit ({size[0]}x{size[1]} -> 640x480) + 2 ms sleep", submit,
+                             number=300))
+        recorder.stop()
+        summary = recorder.submit_time.summary()
+        results[-1]["submit_ms_p50"] = summary["p50_ms"]
+        print(f"{'':<48} submit alone p50 {summary['p50_ms']:.3f} ms p99 {summary['p99_ms']:.3f} ms, "
+              f"encode p50 {recorder.encode_time.summary()['p50_ms']:.2f} ms")
+    return results
+
+
+def run_live(directory, record):
+    """Camera thread -> CaptureWorker.deliver -> display thread, the camera panel's path without Qt painting"""
+    frames = make_frames()
+    worker = CaptureWorker(size=(310, 220))
+    recorder = VideoRecorder(os.path.join(directory, "live")) if record else None
+    worker.recorder = recorder
+    stop = threading.Event()
+    shown = [0]
+
+    def display():
+        while not stop.is_set():
+            buf = worker.latest_frame()
+            if buf is not None:
+                shown[0] += 1
+                buf.release()
+            time.sleep(1.0 / DISPLAY_HZ)
+
+    viewer = threading.Thread(target=display, daemon=True)
+    viewer.start()
+    cpu = time.process_time()
+    start = time.monotonic()
+    next_frame = start
+    delivered = 0
+    while next_frame - start < DURATION:
+        time.sleep(max(0.0, next_frame - time.monotonic()))
+        worker.deliver(frames[delivered % len(frames)])
+        delivered += 1
+        next_frame += 1.0 / CAMERA_FPS
+    elapsed = time.monotonic() - start
+    stop.set()
+    viewer.join()
+    if recorder is not None:
+        recorder.stop()
+    cpu = time.process_time() - cpu
+
+    result = {
+        "name": f"live {CAMERA_FPS} fps 640x480, {'recording' if record else 'no recording'}",
+        "cpu_percent": cpu / elapsed * 100,
+        "delivered": delivered,
+        "displayed": shown[0],
+        "display_dropped": worker.slot.dropped,
+    }
+    text = (f"{result['name']:<40} CPU {result['cpu_percent']:5.1f}%  delivered {delivered}  "
+            f"displayed {shown[0]}  replaced before display {worker.slot.dropped}")
+    if recorder is not None:
+        stats = recorder.stats()
+        result.update(recorded=stats["recorded"], skipped_rate=stats["skipped_rate"],
+                      skipped_busy=stats["skipped_busy"], encode_ms_p50=stats["encode"]["p50_ms"])
+        text += (f"  recorded {stats['recorded']} (skipped rate/busy {stats['skipped_rate']}/"
+                 f"{stats['skipped_busy']}, encode p50 {stats['encode']['p50_ms']:.2f} ms)")
+    print(text)
+    return result
+
+
+def bench_lookup(directory):
+    """An hour at 15 fps in one-minute segments, only the indexes (lookups never open the videos)"""
+    hour = os.path.join(directory, "hour")
+    os.makedirs(hour)
+    t0 = 1_700_000_000.0
+    rng = np.random.default_rng(3)
+    for minute in range(60):
+        path = os.path.join(hour, f"{SEGMENT_PREFIX}{minute:04d}{SEGMENT_EXT}")
+        open(path, "wb").close()
+        times = t0 + minute * 60 + np.arange(60 * HOUR_FPS) / HOUR_FPS + rng.uniform(0, 0.01, 60 * HOUR_FPS)
+        times.astype(INDEX_DTYPE).tofile(index_path(path))
+    start = time.perf_counter()
+    index = VideoIndex(hour)
+    load_ms = (time.perf_counter() - start) * 1000
+    queries = t0 + rng.uniform(0, 3600, 1000)
+    i = [0]
+
+    def lookup():
+        index.nearest(queries[i[0] % len(queries)])
+        i[0] += 1
+
+    result = bench(f"VideoIndex.nearest ({len(index)} frames, 60 segments)", lookup, number=20000)
+    result["load_ms"] = load_ms
+    print(f"{'':<48} index loaded in {load_ms:.1f} ms")
+    return [result]
+
+
+def check_readback(directory):
+    """Frames numbered by brightness: the frame read for a time must be the one recorded nearest to it"""
+    path = os.path.join(directory, "readback")
+    recorder = VideoRecorder(path, size=(320, 240), max_fps=1000.0, segment_seconds=2.0)
+    t0 = 1_700_000_000.0
+    count = 200
+    for n in range(count):
+        while not recorder.submit(np.full((240, 320, 3), n, np.uint8), t0 + n / 20):
+            time.sleep(0.001)
+    recorder.stop()
+    index = VideoIndex(path)
+    rng = np.random.default_rng(4)
+    correct = 0
+    errors = []
+    for q in rng.uniform(t0, t0 + count / 20, 50):
+        ref = index.nearest(q)
+        expected = int(round((q - t0) * 20))
+        frame = index.read(ref)
+        got = int(round(float(frame.mean()))) if frame is not None else -1
+        correct += abs(got - min(expected, count - 1)) <= 2
+        errors.append(abs(ref.t - q))
+    result = {
+        "name": f"read-back, {count} frames in {len(index.paths)} segments",
+        "queries": 50,
+        "correct": correct,
+        "time_error_ms_max": max(errors) * 1000,
+    }
+    print(f"{result['name']:<48} {correct}/50 frames correct, nearest within {result['time_error_ms_max']:.0f} ms")
+    return result
+
+
+def check_retention(directory):
+    """Two minutes at 15 fps in 5 s segments under an 8 MiB cap"""
+    path = os.path.join(directory, "retention")
+    max_bytes = 8 * 1024 ** 2
+    recorder = VideoRecorder(path, max_fps=15.0, segment_seconds=5.0, max_bytes=max_bytes)
+    frames = make_frames(15)
+    t0 = 1_700_000_000.0
+    peak = 0
+    for n in range(120 * 15):
+        while not recorder.submit(frames[n % len(frames)], t0 + n / 15):
+            time.sleep(0.001)
+        if n % 75 == 0:
+            peak = max(peak, recorder.disk_bytes())
+    recorder.stop()
+    index = VideoIndex(path)
+    first, last = index.span()
+    result = {
+        "name": "retention, 120 s at 15 fps, 8 MiB cap",
+        "max_mib": max_bytes / 1024 ** 2,
+        "peak_mib": peak / 1024 ** 2,
+        "final_mib": recorder.disk_bytes() / 1024 ** 2,
+        "segments_deleted": recorder.deleted,
+        "kept_seconds": last - first,
+    }
+    print(f"{result['name']:<48} peak {result['peak_mib']:5.1f} MiB, final {result['final_mib']:5.1f} MiB, "
+          f"{recorder.deleted} segments deleted, last {result['kept_seconds']:.0f} s kept")
+    return result
+
+
+def main():
+    args = parse_args("Video recorder benchmark")
+    directory = tempfile.mkdtemp(prefix="neobot-video-")
+    try:
+        results = bench_submit(directory)
+        results += [run_live(directory, False), run_live(directory, True)]
+        results += bench_lookup(directory)
+        results += [check_readback(directory), check_retention(directory)]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    save_results(args.json, "video_recorder", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/bench_video_stream.py
+#
+# Network video against the local stream generator: JPEG decode cost at each
+# AdaptiveQuality downscale, MJPEG splitting throughput, and live runs
+# (MJPEG over HTTP, JPEG over MQTT through the local broker) reporting
+# received / decoded / displayed rates, the level adaptation settled on and
+# decode latency percentiles.
+#
+#   python benchmarks/bench_video_stream.py [--json results.json]
+
+import io
+import os
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import cv2
+import numpy as np
+
+from harness import bench, parse_args, save_results
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+
+from instrumentation import metrics
+from mqtt_client import MQTTClient
+from telemetry import MQTT_SOURCE, TOPIC_CAMERA, TOPIC_CAMERA_CONFIG, robot_topic
+from tools.local_broker import LocalBroker
+from tools.stream_generator import BOUNDARY, MjpegServer, MqttCameraPublisher, SyntheticVideo
+from video_sources import DECODE_FLAGS, VideoStreamWorker, iter_mjpeg
+
+DURATION = 6.0
+DISPLAY_HZ = 60
+
+
+def bench_decode():
+    video = SyntheticVideo(1280, 720)
+    jpeg = np.frombuffer(video.encode(7), np.uint8)
+    return [
+        bench(f"imdecode 1280x720 at 1/{scale}", lambda flag=flag: cv2.imdecode(jpeg, flag), number=100)
+        for scale, flag in DECODE_FLAGS.items()
+    ]
+
+
+def bench_split():
+    video = SyntheticVideo(640, 480)
+    part = video.encode(3)
+    body = b"".join(
+        f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n\r\n".encode() + part + b"\r\n" for _ in range(200)
+    )
+    return [bench("iter_mjpeg 640x480 (200 frames/round)",
+                  lambda: sum(1 for _ in iter_mjpeg(io.BytesIO(body))), number=20, items=200)]
+
+
+def run_live(app, name, worker, started=None):
+    """Runs worker for DURATION with a display-rate consumer, returns its stats"""
+    metrics.histogram("video.decode").reset()
+    levels = []
+    worker.quality_changed.connect(lambda scale, quality: levels.append(scale))
+    displayed = [0]
+    shown = [None]
+
+    def display():
+        frame = worker.latest_frame()
+        if frame is None:
+            return
+        if shown[0] is not None:
+            shown[0].release()
+        shown[0] = frame
+        displayed[0] += 1
+
+    timer = QTimer()
+    timer.timeout.connect(display)
+    timer.start(int(1000 / DISPLAY_HZ))
+    worker.start()
+    if started is not None:
+        started()
+    QTimer.singleShot(int(DURATION * 1000), app.quit)
+    app.exec_()
+    timer.stop()
+    worker.stop()
+
+    stats = worker.stats()
+    decode = metrics.histogram("video.decode").summary()
+    result = {
+        "name": name,
+        "received_fps": stats["received"] / DURATION,
+        "decoded_fps": stats["decoded"] / DURATION,
+        "displayed_fps": displayed[0] / DURATION,
+        "dropped": stats["dropped"],
+        "scale_steps": levels,
+        "final_scale": stats["scale"],
+        "decode_p50_ms": decode["p50_ms"],
+        "decode_p99_ms": decode["p99_ms"],
+    }
+    print(f"{name:<48} rx {result['received_fps']:6.1f}  dec {result['decoded_fps']:6.1f}  "
+          f"disp {result['displayed_fps']:6.1f} fps  scale steps {levels}  "
+          f"decode p50/p99 {decode['p50_ms']:.2f}/{decode['p99_ms']:.2f} ms")
+    return result
+
+
+def main():
+    args = parse_args("Network video ingest benchmark")
+    app = QApplication([])
+    results = bench_decode() + bench_split()
+
+    # MJPEG over HTTP, comfortable and overloaded (1080p60 with 10 ms of jitter)
+    for width, height, fps, jitter in [(640, 480, 30, 0.0), (1920, 1080, 60, 0.010)]:
+        server = MjpegServer(fps=fps, width=width, height=height, jitter=jitter).start_in_thread()
+        results.append(run_live(app, f"mjpeg {width}x{height}@{fps} jitter {jitter * 1000:.0f}ms",
+                                VideoStreamWorker(server.url)))
+        server.stop()
+
+    # JPEG over MQTT, with quality requests flowing back to the publisher
+    broker = LocalBroker("127.0.0.1", 0).start_in_thread()
+    client = MQTTClient(broker.host, broker.port)
+    worker = VideoStreamWorker(MQTT_SOURCE)
+    client.add_direct_listener(robot_topic(TOPIC_CAMERA, "+"), lambda topic, payload: worker.push_jpeg(payload))
+    publisher = MqttCameraPublisher(broker.host, broker.port, fps=60, width=1920, height=1080, jitter=0.010)
+    worker.quality_changed.connect(
+        lambda scale, quality: client.publish(robot_topic(TOPIC_CAMERA_CONFIG, "neobot"), str(quality))
+    )
+    thread = threading.Thread(target=publisher.run, args=(DURATION + 1,), daemon=True)
+    result = run_live(app, "mqtt 1920x1080@60 jitter 10ms", worker, started=thread.start)
+    result["requested_quality"] = publisher.requested_quality
+    print(f"{'mqtt quality requested from publisher':<48} {publisher.requested_quality}")
+    results.append(result)
+    publisher.stop()
+    client.stop()
+    broker.stop()
+
+    save_results(args.json, "video_stream", results)
+
+
+if __name__ == "__main__":
+    main()
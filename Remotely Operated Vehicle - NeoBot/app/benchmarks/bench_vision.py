@@ -0,0 +1,124 @@
+# benchmarks/bench_vision.py
+#
+# Camera obstacle detection: detector cost per analysed frame, how far the
+# radar projection lands from obstacles drawn at known floor distances, and
+# the worker pool fed 640x480 frames at camera rate. For each pool setup it
+# reports the analysis rate against the target, frames skipped for rate and
+# for busy workers, submit-to-result latency, worker utilisation and what
+# submit() costs the capture thread.
+#
+#   python benchmarks/bench_vision.py [--json results.json]
+
+import math
+import time
+
+import cv2
+import numpy as np
+
+from harness import bench, parse_args, save_results
+
+from vision_detector import CameraGeometry, DetectorPool, ObstacleDetector
+
+CAMERA_SIZE = (640, 480)
+DURATION = 5.0
+WARMUP = 2.0  # Spawned workers import cv2 before their first result
+# (workers, target Hz, camera fps); None feeds frames back to back to saturate the pool
+POOLS = [(1, 10.0, 30), (2, 10.0, 30), (2, 30.0, 30), (1, 1000.0, None), (2, 1000.0, None)]
+
+
+def make_scene(box=(400, 260, 120, 140), seed=0):
+    """Floor gradient with sensor noise and one solid obstacle (x, y, w, h in pixels)"""
+    w, h = CAMERA_SIZE
+    rng = np.random.default_rng(seed)
+    frame = np.empty((h, w, 3), np.uint8)
+    frame[:] = np.linspace(90, 160, h, dtype=np.uint8)[:, None, None]
+    frame = cv2.add(frame, rng.integers(0, 12, frame.shape, dtype=np.uint8))
+    x, y, bw, bh = box
+    cv2.rectangle(frame, (x, y), (x + bw, y + bh), (40, 50, 60), -1)
+    return frame
+
+
+def bench_detector():
+    detector = ObstacleDetector()
+    small = cv2.resize(make_scene(), (320, 240), interpolation=cv2.INTER_AREA)
+    return [bench("ObstacleDetector.detect (320x240)", lambda: detector.detect(small), number=200)]
+
+
+def check_projection():
+    """Obstacles whose floor contact row is computed from the camera model, detected and projected back"""
+    geometry = CameraGeometry()
+    detector = ObstacleDetector()
+    w, h = CAMERA_SIZE
+    results = []
+    for distance, bearing in [(20, 0), (40, -15), (80, 10), (150, 0)]:
+        below = math.degrees(math.atan(geometry.height_cm / distance))
+        bottom = int(h * (0.5 + (below - geometry.tilt_deg) / geometry.vfov))
+        centre = int(w * (0.5 + bearing / geometry.hfov))
+        size = int(4000 / distance)  # Further away, smaller
+        frame = make_scene((centre - size // 2, bottom - size, size, size))
+        boxes = detector.detect(cv2.resize(frame, (320, 240), interpolation=cv2.INTER_AREA))
+        projected = geometry.project(boxes[0]) if boxes else None
+        result = {"name": f"projection {distance} cm at {bearing:+d} deg", "boxes": len(boxes),
+                  "distance_cm": projected[1] if projected else None,
+                  "bearing_deg": 90.0 - projected[0] if projected else None}
+        print(f"{result['name']:<48} boxes {len(boxes)}  "
+              + (f"distance {projected[1]:6.1f} cm  bearing {90.0 - projected[0]:+6.1f} deg" if projected else "missed"))
+        results.append(result)
+    return results
+
+
+def run_pool(workers, rate_hz, camera_fps):
+    frame = make_scene()
+    pool = DetectorPool(workers=workers, rate_hz=rate_hz)
+    period = 1.0 / camera_fps if camera_fps else 0.0
+    submit_times = []
+
+    def feed(seconds, record):
+        next_frame = time.monotonic()
+        end = next_frame + seconds
+        while time.monotonic() < end:
+            start = time.perf_counter()
+            if pool.submit(frame) and record:
+                submit_times.append(time.perf_counter() - start)
+            if period:
+                next_frame += period
+                time.sleep(max(0.0, next_frame - time.monotonic()))
+
+    feed(WARMUP, False)
+    pool.latency.reset()
+    skipped = (pool.skipped_rate, pool.skipped_busy)
+    analysed = pool.analysed
+    pool.utilisation()
+    feed(DURATION, True)
+    utilisation = pool.utilisation()
+    stats = pool.stats()
+    pool.stop()
+
+    result = {
+        "name": f"pool {workers} worker(s) at {rate_hz:g} Hz, camera {camera_fps or 'max'} fps",
+        "workers": workers,
+        "target_hz": min(rate_hz, camera_fps or rate_hz),
+        "analysed_per_s": (stats["analysed"] - analysed) / DURATION,
+        "skipped_rate": stats["skipped_rate"] - skipped[0],
+        "skipped_busy": stats["skipped_busy"] - skipped[1],
+        "latency_ms_p50": stats["latency"]["p50_ms"],
+        "latency_ms_p95": stats["latency"]["p95_ms"],
+        "utilisation": utilisation,
+        "submit_us_mean": float(np.mean(submit_times)) * 1e6 if submit_times else None,
+    }
+    print(f"{result['name']:<44} analysed {result['analysed_per_s']:5.1f}/s (target {result['target_hz']:g})  "
+          f"skipped rate/busy {result['skipped_rate']:>4}/{result['skipped_busy']:<4}  "
+          f"latency p50 {result['latency_ms_p50']:5.1f} ms p95 {result['latency_ms_p95']:5.1f} ms  "
+          f"workers {utilisation:4.0%} busy  submit {result['submit_us_mean']:6.0f} µs")
+    return result
+
+
+def main():
+    args = parse_args("Camera obstacle detection benchmark")
+    results = bench_detector() + check_projection()
+    results += [run_pool(workers, rate_hz, camera_fps) for workers, rate_hz, camera_fps in POOLS]
+    save_results(args.json, "vision", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/harness.py
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+# Benchmarks import app modules the same way main.py does
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+
+def bench(name, fn, number=1000, repeat=5, items=1):
+    """Times fn() `number` times per round and keeps the best of `repeat` rounds.
+
+    `items` is how many logical operations one call performs (e.g. messages
+    parsed), so results are comparable between batched and per-item paths.
+    """
+    fn()  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, time.perf_counter() - start)
+
+    per_call = best / number
+    result = {
+        "name": name,
+        "number": number,
+        "repeat": repeat,
+        "sec_per_call": per_call,
+        "ns_per_item": per_call / items * 1e9,
+        "items_per_sec": items / per_call if per_call > 0 else float("inf"),
+    }
+    print(f"{name:<48} {result['ns_per_item']:>12.1f} ns/item  {result['items_per_sec']:>14,.0f} items/s")
+    return result
+
+
+def parse_args(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--json", help="write results to this JSON file")
+    return parser.parse_args()
+
+
+def save_results(path, suite, results):
+    if not path:
+        return
+    payload = {
+        "suite": suite,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Saved {len(results)} results to {path}")
@@ -0,0 +1,122 @@
+# benchmarks/run_all.py
+#
+# Runs the benchmark scripts headless (offscreen Qt, no camera or broker
+# needed) and writes one combined JSON file. With --baseline it compares
+# ns/item against an earlier run and exits non-zero on regressions, e.g.
+#
+#   python benchmarks/run_all.py --out main.json
+#   python benchmarks/run_all.py --out branch.json --baseline main.json
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SUITES = [
+    "bench_telemetry_frame.py",
+    "bench_orientation.py",
+    "bench_timeseries_buffer.py",
+    "bench_ui_paths.py",
+    "bench_camera_frames.py",
+    "bench_sensor_rules.py",
+    "bench_stream_stats.py",
+    "bench_occupancy_map.py",
+]
+# Slower, spawn interpreters or open local sockets
+EXTRA_SUITES = [
+    "bench_startup.py",
+    "bench_end_to_end.py",
+    "bench_video_stream.py",
+    "bench_reconnect.py",
+    "bench_gateway.py",
+    "bench_vision.py",
+    "bench_control_loop.py",
+    "bench_video_recorder.py",
+]
+
+
+def run_suite(script):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, os.path.join(HERE, script), "--json", path],
+                              env=env, cwd=HERE, timeout=1800)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{script} exited with {proc.returncode}")
+        with open(path) as f:
+            payload = json.load(f)
+        payload["wall_s"] = time.perf_counter() - start
+        return payload
+    finally:
+        os.remove(path)
+
+
+def compare(current, baseline, threshold):
+    """Prints per-benchmark ns/item changes, returns the names that regressed"""
+    regressions = []
+    print(f"\n{'benchmark':<64}{'baseline':>12}{'current':>12}{'change':>9}")
+    for suite, payload in current["suites"].items():
+        base_suite = baseline.get("suites", {}).get(suite)
+        if base_suite is None:
+            continue
+        base = {r["name"]: r for r in base_suite["results"]}
+        for result in payload["results"]:
+            old = base.get(result["name"], {}).get("ns_per_item")
+            new = result.get("ns_per_item")
+            if old is None or new is None or old <= 0:
+                continue
+            change = new / old - 1.0
+            flag = "  <-- slower" if change > threshold else ""
+            name = f"{suite}: {result['name']}"
+            print(f"{name[:63]:<64}{old:>12.1f}{new:>12.1f}{change:>+9.1%}{flag}")
+            if flag:
+                regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all dashboard benchmarks headless")
+    parser.add_argument("--out", default="bench_results.json", help="combined results file")
+    parser.add_argument("--all", action="store_true", help="also run the startup and end-to-end suites")
+    parser.add_argument("--only", nargs="+", metavar="SCRIPT", help="run only these scripts")
+    parser.add_argument("--baseline", help="earlier --out file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="fractional ns/item increase counted as a regression (default 0.25)")
+    args = parser.parse_args()
+
+    scripts = args.only or SUITES + (EXTRA_SUITES if args.all else [])
+    combined = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "suites": {},
+    }
+    for script in scripts:
+        print(f"\n=== {script}")
+        payload = run_suite(script)
+        combined["suites"][payload.get("suite", script)] = payload
+
+    with open(args.out, "w") as f:
+        json.dump(combined, f, indent=2)
+    print(f"\nSaved {len(combined['suites'])} suites to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(combined, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
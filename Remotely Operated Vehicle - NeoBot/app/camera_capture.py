@@ -0,0 +1,208 @@
+# camera_capture.py
+
+import threading
+import time
+
+import cv2
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QImage
+
+# Qt >= 5.14 can display OpenCV's BGR order directly, saving the cvtColor pass
+HAS_BGR888 = hasattr(QImage, "Format_BGR888")
+
+
+def convert_frame(frame, size):
+    """Resizes a BGR camera frame and converts it to a QImage that owns its pixels.
+
+    Allocates three full frames per call; the capture loop uses FramePool.
+    """
+    w, h = size
+    frame = cv2.resize(frame, (w, h))
+    rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    # copy() detaches the QImage from the NumPy buffer before it crosses threads
+    return QImage(rgb_image.data, w, h, 3 * w, QImage.Format_RGB888).copy()
+
+
+class FrameBuffer:
+    """A preallocated frame and the QImage wrapping its memory (no copy)"""
+
+    __slots__ = ("pool", "array", "image", "timestamp")
+
+    def __init__(self, pool, width, height):
+        self.pool = pool
+        self.array = np.empty((height, width, 3), dtype=np.uint8)
+        fmt = QImage.Format_BGR888 if HAS_BGR888 else QImage.Format_RGB888
+        # Valid only while self.array is alive, which the buffer guarantees
+        self.image = QImage(self.array.data, width, height, 3 * width, fmt)
+        self.timestamp = 0.0
+
+    def release(self):
+        self.pool.release(self)
+
+
+class FramePool:
+    """Fixed set of frame buffers shared by the capture thread and the GUI.
+
+    At any time one buffer is on screen, one waits in the LatestFrameSlot
+    and one is being written, so three buffers mean the capture loop never
+    allocates. Buffers go back to the pool when the GUI replaces them or when
+    a newer frame supersedes them in the slot.
+    """
+
+    def __init__(self, size, count=3):
+        self.size = size
+        w, h = size
+        self._lock = threading.Lock()
+        self._free = [FrameBuffer(self, w, h) for _ in range(count)]
+        self._scratch = None if HAS_BGR888 else np.empty((h, w, 3), dtype=np.uint8)
+
+    def acquire(self):
+        with self._lock:
+            return self._free.pop() if self._free else None
+
+    def release(self, buf):
+        with self._lock:
+            self._free.append(buf)
+
+    def convert(self, frame, buf):
+        """Resizes frame straight into buf (and swaps to RGB if Qt lacks BGR888)"""
+        if HAS_BGR888:
+            cv2.resize(frame, self.size, dst=buf.array)
+        else:
+            cv2.resize(frame, self.size, dst=self._scratch)
+            cv2.cvtColor(self._scratch, cv2.COLOR_BGR2RGB, dst=buf.array)
+        buf.timestamp = time.time()
+        return buf
+
+
+class LatestFrameSlot:
+    """Single-slot frame buffer: a new frame replaces the one not yet taken"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._item = None
+        self.dropped = 0
+
+    def put(self, item):
+        """Stores item and returns (was_empty, replaced item or None)"""
+        with self._lock:
+            replaced = self._item
+            if replaced is not None:
+                self.dropped += 1
+            self._item = item
+            return replaced is None, replaced
+
+    def take(self):
+        with self._lock:
+            item = self._item
+            self._item = None
+            return item
+
+    def pending(self):
+        """True while an item waits to be taken (a hint, the consumer may take it any moment)"""
+        return self._item is not None
+
+
+class CaptureWorker(QThread):
+    """Grabs and resizes camera frames off the GUI thread into pooled buffers.
+
+    The GUI takes FrameBuffers with latest_frame() and must release() each
+    one once it is no longer displayed.
+    """
+
+    frame_available = pyqtSignal()
+    camera_opened = pyqtSignal(int, bool)  # index, success
+
+    RETRY_INTERVAL = 1.0
+
+    def __init__(self, index=0, size=(310, 220), parent=None):
+        super().__init__(parent)
+        self.slot = LatestFrameSlot()
+        self._requested_index = index
+        self._size = size
+        self._running = True
+        self._pool = None
+        self.analyzer = None  # Optional DetectorPool, offered every decoded frame
+        self.recorder = None  # Optional VideoRecorder, likewise
+        self.capture_fps = 0.0
+        # Frame counters, read by the panel's rate display
+        self.received = 0
+        self.decoded = 0
+
+    # --- Called from the GUI thread
+
+    def change_camera(self, index):
+        # The worker notices the new index on its next iteration and reopens there,
+        # so a slow VideoCapture() never runs on the GUI thread.
+        self._requested_index = index
+
+    def set_target_size(self, width, height):
+        self._size = (int(width), int(height))
+
+    def latest_frame(self):
+        return self.slot.take()
+
+    def stop(self):
+        self._running = False
+        self.wait()
+
+    # --- Worker thread
+
+    def deliver(self, frame):
+        """Converts a decoded BGR frame into a pooled buffer and offers it to the GUI"""
+        analyzer = self.analyzer
+        if analyzer is not None:
+            analyzer.submit(frame)  # Skips it unless due and a worker slot is free
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.submit(frame)  # Copies it into a free slot, or skips it
+        if self._pool is None or self._pool.size != self._size:
+            self._pool = FramePool(self._size)  # Old buffers are simply dropped by the GUI
+        buf = self._pool.acquire()
+        if buf is None:
+            return  # GUI still holds every buffer, skip this frame
+        self._pool.convert(frame, buf)
+
+        was_empty, replaced = self.slot.put(buf)
+        if replaced is not None:
+            replaced.release()
+        if was_empty:
+            self.frame_available.emit()
+
+    def run(self):
+        cap = None
+        index = None
+        last_time = time.time()
+        read_buf = None  # Reused by cap.read() while the camera resolution stays the same
+
+        while self._running:
+            if index != self._requested_index:
+                if cap is not None:
+                    cap.release()
+                index = self._requested_index
+                cap = cv2.VideoCapture(index)
+                self.camera_opened.emit(index, cap.isOpened())
+
+            if not cap.isOpened():
+                time.sleep(self.RETRY_INTERVAL)
+                index = None  # Retry the open on the next pass
+                continue
+
+            ret, frame = cap.read(read_buf)
+            if not ret:
+                time.sleep(0.01)
+                continue
+            read_buf = frame
+            self.received += 1
+            self.decoded += 1
+            self.deliver(frame)
+
+            current_time = time.time()
+            dt = current_time - last_time
+            if dt > 0:
+                self.capture_fps = 1.0 / dt
+            last_time = current_time
+
+        if cap is not None:
+            cap.release()
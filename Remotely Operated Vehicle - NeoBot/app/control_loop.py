@@ -0,0 +1,370 @@
+# control_loop.py
+#
+# Host-side assisted driving. A fixed-rate loop on its own thread combines
+# the operator's command with pluggable behaviours (stop before an obstacle,
+# hold the heading while driving straight) and hands the result to the
+# teleop channel, only when it changes. Sensor inputs are kept up to date
+# on the MQTT network thread, so neither the inputs nor the loop wait for
+# the GUI or the ingest queue. No Qt here.
+
+import math
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+from instrumentation import metrics
+from telemetry import TOPIC_DISTANCE, TOPIC_IMU_GYRO, TOPIC_TELEMETRY, parse_payload
+from telemetry_frame import FrameError, decode_frame
+from topic_router import canonical_topic
+
+STOP = "STP"
+FRAME_TIMEOUT = 5.0  # s without binary frames before text distance/gyro topics are used
+MAX_GYRO_STEP = 0.5  # s; longer gaps between gyro readings are not integrated
+
+# Latest readings of one robot, host clock. heading integrates gyro z (rad, CCW positive)
+# since the robot was first seen; only its changes mean anything.
+ControlInputs = namedtuple("ControlInputs", ["distance", "distance_t", "gyro_z", "heading", "gyro_t"])
+NO_INPUTS = ControlInputs(None, 0.0, 0.0, 0.0, 0.0)
+
+# One arbitration outcome the dashboard logs: behaviour took over (or let go) at t
+ControlEvent = namedtuple("ControlEvent", ["t", "behaviour", "operator", "command", "detail"])
+
+
+class SensorFeed:
+    """Per-robot ControlInputs, updated from raw MQTT messages.
+
+    on_message() is a MQTTClient raw listener: it runs on the network
+    thread for every message, so it ignores everything but frames, distance
+    and gyro. Each update swaps in a new immutable ControlInputs, so the
+    control thread reads a consistent snapshot without a lock.
+    """
+
+    def __init__(self):
+        self.latest = {}
+        self.last_frame = {}
+
+    def inputs(self, robot):
+        return self.latest.get(robot, NO_INPUTS)
+
+    def on_message(self, topic, payload, t):
+        topic, robot = canonical_topic(topic)
+        if topic == TOPIC_TELEMETRY:
+            try:
+                frame = decode_frame(payload)
+            except FrameError:
+                return
+            self.last_frame[robot] = t
+            self.update(robot, t, frame.distance, frame.gyro[2])
+        elif topic == TOPIC_DISTANCE or topic == TOPIC_IMU_GYRO:
+            if t - self.last_frame.get(robot, -math.inf) < FRAME_TIMEOUT:
+                return  # Frames carry the same readings
+            text = payload if isinstance(payload, str) else payload.decode(errors="replace")
+            value = parse_payload(topic, text)
+            if topic == TOPIC_DISTANCE and isinstance(value, (int, float)):
+                self.update(robot, t, distance=value)
+            elif topic == TOPIC_IMU_GYRO and isinstance(value, list):
+                self.update(robot, t, gyro_z=value[2])
+
+    def update(self, robot, t, distance=None, gyro_z=None):
+        current = self.latest.get(robot, NO_INPUTS)
+        if distance is not None:
+            current = current._replace(distance=distance, distance_t=t)
+        if gyro_z is not None:
+            dt = t - current.gyro_t
+            heading = current.heading + gyro_z * dt if 0 < dt <= MAX_GYRO_STEP else current.heading
+            current = current._replace(gyro_z=gyro_z, heading=heading, gyro_t=t)
+        self.latest[robot] = current
+
+
+class Behaviour:
+    """A control behaviour: update() returns the command it wants instead of `command`, or None.
+
+    update() is called on every tick with the operator's command, so a
+    behaviour can track state even while a higher-priority one is in charge.
+    detail is shown in the log when the behaviour takes over. blind is True
+    while the behaviour should act but its readings are too old to.
+    """
+
+    name = "behaviour"
+    detail = ""
+    blind = False
+
+    def reset(self):
+        pass
+
+    def update(self, command, inputs, now):
+        return None
+
+
+class StopBeforeObstacle(Behaviour):
+    """Turns FWD into STP while the obstacle ahead is closer than stop_cm.
+
+    The reading is aged: the robot keeps moving at speed_cm_s while the
+    reading travels to the host and the STP travels back (reaction_s). The
+    robot is released again beyond release_cm. Readings of 0 (no echo) mean
+    nothing in range. Readings older than max_age keep a stop in place (the
+    obstacle may still be there) but never start one, like the dashboard
+    without this loop; the behaviour is blind then. That needs distance at
+    several Hz: the firmware's 10 Hz frames, not its 0.5 Hz text topics.
+    """
+
+    name = "stop-before-obstacle"
+
+    def __init__(self, stop_cm=25.0, release_cm=35.0, speed_cm_s=40.0, reaction_s=0.1, max_age=0.5):
+        self.stop_cm = stop_cm
+        self.release_cm = release_cm
+        self.speed_cm_s = speed_cm_s
+        self.reaction_s = reaction_s
+        self.max_age = max_age
+        self.blocked = False
+
+    def reset(self):
+        self.blocked = False
+
+    def update(self, command, inputs, now):
+        age = now - inputs.distance_t
+        self.blind = False
+        if command != "FWD":
+            self.blocked = False
+            return None
+        if inputs.distance is None or age > self.max_age:
+            self.blind = True
+            return STOP if self.blocked else None
+        if inputs.distance <= 0:
+            self.blocked = False
+            return None
+        ahead = inputs.distance - self.speed_cm_s * (age + self.reaction_s)
+        self.blocked = ahead < (self.release_cm if self.blocked else self.stop_cm)
+        if self.blocked:
+            self.detail = f"{inputs.distance:.0f} cm ahead"
+            return STOP
+        return None
+
+
+class HeadingHold(Behaviour):
+    """Keeps FWD/BWD on the heading they started with, using the integrated gyro.
+
+    The drive commands have no steering, so a drift beyond deadband_deg is
+    corrected with short LFT/RHT turns until it is back within release_deg.
+    """
+
+    name = "heading-hold"
+
+    def __init__(self, deadband_deg=6.0, release_deg=2.0, max_age=0.5):
+        self.deadband = math.radians(deadband_deg)
+        self.release = math.radians(release_deg)
+        self.max_age = max_age
+        self.target = None
+        self.correction = None
+
+    def reset(self):
+        self.target = None
+        self.correction = None
+
+    def update(self, command, inputs, now):
+        driving = command in ("FWD", "BWD")
+        self.blind = driving and now - inputs.gyro_t > self.max_age
+        if not driving or self.blind:
+            self.reset()
+            return None
+        if self.target is None:
+            self.target = inputs.heading
+        error = math.remainder(self.target - inputs.heading, 2 * math.pi)  # > 0: turned right of target
+        if abs(error) < (self.release if self.correction else self.deadband):
+            self.correction = None
+            return None
+        self.correction = "LFT" if error > 0 else "RHT"
+        self.detail = f"{math.degrees(error):+.0f} deg off"
+        return self.correction
+
+
+# Priority order: the first behaviour that overrides the operator wins
+BEHAVIOURS = {"stop": StopBeforeObstacle, "heading": HeadingHold}
+
+
+def build_behaviours(names):
+    """Behaviour instances for names such as ["heading", "stop"], in priority order"""
+    unknown = set(names) - set(BEHAVIOURS)
+    if unknown:
+        raise ValueError(f"unknown behaviour(s): {', '.join(sorted(unknown))}")
+    return [cls() for name, cls in BEHAVIOURS.items() if name in names]
+
+
+class ControlLoop:
+    """Fixed-rate arbitration between the operator and behaviours, on its own thread.
+
+    Every 1/rate_hz the loop reads the target robot's ControlInputs, runs
+    every behaviour and sends the command of the first one (list order is
+    priority) that overrides the operator, or the operator's own command.
+    output(command) is only called when that result changes. An operator
+    change wakes the loop at once, so manual STP never waits for a tick,
+    without moving the tick schedule.
+
+    Ticks are scheduled on absolute deadlines. Jitter is how late a tick
+    starts. An overrun is a tick that ends after the next deadline; the
+    deadlines it covered are skipped (counted as missed), not run back to
+    back.
+
+    A thread waking from its deadline still has to get the GIL from
+    whichever thread holds it, by default after up to 5 ms of pure Python
+    on the GUI thread. switch_interval lowers the interpreter's switch
+    interval while the loop runs (it is process-wide, None leaves it).
+    """
+
+    def __init__(self, feed, output, behaviours=(), rate_hz=50.0, robot="neobot", history=100,
+                 switch_interval=0.001):
+        self.feed = feed
+        self.output = output
+        self.behaviours = list(behaviours)
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.robot = robot
+
+        self.operator = STOP
+        self.command = STOP
+        self.active = None  # Behaviour currently overriding the operator
+        self.blind = set()  # Behaviours whose readings are too old to act on
+        self.events = deque(maxlen=history)
+
+        self.ticks = 0
+        self.wakeups = 0  # Extra evaluations for operator changes
+        self.overruns = 0
+        self.missed = 0
+        self.commands = 0
+        self.overrides = {b.name: 0 for b in self.behaviours}
+        self.jitter = metrics.histogram("control.jitter")
+        self.tick_time = metrics.histogram("control.tick")
+        self.max_jitter = 0.0
+
+        self._saved_switch_interval = None
+        if switch_interval is not None and sys.getswitchinterval() > switch_interval:
+            self._saved_switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(switch_interval)
+
+        self._cond = threading.Condition()
+        self._wake = False
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="control-loop", daemon=True)
+        self._thread.start()
+
+    # --- UI side
+
+    def set_operator(self, command):
+        with self._cond:
+            if command != self.operator:
+                self.operator = command
+                self._wake = True
+                self._cond.notify()
+
+    def retarget(self, robot):
+        """Drives robot from now on; the operator command is reset to STP"""
+        with self._cond:
+            self.robot = robot
+            self.operator = STOP
+            self.command = STOP
+            self.active = None
+            self.blind = set()
+            for behaviour in self.behaviours:
+                behaviour.reset()
+
+    def take_events(self):
+        events = []
+        while self.events:
+            events.append(self.events.popleft())
+        return events
+
+    def stats(self):
+        return {
+            "rate_hz": self.rate_hz,
+            "ticks": self.ticks,
+            "wakeups": self.wakeups,
+            "overruns": self.overruns,
+            "missed": self.missed,
+            "commands": self.commands,
+            "active": self.active,
+            "blind": sorted(self.blind),
+            "overrides": dict(self.overrides),
+            "max_jitter_ms": self.max_jitter * 1000,
+            "jitter": self.jitter.summary(),
+            "tick": self.tick_time.summary(),
+        }
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+        if self._saved_switch_interval is not None:
+            sys.setswitchinterval(self._saved_switch_interval)
+            self._saved_switch_interval = None
+
+    # --- Loop thread
+
+    def _run(self):
+        perf_counter = time.perf_counter
+        deadline = perf_counter()
+        with self._cond:
+            while self._running:
+                wait = deadline - perf_counter()
+                if wait > 0 and not self._wake:
+                    self._cond.wait(wait)
+                    continue
+                if self._wake and perf_counter() < deadline:
+                    self._wake = False
+                    self.wakeups += 1
+                    self._evaluate()
+                    continue
+
+                start = perf_counter()
+                late = start - deadline
+                self.jitter.record(late)
+                if late > self.max_jitter:
+                    self.max_jitter = late
+                self._wake = False
+                self.ticks += 1
+                self._evaluate()
+                end = perf_counter()
+                self.tick_time.record(end - start)
+
+                deadline += self.period
+                if end > deadline:
+                    self.overruns += 1
+                    skipped = int((end - deadline) / self.period) + 1
+                    self.missed += skipped
+                    deadline += skipped * self.period
+
+    def _evaluate(self):
+        now = time.time()  # Inputs carry host wall-clock receive times
+        inputs = self.feed.inputs(self.robot)
+        operator = self.operator
+        command = operator
+        active = None
+        for behaviour in self.behaviours:
+            wanted = behaviour.update(operator, inputs, now)
+            if active is None and wanted is not None and wanted != operator:
+                command = wanted
+                active = behaviour
+
+        name = active.name if active is not None else None
+        if name != self.active:
+            if active is not None:
+                self.overrides[name] += 1
+                self.events.append(ControlEvent(now, name, operator, command, active.detail))
+            else:
+                self.events.append(ControlEvent(now, self.active, operator, command, "released"))
+            self.active = name
+        for behaviour in self.behaviours:
+            if behaviour.blind != (behaviour.name in self.blind):
+                # Logged once per change: the operator drives without this assist until readings return
+                if behaviour.blind:
+                    self.blind.add(behaviour.name)
+                else:
+                    self.blind.discard(behaviour.name)
+                self.events.append(ControlEvent(now, behaviour.name, operator, command,
+                                                "stale" if behaviour.blind else "fresh"))
+        if command != self.command:
+            self.command = command
+            self.commands += 1
+            # TeleopChannel.set_command only takes its own lock and notifies
+            self.output(command)
@@ -0,0 +1,75 @@
+# fleet.py
+
+import time
+
+from orientation import ComplementaryFilter, quaternion_to_euler
+from telemetry_frame import SequenceTracker
+
+
+class RobotState:
+    """Everything the dashboard tracks for one robot, without any widgets.
+
+    The selected robot's panels are fed from the dispatcher; the others only
+    keep their latest readings and orientation here, which is a few hundred
+    bytes plus the filter state per robot.
+    """
+
+    __slots__ = (
+        "robot_id", "latest", "messages", "first_seen", "last_seen",
+        "orientation_filter", "orientation_clock", "orientation",
+        "latest_accel", "last_frame_time", "frame_sequence",
+    )
+
+    def __init__(self, robot_id):
+        self.robot_id = robot_id
+        self.latest = {}  # canonical topic -> latest parsed value
+        self.messages = 0
+        self.first_seen = time.time()
+        self.last_seen = 0.0
+        self.orientation_filter = ComplementaryFilter()
+        self.orientation_clock = None
+        self.orientation = [0.0, 0.0, 0.0]  # yaw, pitch, roll
+        self.latest_accel = None
+        self.last_frame_time = 0.0
+        self.frame_sequence = SequenceTracker()
+
+    def update(self, topic, value, t):
+        self.latest[topic] = value
+        self.last_seen = t
+
+    def fuse_imu(self, accel, gyro, t, clock):
+        if clock != self.orientation_clock:
+            # Host and device timestamps are not comparable, restart the time base
+            self.orientation_filter.last_t = None
+            self.orientation_clock = clock
+        q = self.orientation_filter.update(accel, gyro, t)
+        roll, pitch, yaw = quaternion_to_euler(q)
+        self.orientation = [float(yaw), float(pitch), float(roll)]
+
+    def message_rate(self, now=None):
+        """Average messages per second since the robot was first seen"""
+        now = time.time() if now is None else now
+        elapsed = now - self.first_seen
+        return self.messages / elapsed if elapsed > 0 else 0.0
+
+
+class Fleet:
+    """robot id -> RobotState, created on the first message from a robot"""
+
+    def __init__(self, on_robot_added=None):
+        self.robots = {}
+        self.on_robot_added = on_robot_added
+
+    def __len__(self):
+        return len(self.robots)
+
+    def __iter__(self):
+        return iter(self.robots.values())
+
+    def get(self, robot_id):
+        state = self.robots.get(robot_id)
+        if state is None:
+            state = self.robots[robot_id] = RobotState(robot_id)
+            if self.on_robot_added is not None:
+                self.on_robot_added(robot_id)
+        return state
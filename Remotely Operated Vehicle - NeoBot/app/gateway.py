@@ -0,0 +1,497 @@
+# gateway.py
+#
+# Headless telemetry gateway: one broker connection and one asyncio loop
+# fanning the latest state of every robot out to many WebSocket and
+# Server-Sent Events viewers. Reuses the dashboard's transport, parsing,
+# orientation fusion and derived channels, without importing Qt, OpenCV or
+# OpenGL.
+#
+#   python gateway.py --broker 127.0.0.1 --http-port 8765
+#
+#   ws://host:8765/ws[?robot=neobot]      one "snapshot" message, then "delta" messages
+#   http://host:8765/events[?robot=...]   the same as text/event-stream
+#   http://host:8765/state                current snapshot (JSON)
+#   http://host:8765/stats                gateway counters (JSON)
+#   http://host:8765/                     minimal live viewer page
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import socket
+import struct
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlsplit
+
+from fleet import RobotState
+from instrumentation import metrics
+from mqtt_ingest import parse_message
+from mqtt_transport import DEFAULT_BROKER, DEFAULT_PORT, AsyncMqttTransport
+from stream_stats import CHANNEL_TOPICS, StreamProcessor
+from telemetry import DERIVED_TOPICS, TOPIC_IMU_ACCEL, TOPIC_IMU_GYRO, TOPIC_LOG, TOPIC_TELEMETRY
+from telemetry_frame import FRAME_TOPICS, frame_to_topics
+
+# Telemetry only; camera JPEGs and command acks stay with the dashboards
+GATEWAY_SUBSCRIPTIONS = ["roboai/+/sensor/#", "roboai/+/telemetry", "roboai/+/log"]
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_TEXT, WS_CLOSE, WS_PING, WS_PONG = 0x1, 0x8, 0x9, 0xA
+MAX_CLIENT_FRAME = 4096  # Viewers only send control frames
+WS, SSE = 0, 1  # Client kinds, index into the per-update encodings
+FRAME_FUSION_TIMEOUT = 5.0  # s without binary frames before per-sensor text topics are used and fused
+HEARTBEAT_INTERVAL = 15.0  # Keeps idle connections alive through proxies
+# Per-client kernel send buffer. Autotuning would let a stalled viewer sit on
+# megabytes of old deltas before drain() pushes back and the queue resyncs it.
+SEND_BUFFER = 64 * 1024
+
+
+def ws_frame(payload, opcode=WS_TEXT):
+    """Unmasked server-to-client frame"""
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+def unmask(data, mask):
+    n = len(data)
+    key = int.from_bytes((mask * (n // 4 + 1))[:n], "big")
+    return (int.from_bytes(data, "big") ^ key).to_bytes(n, "big")
+
+
+def encode_update(message):
+    """(WebSocket frame, SSE event) for one JSON message, encoded once for every client"""
+    payload = json.dumps(message, separators=(",", ":")).encode()
+    return ws_frame(payload), b"data: " + payload + b"\n\n"
+
+
+def http_response(writer, status, content_type, body):
+    writer.write(
+        f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+        f"Cache-Control: no-cache\r\nConnection: close\r\n\r\n".encode() + body
+    )
+
+
+class RobotView:
+    """Latest JSON-ready values of one robot and the keys changed since the last tick"""
+
+    __slots__ = ("state", "values", "dirty", "seq")
+
+    def __init__(self, robot_id):
+        self.state = RobotState(robot_id)  # Orientation filter and frame sequence, as in the dashboard
+        self.values = {}
+        self.dirty = set()
+        self.seq = 0
+
+    def set(self, key, value):
+        if self.values.get(key, self) != value:
+            self.values[key] = value
+            self.dirty.add(key)
+
+
+class Client:
+    """One viewer connection with a bounded queue of encoded updates.
+
+    A client that falls max_queue updates behind has its queued deltas
+    replaced by one fresh snapshot instead of reading a backlog of stale
+    ones. One that keeps falling behind is disconnected.
+    """
+
+    __slots__ = ("writer", "kind", "robot", "queue", "ready", "overflows", "last_overflow", "sent", "closed")
+
+    def __init__(self, writer, kind, robot):
+        self.writer = writer
+        self.kind = kind
+        self.robot = robot  # None: every robot
+        self.queue = deque()
+        self.ready = asyncio.Event()
+        self.overflows = 0
+        self.last_overflow = 0.0
+        self.sent = 0
+        self.closed = False
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.ready.set()
+            self.writer.transport.abort()  # Never wait for a stuck socket to flush
+
+
+class Gateway:
+    """Broker -> latest state per robot -> delta updates for every viewer.
+
+    MQTT messages are only queued when they arrive. Every tick parses the
+    queued ones, updates the per-robot views and derived channels, then sends
+    each changed robot's delta: JSON-encoded and framed once, appended to
+    every subscribed client's queue. Each client has its own sender task,
+    so one slow socket never delays the others.
+    """
+
+    def __init__(self, broker=DEFAULT_BROKER, port=DEFAULT_PORT, rate_hz=10.0, max_queue=32,
+                 max_overflows=3, pending_capacity=100_000):
+        self.interval = 1.0 / rate_hz
+        self.max_queue = max_queue
+        self.max_overflows = max_overflows
+        self.robots = {}
+        self.clients = set()
+        self.pending = deque()
+        self.pending_capacity = pending_capacity
+        self.stream = StreamProcessor()
+        self.transport = AsyncMqttTransport(broker, port, GATEWAY_SUBSCRIPTIONS, self.on_mqtt_message,
+                                            on_state=self.on_mqtt_state)
+        self.snapshots = {}  # robot filter -> encoded snapshot, valid for one tick
+        self.last_heartbeat = time.monotonic()
+        self.tick_time = metrics.histogram("gateway.tick")
+
+        self.received = 0
+        self.overrun = 0
+        self.ticks = 0
+        self.updates = 0
+        self.accepted = 0
+        self.resyncs = 0
+        self.dropped = 0
+
+        self._server = None
+        self._tasks = []
+
+    # --- MQTT side (loop thread)
+
+    def on_mqtt_message(self, client, userdata, msg):
+        if len(self.pending) >= self.pending_capacity:
+            self.pending.popleft()
+            self.overrun += 1
+        self.pending.append((msg.topic, msg.payload, time.time()))
+        self.received += 1
+
+    def on_mqtt_state(self, state):
+        self.snapshots.clear()
+        self.broadcast(encode_update({"type": "broker", "state": state}))
+
+    def view(self, robot_id):
+        view = self.robots.get(robot_id)
+        if view is None:
+            view = self.robots[robot_id] = RobotView(robot_id)
+        return view
+
+    def apply(self, message):
+        view = self.view(message.robot)
+        state = view.state
+        state.messages += 1
+        state.last_seen = message.received_at
+        topic, value = message.topic, message.value
+        if value is None:
+            return
+        if topic == TOPIC_TELEMETRY:
+            state.last_frame_time = time.time()
+            state.fuse_imu(value.accel, value.gyro, value.timestamp_ms / 1000.0, clock="device")
+            state.frame_sequence.update(value.seq)
+            for reading_topic, reading in frame_to_topics(value):
+                view.set(CHANNEL_TOPICS[reading_topic], reading)
+            view.set("frame", value.seq)
+            view.set("frames_lost", state.frame_sequence.lost)
+        elif topic in DERIVED_TOPICS:
+            view.set("stats/" + DERIVED_TOPICS[topic], value)
+            return
+        elif topic == TOPIC_LOG:
+            view.set("log", value)
+            return
+        else:
+            key = CHANNEL_TOPICS.get(topic)
+            if key is None:
+                return
+            if topic in FRAME_TOPICS and time.time() - state.last_frame_time < FRAME_FUSION_TIMEOUT:
+                return  # Already set from this robot's frame
+            view.set(key, value)
+            if topic == TOPIC_IMU_ACCEL:
+                state.latest_accel = value
+            elif topic == TOPIC_IMU_GYRO and state.latest_accel is not None:
+                state.fuse_imu(state.latest_accel, value, message.received_at, clock="host")
+        view.set("orientation", [round(a, 2) for a in state.orientation])
+
+    # --- Fan-out
+
+    def tick(self):
+        start = time.perf_counter()
+        self.ticks += 1
+        if self.pending:
+            raw, self.pending = self.pending, deque()
+            batch = [parse_message(topic, payload, t) for topic, payload, t in raw]
+            batch.extend(self.stream.process(batch))
+            for message in batch:
+                self.apply(message)
+
+        self.snapshots.clear()
+        now = time.time()
+        for robot_id, view in self.robots.items():
+            if not view.dirty:
+                continue
+            view.seq += 1
+            update = encode_update({
+                "type": "delta", "robot": robot_id, "seq": view.seq, "t": now,
+                "values": {key: view.values[key] for key in view.dirty},
+            })
+            view.dirty.clear()
+            self.updates += 1
+            for client in self.clients:
+                if client.robot is None or client.robot == robot_id:
+                    self.offer(client, update)
+
+        if time.monotonic() - self.last_heartbeat > HEARTBEAT_INTERVAL:
+            self.last_heartbeat = time.monotonic()
+            self.broadcast((ws_frame(b"", WS_PING), b": heartbeat\n\n"))
+        self.tick_time.record(time.perf_counter() - start)
+
+    def offer(self, client, update):
+        if client.closed:
+            return
+        if len(client.queue) >= self.max_queue:
+            # Behind by max_queue updates: skip them, the snapshot already contains this one
+            now = time.monotonic()
+            client.overflows = client.overflows + 1 if now - client.last_overflow < 60.0 else 1
+            client.last_overflow = now
+            client.queue.clear()
+            if client.overflows > self.max_overflows:
+                self.dropped += 1
+                client.close()
+                return
+            self.resyncs += 1
+            update = self.snapshot(client.robot)
+        client.queue.append(update[client.kind])
+        client.ready.set()
+
+    def broadcast(self, update):
+        for client in self.clients:
+            self.offer(client, update)
+
+    def snapshot_message(self, robot=None):
+        robots = {robot_id: {"seq": view.seq, "values": view.values}
+                  for robot_id, view in self.robots.items() if robot is None or robot_id == robot}
+        return {"type": "snapshot", "t": time.time(), "broker": self.transport.state, "robots": robots}
+
+    def snapshot(self, robot=None):
+        update = self.snapshots.get(robot)
+        if update is None:
+            update = self.snapshots[robot] = encode_update(self.snapshot_message(robot))
+        return update
+
+    async def ticker(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            next_tick += self.interval
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            self.tick()
+
+    # --- HTTP / WebSocket / SSE
+
+    async def handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 10.0)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        lines = request.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            writer.close()
+            return
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        url = urlsplit(target)
+        robot = parse_qs(url.query).get("robot", [None])[0]
+
+        if method != "GET":
+            http_response(writer, "405 Method Not Allowed", "text/plain", b"GET only\n")
+        elif url.path == "/ws":
+            key = headers.get("sec-websocket-key")
+            if headers.get("upgrade", "").lower() != "websocket" or not key:
+                http_response(writer, "400 Bad Request", "text/plain", b"WebSocket upgrade expected\n")
+            else:
+                accept = base64.b64encode(hashlib.sha1(key.encode() + WS_GUID).digest())
+                writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                             b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+                await self.serve_client(Client(writer, WS, robot), reader, self.read_ws)
+                return
+        elif url.path == "/events":
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                         b"Access-Control-Allow-Origin: *\r\n\r\n")
+            await self.serve_client(Client(writer, SSE, robot), reader, self.read_until_eof)
+            return
+        elif url.path == "/state":
+            http_response(writer, "200 OK", "application/json",
+                          json.dumps(self.snapshot_message(robot)).encode())
+        elif url.path == "/stats":
+            http_response(writer, "200 OK", "application/json", json.dumps(self.stats()).encode())
+        elif url.path == "/":
+            http_response(writer, "200 OK", "text/html; charset=utf-8", VIEWER_HTML)
+        else:
+            http_response(writer, "404 Not Found", "text/plain", b"not found\n")
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def serve_client(self, client, reader, watch):
+        sock = client.writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        client.writer.transport.set_write_buffer_limits(high=SEND_BUFFER)
+        self.accepted += 1
+        self.clients.add(client)
+        self.offer(client, self.snapshot(client.robot))
+        watcher = asyncio.get_running_loop().create_task(watch(client, reader))
+        writer = client.writer
+        try:
+            while not client.closed:
+                await client.ready.wait()
+                client.ready.clear()
+                while client.queue and not client.closed:
+                    writer.write(client.queue.popleft())
+                    client.sent += 1
+                    await writer.drain()  # Waits while the socket buffer is over its high-water mark
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(client)
+            watcher.cancel()
+            client.close()
+
+    async def read_until_eof(self, client, reader):
+        try:
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        client.close()
+
+    async def read_ws(self, client, reader):
+        """Answers pings and closes; viewers choose robots with ?robot=, not with messages"""
+        try:
+            while True:
+                head = await reader.readexactly(2)
+                opcode, length = head[0] & 0x0F, head[1] & 0x7F
+                if length == 126:
+                    length, = struct.unpack("!H", await reader.readexactly(2))
+                elif length == 127:
+                    length, = struct.unpack("!Q", await reader.readexactly(8))
+                if length > MAX_CLIENT_FRAME:
+                    break
+                mask = await reader.readexactly(4) if head[1] & 0x80 else None
+                data = await reader.readexactly(length)
+                if mask is not None:
+                    data = unmask(data, mask)
+                if opcode == WS_CLOSE:
+                    client.writer.write(ws_frame(data[:2], WS_CLOSE))
+                    break
+                if opcode == WS_PING:
+                    client.writer.write(ws_frame(data, WS_PONG))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        client.close()
+
+    # --- Lifecycle
+
+    async def start(self, host="127.0.0.1", port=8765):
+        loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self.handle, host, port)
+        self._tasks = [loop.create_task(self.transport.run()), loop.create_task(self.ticker())]
+        return self._server
+
+    @property
+    def http_port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self, timeout=2.0):
+        """Closes viewers and the server, then lets the transport disconnect from the broker"""
+        run_task, ticker = self._tasks
+        ticker.cancel()
+        for client in list(self.clients):
+            client.close()
+        self._server.close()
+        self.transport.stop()  # Only asks run() to end on this loop; nothing to join here
+        try:
+            await asyncio.wait_for(run_task, timeout)  # Cancels it if the broker does not let go
+        except asyncio.TimeoutError:
+            pass
+
+    def stats(self):
+        kinds = [client.kind for client in self.clients]
+        return {
+            "broker": self.transport.status(),
+            "robots": len(self.robots),
+            "clients": {"ws": kinds.count(WS), "sse": kinds.count(SSE)},
+            "accepted": self.accepted,
+            "dropped": self.dropped,
+            "resyncs": self.resyncs,
+            "mqtt_received": self.received,
+            "mqtt_overrun": self.overrun,
+            "ticks": self.ticks,
+            "updates": self.updates,
+            "tick": self.tick_time.summary(),
+            "derived": self.stream.stats(),
+        }
+
+
+VIEWER_HTML = b"""<!doctype html>
+<meta charset="utf-8"><title>NeoBot gateway</title>
+<style>body { font: 13px monospace; background: #102A43; color: white; }</style>
+<pre id="out">connecting...</pre>
+<script>
+const robots = {};
+const ws = new WebSocket(`ws://${location.host}/ws${location.search}`);
+ws.onmessage = (event) => {
+  const m = JSON.parse(event.data);
+  if (m.type === "snapshot") {
+    for (const [id, robot] of Object.entries(m.robots)) robots[id] = robot.values;
+  } else if (m.type === "delta") {
+    Object.assign(robots[m.robot] ??= {}, m.values);
+  } else {
+    return;
+  }
+  out.textContent = JSON.stringify(robots, null, 1);
+};
+ws.onclose = () => { out.textContent += "\\n(disconnected)"; };
+</script>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless telemetry gateway (WebSocket / SSE fan-out)")
+    parser.add_argument("--broker", default=DEFAULT_BROKER,
+                        help="MQTT broker host (default: $NEOBOT_BROKER or broker.hivemq.com)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="MQTT broker port")
+    parser.add_argument("--http-host", default="127.0.0.1", help="address viewers connect to (0.0.0.0 for all)")
+    parser.add_argument("--http-port", type=int, default=8765, help="0 picks a free port")
+    parser.add_argument("--rate", type=float, default=10.0, help="delta updates per second")
+    parser.add_argument("--max-queue", type=int, default=32, help="updates a viewer may fall behind before a resync")
+    args = parser.parse_args()
+
+    async def run():
+        gateway = Gateway(args.broker, args.port, rate_hz=args.rate, max_queue=args.max_queue)
+        server = await gateway.start(args.http_host, args.http_port)
+        print(f"Gateway on http://{args.http_host}:{gateway.http_port} (broker {args.broker}:{args.port})", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await gateway.close()  # Also on Ctrl+C, so the broker sees a DISCONNECT
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# instrumentation.py
+
+import functools
+import json
+import os
+import platform
+import sys
+import time
+from bisect import bisect_left
+
+# Log-spaced bucket upper bounds, 1 µs .. ~100 s, 10 buckets per decade.
+# Every histogram is this many ints no matter how many samples it sees.
+BUCKET_BOUNDS = [10 ** (i / 10.0) * 1e-6 for i in range(81)]
+
+
+class LatencyHistogram:
+    """Fixed-memory latency histogram with approximate percentiles.
+
+    record() is a bisect plus a few integer updates (no allocation), cheap
+    enough for per-message paths. Percentiles are reported as the upper
+    bound of the bucket they fall in (capped at the max seen), i.e. within
+    ~26% of the true value.
+    Updates are not locked: a sample racing between the network and GUI
+    threads can at worst be miscounted, which is fine for monitoring.
+    """
+
+    __slots__ = ("name", "counts", "count", "total", "max")
+
+    def __init__(self, name):
+        self.name = name
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)  # Last bucket: overflow
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100.0
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                return min(BUCKET_BOUNDS[i], self.max) if i < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def reset(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+def memory_rss_bytes():
+    """Current resident set size, or peak RSS where that is all we can get"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Instrumentation:
+    """Named latency histograms and event counters for the dashboard's hot paths"""
+
+    def __init__(self):
+        self.enabled = True
+        self.histograms = {}
+        self.counters = {}
+        self.started = time.time()
+
+    def histogram(self, name):
+        h = self.histograms.get(name)
+        if h is None:
+            h = self.histograms[name] = LatencyHistogram(name)
+        return h
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.histogram(name).record(seconds)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def timed(self, name):
+        """Decorator recording the wrapped call's duration under name"""
+        def decorate(fn):
+            hist = self.histogram(name)
+            perf_counter = time.perf_counter
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    hist.record(perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        for h in self.histograms.values():
+            h.reset()
+        self.counters = {name: 0 for name in self.counters}
+        self.started = time.time()
+
+    def snapshot(self):
+        return {
+            "uptime_s": time.time() - self.started,
+            "rss_bytes": memory_rss_bytes(),
+            "stages": {name: h.summary() for name, h in sorted(self.histograms.items()) if h.count},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def export(self, path, label=None):
+        """Writes a snapshot as JSON for comparing builds offline"""
+        payload = {
+            "label": label,
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "bucket_bounds_s": BUCKET_BOUNDS,
+            "histograms": {name: h.counts for name, h in self.histograms.items() if h.count},
+            **self.snapshot(),
+        }
+        with open(path, "w") as f:
+            json.dump(payload, f, indent=2)
+        return path
+
+
+# Process-wide registry used by the instrumented modules
+metrics = Instrumentation()
+timed = metrics.timed
@@ -2,21 +2,43 @@
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QVBoxLayout, QHBoxLayout,
-    QFrame, QSizePolicy, QSplitter
+    QFrame, QSizePolicy, QSplitter, QComboBox, QPushButton, QStackedWidget
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont
 from panels.sensor_panel import SensorPanel
 from panels.log_panel import LogPanel
-from panels.imu_panel import IMUPanel
-from panels.camera_panel import CameraPanel
 from panels.radar_panel import RadarPanel
 from panels.controller_panel import ControllerPanel
+from panels.map_panel import MapPanel
+from panels.fleet_panel import FleetPanel
+from panels.lazy_panel import LazyPanel
+from panels.perf_panel import EventLoopLagMonitor, PerfPanel
 
-from mqtt_client import MQTTClient
+from mqtt_client import DEFAULT_BROKER, DEFAULT_PORT, MQTTClient
+from mqtt_transport import CONNECTED, CONNECTING, WAITING
+from mqtt_ingest import parse_message
+from control_loop import ControlLoop, SensorFeed, build_behaviours
+from fleet import Fleet
+from occupancy_map import MAP_TOPICS
+from instrumentation import metrics, timed
+from sensor_rules import load_rules
+from telemetry import (
+    DEFAULT_ROBOT_ID, TOPIC_TEMP, TOPIC_HUMIDITY, TOPIC_GAS_AIR, TOPIC_LDR,
+    TOPIC_IMU_ACCEL, TOPIC_IMU_GYRO, TOPIC_DISTANCE, TOPIC_COMMAND, TOPIC_ACK, TOPIC_TELEMETRY,
+    TOPIC_CAMERA, TOPIC_CAMERA_CONFIG, MQTT_SOURCE, DERIVED_TOPICS, derived_topic, robot_topic
+)
+from telemetry_frame import FRAME_TOPICS, frame_to_topics
+from telemetry_dispatcher import TelemetryDispatcher
+from telemetry_recorder import RecordingReader, TelemetryRecorder
+from telemetry_replay import ReplayPlayer
+from teleop import TeleopChannel
+from timeseries_buffer import TimeSeriesStore
 
 
+import argparse
 import sys
+import time
 
 
 class Card(QFrame):
@@ -41,7 +63,11 @@ class Card(QFrame):
         self.setLayout(layout)
 
 class RobotControlUI(QWidget):
-    def __init__(self):
+    FRAME_FUSION_TIMEOUT = 5.0  # s without binary frames before per-sensor text topics are used and fused
+
+    def __init__(self, connect_mqtt=True, broker_ip=DEFAULT_BROKER, port=DEFAULT_PORT, lazy_panels=True,
+                 video_source=1, rules_path=None, vision_workers=0, assist=("stop",), control_rate=50.0,
+                 record_video=None, video_max_bytes=2 * 1024 ** 3):
         super().__init__()
         self.setWindowTitle("Robot Control UI")
         self.setGeometry(100, 100, 900, 600)
@@ -49,12 +75,40 @@ class RobotControlUI(QWidget):
         self.setStyleSheet("background-color: #102A43;")
 
         # === MQTT ===
-        self.mqtt_client = MQTTClient()
-        self.mqtt_client.message_received.connect(self.handle_mqtt_message)
+        self.mqtt_client = MQTTClient(broker_ip, port, connect=connect_mqtt)
+        self.mqtt_client.batch_ready.connect(self.handle_mqtt_batch)
+        self.mqtt_client.connection_changed.connect(self.on_connection_changed)
+
+        # === Fleet (per-robot state, panels show the selected robot) ===
+        self.fleet = Fleet(on_robot_added=self.add_robot)
+        self.selected_robot = DEFAULT_ROBOT_ID
+
+        # === Teleop (own publisher thread, acks bypass the ingest queue) ===
+        self.teleop = TeleopChannel(self.mqtt_client.publish, robot_topic(TOPIC_COMMAND, self.selected_robot))
+        self.mqtt_client.add_direct_listener(
+            robot_topic(TOPIC_ACK, "+"), lambda topic, payload: self.teleop.on_ack(payload)
+        )
+
+        # === Assisted driving (fixed-rate loop between the controls and teleop, inputs from the network thread) ===
+        self.control_feed = SensorFeed()
+        self.mqtt_client.add_raw_listener(self.control_feed.on_message)
+        self.control = ControlLoop(self.control_feed, self.teleop.set_command, build_behaviours(assist),
+                                   rate_hz=control_rate, robot=self.selected_robot)
+        # The loop stops first, so nothing reaches teleop after its final STP
+        QApplication.instance().aboutToQuit.connect(self.control.stop)
+        QApplication.instance().aboutToQuit.connect(self.teleop.stop)
+
+        # === Robot camera (JPEG frames go straight to the decoder, never through the GUI) ===
+        self.video_source = video_source
+        self.vision_workers = vision_workers
+        self.record_video = record_video
+        self.video_max_bytes = video_max_bytes
+        self.mqtt_client.add_direct_listener(robot_topic(TOPIC_CAMERA, "+"), self.on_camera_payload)
 
         # === IMU Data ===
         self.imu_accel = [0.0, 0.0, 0.0]
         self.imu_gyro = [0.0, 0.0, 0.0]
+        self.imu_orientation = [0.0, 0.0, 0.0]  # yaw, pitch, roll
 
         # === LEFT PANEL ===
         left_panel = QWidget()
@@ -63,7 +117,9 @@ class RobotControlUI(QWidget):
 
         # Sensor Status
         sensor_card = Card("Sensor Status")
-        self.sensor_panel = SensorPanel(temp_val=0, humidity_val=0, air_quality_val="Poor", light_val="Day")
+        self.sensor_panel = SensorPanel(temp_val=0, humidity_val=0, air_quality_val="Poor", light_val="Day",
+                                        rules=load_rules(rules_path))
+        self.sensor_panel.status_changed.connect(self.log_sensor_status)
         sensor_card.layout().addWidget(self.sensor_panel)
 
         # IMU + CAM
@@ -78,18 +134,15 @@ class RobotControlUI(QWidget):
         left_layout.addWidget(imu_camera_splitter)
         left_panel.setLayout(left_layout)
 
-        # IMU
-        self.imu_panel = IMUPanel()
-        imu_card.layout().addWidget(self.imu_panel)
-        self.imu_panel.update_imu_data(
-            accel=self.imu_accel,
-            gyro=self.imu_gyro,
-            orientation_rpy=self.imu_gyro
-        )
-
-        # CAM
-        cam_panel = CameraPanel()
-        cam_card.layout().addWidget(cam_panel)
+        # IMU and CAM are built on first show: they pull in OpenGL / OpenCV and open devices
+        self.imu_panel = None
+        self.camera_panel = None
+        self.lazy_panels = [
+            LazyPanel(self.build_imu_panel, "IMU"),
+            LazyPanel(self.build_camera_panel, "camera"),
+        ]
+        imu_card.layout().addWidget(self.lazy_panels[0])
+        cam_card.layout().addWidget(self.lazy_panels[1])
 
         # === RIGHT PANEL ===
         right_panel = QWidget()
@@ -97,15 +150,21 @@ class RobotControlUI(QWidget):
         right_layout.setSpacing(10)
 
         radar_card = Card("Radar View")
+        map_card = Card("Map")
         controller_card = Card("Controller")
 
         right_layout.addWidget(radar_card)
+        right_layout.addWidget(map_card)
         right_layout.addWidget(controller_card)
         right_panel.setLayout(right_layout)
 
         # Radar
-        radar_panel = RadarPanel()
-        radar_card.layout().addWidget(radar_panel)
+        self.radar_panel = RadarPanel()
+        radar_card.layout().addWidget(self.radar_panel)
+
+        # Occupancy map (built by the MQTT client's mapper, the panel only draws changed tiles)
+        self.map_panel = MapPanel(self.mqtt_client.mapper, self.selected_robot)
+        map_card.layout().addWidget(self.map_panel)
 
         # Controller
         self.controller_panel = ControllerPanel(command_callback=self.send_command)
@@ -116,68 +175,475 @@ class RobotControlUI(QWidget):
         self.log_panel = LogPanel()
         log_card.layout().addWidget(self.log_panel)
 
+        # === HISTORY PANEL (next to the log) ===
+        # Samples are recorded into the store from startup, the pyqtgraph plot is built lazily
+        history_card = Card("History")
+        self.history = TimeSeriesStore()
+        self.history_panel = None
+        self.lazy_panels.append(LazyPanel(self.build_history_panel, "history"))
+        history_card.layout().addWidget(self.lazy_panels[-1])
+
+        bottom_splitter = QSplitter(Qt.Horizontal)
+        bottom_splitter.addWidget(log_card)
+        bottom_splitter.addWidget(history_card)
+        bottom_splitter.setSizes([1, 1])
+
         # === MAIN SPLIT VIEW ===
-        main_content_layout = QHBoxLayout()
+        main_content = QWidget()
+        main_content_layout = QHBoxLayout(main_content)
+        main_content_layout.setContentsMargins(0, 0, 0, 0)
         main_content_layout.addWidget(left_panel)
         main_content_layout.addWidget(right_panel)
 
+        # === FLEET VIEW (tiles, swapped in for the detail view) ===
+        self.fleet_panel = FleetPanel(self.fleet)
+        self.fleet_panel.robot_selected.connect(self.open_robot)
+        self.content_stack = QStackedWidget()
+        self.content_stack.addWidget(main_content)
+        self.content_stack.addWidget(self.fleet_panel)
+
+        # === ROBOT BAR ===
+        robot_bar = QHBoxLayout()
+        robot_label = QLabel("Robot")
+        robot_label.setStyleSheet("color: white;")
+        self.robot_selector = QComboBox()
+        self.robot_selector.setMinimumWidth(140)
+        self.robot_selector.setStyleSheet("""
+            QComboBox {
+                background-color: #1C2A3A;
+                color: white;
+                padding: 3px;
+                border-radius: 5px;
+            }
+        """)
+        self.robot_selector.currentTextChanged.connect(self.select_robot)
+        self.fleet_button = QPushButton("▦ Fleet view")
+        self.fleet_button.setCheckable(True)
+        self.fleet_button.setStyleSheet("""
+            QPushButton {
+                background-color: #1C2A3A;
+                color: white;
+                padding: 4px 10px;
+                border-radius: 5px;
+            }
+            QPushButton:checked {
+                background-color: #0078d7;
+            }
+        """)
+        self.fleet_button.toggled.connect(self.show_fleet_view)
+        self.perf_button = QPushButton("⏱ Perf")
+        self.perf_button.setToolTip("Performance overlay (F12)")
+        self.perf_button.setStyleSheet(self.fleet_button.styleSheet())
+        self.perf_button.clicked.connect(self.toggle_perf_overlay)
+        self.connection_label = QLabel("○ Offline" if connect_mqtt else "")
+        self.connection_label.setStyleSheet("color: #9FB3C8; padding: 0 8px;")
+        robot_bar.addWidget(robot_label)
+        robot_bar.addWidget(self.robot_selector)
+        robot_bar.addWidget(self.fleet_button)
+        robot_bar.addStretch()
+        robot_bar.addWidget(self.connection_label)
+        robot_bar.addWidget(self.perf_button)
+
         # === MAIN LAYOUT ===
         main_layout = QVBoxLayout(self)
-        main_layout.addLayout(main_content_layout)
-        main_layout.addWidget(log_card)
+        main_layout.addLayout(robot_bar)
+        main_layout.addWidget(self.content_stack)
+        main_layout.addWidget(bottom_splitter)
 
         # Size policies
         sensor_card.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         log_card.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        history_card.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         imu_camera_splitter.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         radar_card.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        map_card.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         controller_card.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
+        # === Telemetry routing (coalesced to one render per frame) ===
+        self.dispatcher = TelemetryDispatcher(fps=30, parent=self)
+        self.setup_routes()
+
+        # === Ingest backpressure watch ===
+        self.last_ingest_stats = self.mqtt_client.stats()
+        self.ingest_timer = QTimer(self)
+        self.ingest_timer.timeout.connect(self.check_ingest_stats)
+        self.ingest_timer.start(5000)
+
+        self.latency_timer = QTimer(self)
+        self.latency_timer.timeout.connect(self.update_teleop_latency)
+        self.latency_timer.start(1000)
+
+        # === Performance overlay (floats over the window, hidden by default) ===
+        self.lag_monitor = EventLoopLagMonitor(parent=self)
+        self.perf_panel = PerfPanel(parent=self)
+        self.perf_panel.export_requested.connect(self.export_metrics)
+
+        self.fleet.get(DEFAULT_ROBOT_ID)  # The firmware's default id is always listed
+
+        if not lazy_panels:
+            for panel in self.lazy_panels:
+                panel.build()
+
+    # --- Lazily built panels
+
+    def build_imu_panel(self):
+        from panels.imu_panel import IMUPanel
+        self.imu_panel = IMUPanel()
+        self.render_imu()
+        return self.imu_panel
+
+    def build_camera_panel(self):
+        from panels.camera_panel import CameraPanel
+        self.camera_panel = CameraPanel(source=self.video_source, vision_workers=self.vision_workers,
+                                        record_dir=self.record_video, record_max_bytes=self.video_max_bytes)
+        self.camera_panel.quality_changed.connect(self.on_camera_quality)
+        self.camera_panel.obstacles_detected.connect(self.radar_panel.set_obstacles)
+        return self.camera_panel
+
+    def build_history_panel(self):
+        from panels.timeseries_panel import TimeSeriesPanel
+        self.history_panel = TimeSeriesPanel(self.history)
+        return self.history_panel
+
+    def setup_routes(self):
+        d = self.dispatcher
+        d.route(TOPIC_TEMP, self.sensor_panel.set_temperature)
+        d.route(TOPIC_HUMIDITY, self.sensor_panel.set_humidity)
+        d.route(TOPIC_GAS_AIR, self.sensor_panel.set_air_quality)
+        d.route(TOPIC_LDR, self.sensor_panel.set_light)
+        d.route(TOPIC_DISTANCE, self.radar_panel.set_distance)
+        d.route(TOPIC_IMU_ACCEL, self.set_imu_accel, render=self.render_imu)
+        d.route(TOPIC_IMU_GYRO, self.set_imu_gyro, render=self.render_imu)
+        for channel in self.sensor_panel.STATS_CARDS:
+            d.route(derived_topic(channel), self.sensor_panel.set_stats)
+        d.route(derived_topic("distance"), self.radar_panel.set_collision_warning)
+
+    @timed("ui.handle_mqtt_batch")
+    def handle_mqtt_batch(self):
+        batch = self.mqtt_client.take_batch()
+        metrics.count("ui.messages_applied", len(batch))
+        for message in batch:
+            self.apply_message(message)
+
+    @timed("ui.handle_mqtt_message")
+    def handle_mqtt_message(self, topic, payload, received_at=None):
+        """Parses and applies a single message (str or bytes payload) on the GUI thread"""
+        if received_at is None:
+            received_at = time.time()
+        message = parse_message(topic, payload, received_at)
+        if message.topic in MAP_TOPICS:
+            self.mqtt_client.mapper.process((message,))  # Replay bypasses the ingest worker
+        self.apply_message(message)
+
+    def apply_message(self, message):
+        topic = message.topic
+        state = self.fleet.get(message.robot)
+        state.messages += 1
+        selected = message.robot == self.selected_robot
+        # Log under the topic as received, e.g. roboai/neobot2/sensor/mq2
+        source = robot_topic(topic, message.robot)
 
-    def handle_mqtt_message(self, topic, payload):
-        # print(f"MQTT → {topic}: {payload}")
-        self.log_panel.add_log(f"[{topic}] {payload}")
-
-        try:
-            data = float(payload) if "." in payload else int(payload)
-        except:
-            data = payload  # in case it's a string like "Poor", "Day", etc.
-
-        # === SENSOR PANEL UPDATES ===
-        if topic == "roboai/neobot/sensor/dht/temperature":
-            self.sensor_panel.set_temperature(data)
-        elif topic == "roboai/neobot/sensor/dht/humidity":
-            self.sensor_panel.set_humidity(data)
-        elif topic == "roboai/neobot/sensor/mq2":
-            self.sensor_panel.set_air_quality(data)
-        elif topic == "roboai/neobot/sensor/ldr":
-            self.sensor_panel.set_light(data)
-
-        if topic == "roboai/neobot/sensor/imu/accel":
-            try:
-                x, y, z = map(float, payload.split(","))
-                self.imu_accel = [x, y, z]
-            except:
-                return
-        elif topic == "roboai/neobot/sensor/imu/gyro":
-            try:
-                x, y, z = map(float, payload.split(","))
-                self.imu_gyro = [x, y, z]
-            except:
-                return
+        if topic == TOPIC_TELEMETRY:
+            if message.value is None:
+                self.log_panel.add_log(f"[{source}] dropped malformed frame", topic=source)
+            else:
+                self.apply_frame(state, message.value, message.received_at, selected)
+            return
+
+        if topic in DERIVED_TOPICS:
+            self.apply_derived(state, message, selected)
+            return
+
+        if topic in FRAME_TOPICS and time.time() - state.last_frame_time < self.FRAME_FUSION_TIMEOUT:
+            return  # Already applied from this robot's frame, don't log and record every sample twice
+
+        # print(f"MQTT → {topic}: {message.payload}")
+        self.log_panel.add_log(f"[{source}] {message.payload}", topic=source)
+        if message.value is None:
+            return
+        state.update(topic, message.value, message.received_at)
+
+        # Orientation is fused per sample, before the dispatcher coalesces readings
+        if topic == TOPIC_IMU_ACCEL:
+            state.latest_accel = message.value
+        elif topic == TOPIC_IMU_GYRO and state.latest_accel is not None:
+            # Only without recent frames, which carry both vectors and a device timestamp
+            state.fuse_imu(state.latest_accel, message.value, message.received_at, clock="host")
+        if selected:
+            self.history.record(topic, message.received_at, message.value)
+            self.dispatcher.submit(topic, message.value)
+
+    def apply_frame(self, state, frame, received_at, selected):
+        source = robot_topic(TOPIC_TELEMETRY, state.robot_id)
+        state.last_frame_time = time.time()
+        state.fuse_imu(frame.accel, frame.gyro, frame.timestamp_ms / 1000.0, clock="device")
+        lost = state.frame_sequence.update(frame.seq)
+        if lost:
+            self.log_panel.add_log(f"[{source}] {lost} frame(s) lost before #{frame.seq}", topic=source)
+        self.log_panel.add_log(
+            f"[{source}] #{frame.seq} t={frame.timestamp_ms}ms "
+            f"T={frame.temperature:.2f} H={frame.humidity:.2f} LDR={frame.ldr} "
+            f"MQ2={frame.gas} D={frame.distance:.2f}",
+            topic=source
+        )
+        for topic, value in frame_to_topics(frame):
+            state.update(topic, value, received_at)
+            if selected:
+                self.history.record(topic, received_at, value)
+                self.dispatcher.submit(topic, value)
+
+    def apply_derived(self, state, message, selected):
+        """Rolling statistics snapshot from stream_stats.py; only anomaly onsets are logged"""
+        stats = message.value
+        if stats is None:
+            return
+        state.update(message.topic, stats, message.received_at)
+        if stats.get("changed") and stats.get("anomaly"):
+            channel = stats["channel"]
+            if stats["anomaly"] == "approach":
+                detail = f"{stats['value']:.0f} cm, contact in {stats['ttc']:.1f} s"
+            else:
+                baseline = stats["windows"][list(stats["windows"])[-1]]
+                detail = f"{stats['value']:.1f} vs mean {baseline['mean']:.1f} ± {baseline['std']:.1f}"
+            self.log_panel.add_log(f"[ANOMALY] {state.robot_id} {channel} {stats['anomaly']}: {detail}",
+                                   topic="ANOMALY")
+        if selected:
+            self.dispatcher.submit(message.topic, stats)
+
+    # --- Fleet
+
+    def add_robot(self, robot_id):
+        self.robot_selector.addItem(robot_id)
+        self.fleet_panel.add_robot(robot_id)
+
+    def select_robot(self, robot_id):
+        """Points every detail panel at robot_id and redraws them from its latest readings"""
+        if not robot_id or robot_id == self.selected_robot:
+            return
+        self.selected_robot = robot_id
+        self.control.retarget(robot_id)
+        self.teleop.retarget(robot_topic(TOPIC_COMMAND, robot_id))
+        self.map_panel.set_robot(robot_id)
+        self.robot_selector.setCurrentText(robot_id)
+        self.history.clear()
+        if self.history_panel is not None:
+            self.history_panel.refresh(force=True)
+        state = self.fleet.get(robot_id)
+        for topic, value in state.latest.items():
+            self.dispatcher.submit(topic, value)
+        self.dispatcher.flush()
+        self.render_imu()
+
+    def open_robot(self, robot_id):
+        self.select_robot(robot_id)
+        self.fleet_button.setChecked(False)
+
+    def show_fleet_view(self, tiled):
+        self.content_stack.setCurrentIndex(1 if tiled else 0)
+        if tiled:
+            self.fleet_panel.refresh()
+
+    def check_ingest_stats(self):
+        stats = self.mqtt_client.stats()
+        dropped = stats["dropped"] - self.last_ingest_stats["dropped"]
+        coalesced = stats["coalesced"] - self.last_ingest_stats["coalesced"]
+        if dropped or coalesced:
+            self.log_panel.add_log(
+                f"[INGEST] UI falling behind: {dropped} dropped, {coalesced} coalesced, "
+                f"queue depth {stats['depth']}",
+                topic="INGEST"
+            )
+        self.last_ingest_stats = stats
+
+    def set_imu_accel(self, accel):
+        self.imu_accel = accel
+
+    def set_imu_gyro(self, gyro):
+        self.imu_gyro = gyro
+
+    def render_imu(self):
+        self.imu_orientation = self.fleet.get(self.selected_robot).orientation
+        if self.imu_panel is None:
+            return
         self.imu_panel.update_imu_data(
             accel=self.imu_accel,
             gyro=self.imu_gyro,
-            orientation_rpy=self.imu_gyro
+            orientation_rpy=self.imu_orientation
         )
-    
+
+    def log_sensor_status(self, sensor, status, alert, value):
+        tag = "ALERT" if alert else "SENSOR"
+        self.log_panel.add_log(f"[{tag}] {self.selected_robot} {sensor}: {status} ({value})", topic=tag)
+
+    # --- Robot camera
+
+    def on_camera_payload(self, topic, payload):
+        """JPEG frame on roboai/<id>/camera, called on the transport's network thread"""
+        panel = self.camera_panel
+        if panel is not None and topic == robot_topic(TOPIC_CAMERA, self.selected_robot):
+            panel.push_jpeg(payload)
+
+    def on_camera_quality(self, scale, quality):
+        self.log_panel.add_log(f"[CAM] decoding at 1/{scale} size, JPEG quality {quality}", topic="CAM")
+        if self.camera_panel.source == MQTT_SOURCE:
+            # Ask the robot for smaller frames too; senders that ignore this just keep their quality
+            self.mqtt_client.publish(robot_topic(TOPIC_CAMERA_CONFIG, self.selected_robot), str(quality))
+
     def send_command(self, cmd):
-        self.mqtt_client.publish("roboai/neobot/command", cmd)
-        self.log_panel.add_log(f"[CMD] {cmd}")
+        # The control loop may override it; rate limiting, keepalive and sequence numbers live in TeleopChannel
+        self.control.set_operator(cmd)
+        self.log_panel.add_log(f"[CMD] {self.selected_robot}: {cmd}", topic="CMD")
+
+    def update_teleop_latency(self):
+        self.controller_panel.set_latency(self.teleop.latency_percentiles(), self.teleop.stats())
+        self.controller_panel.set_control_stats(self.control.stats())
+        for event in self.control.take_events():
+            if event.detail == "released":
+                text = f"{event.behaviour} released, {event.command}"
+            elif event.detail == "stale":
+                text = f"{event.behaviour} cannot act, sensor readings too old"
+            elif event.detail == "fresh":
+                text = f"{event.behaviour} active again, readings up to date"
+            else:
+                text = f"{event.behaviour}: {event.operator} -> {event.command} ({event.detail})"
+            self.log_panel.add_log(f"[ASSIST] {self.selected_robot}: {text}", topic="ASSIST")
+        if self.mqtt_client.transport.state == WAITING:
+            self.update_connection_label()  # Retry countdown
+
+    # --- Broker connection
+
+    def on_connection_changed(self, state):
+        status = self.mqtt_client.connection_status()
+        if state == CONNECTED:
+            sent, expired = status["last_flush"]
+            if status["connects"] == 1:
+                message = f"connected to {status['host']}"
+            else:
+                message = f"reconnected to {status['host']} after {status['last_outage']:.1f} s offline"
+            if sent or expired:
+                message += f", sent {sent} queued message(s), {expired} expired"
+            self.log_panel.add_log(f"[MQTT] {message}", topic="MQTT")
+        elif state == WAITING and status["attempts"] <= 1:
+            # Only the first failure of an outage is logged; the label keeps counting attempts
+            self.log_panel.add_log(
+                f"[MQTT] broker {status['host']} unreachable ({status['last_error'] or 'connection lost'}), "
+                f"publishes are queued until it is back",
+                topic="MQTT"
+            )
+        self.update_connection_label()
+
+    def update_connection_label(self):
+        status = self.mqtt_client.connection_status()
+        state = status["state"]
+        if state == CONNECTED:
+            text, color = "● Online", "#3EBD93"
+            if status["last_outage"] is not None:
+                text += f" · last outage {status['last_outage']:.1f} s"
+        elif state == CONNECTING:
+            text, color = f"◌ Connecting (attempt {status['attempts']})", "#F0B429"
+        elif state == WAITING:
+            text, color = f"○ Offline {status['offline_for'] or 0:.0f} s · retry in {status['retry_in'] or 0:.0f} s", "#EF4E4E"
+            if status["queued"]:
+                text += f" · {status['queued']} queued"
+        else:
+            text, color = "○ Offline", "#9FB3C8"
+        self.connection_label.setText(text)
+        self.connection_label.setStyleSheet(f"color: {color}; padding: 0 8px;")
+        self.connection_label.setToolTip(
+            f"Broker {status['host']}\n"
+            f"Connects: {status['connects']}, last error: {status['last_error'] or '-'}\n"
+            f"Offline queue: {status['queued']} waiting, {status['queue_expired']} expired, "
+            f"{status['queue_dropped']} dropped"
+        )
+
+    def toggle_perf_overlay(self):
+        self.perf_panel.toggle()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.perf_panel.dock()
+
+    def export_metrics(self, path=None):
+        path = path or f"neobot_metrics_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        metrics.export(path)
+        self.log_panel.add_log(f"[PERF] metrics written to {path}", topic="PERF")
+        return path
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_F12:
+            self.toggle_perf_overlay()
+            return
+        # Drive keys reach here whenever the focused child ignores them
+        if not self.controller_panel.handle_key(event, True):
+            super().keyPressEvent(event)
+
+    def keyReleaseEvent(self, event):
+        if not self.controller_panel.handle_key(event, False):
+            super().keyReleaseEvent(event)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="NeoBot control dashboard")
+    parser.add_argument("--broker", default=DEFAULT_BROKER,
+                        help="MQTT broker host (default: $NEOBOT_BROKER or broker.hivemq.com)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="MQTT broker port")
+    parser.add_argument("--metrics", metavar="PATH", help="write performance counters to PATH (JSON) on exit")
+    parser.add_argument("--record", metavar="PATH", help="record all MQTT traffic to PATH (.ntr)")
+    parser.add_argument("--replay", metavar="PATH", help="replay a recording instead of connecting to the broker")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed as a multiple of real time, 0 = as fast as possible")
+    parser.add_argument("--seek", type=float, default=0.0, help="start the replay this many seconds in")
+    parser.add_argument("--video", metavar="SOURCE",
+                        help="camera source: USB index, MJPEG/RTSP/UDP URL or 'mqtt' for roboai/<id>/camera")
+    parser.add_argument("--rules", metavar="PATH", help="sensor status rules (default: $NEOBOT_RULES or sensor_rules.json)")
+    parser.add_argument("--vision", type=int, default=0, metavar="N",
+                        help="detect obstacles on the camera in N worker processes (default: off)")
+    parser.add_argument("--record-video", metavar="DIR",
+                        help="record the camera into rolling segments in DIR, see tools/video_frame.py")
+    parser.add_argument("--video-max-mb", type=int, default=2048, metavar="MB",
+                        help="delete the oldest video segments beyond this much disk (default: 2048)")
+    parser.add_argument("--assist", default="stop", metavar="LIST",
+                        help="driving assists, comma-separated: stop (before obstacles), heading (hold), "
+                             "or none (default: stop). They need telemetry frames at several Hz; with older "
+                             "readings they stand aside and say so in the log")
+    parser.add_argument("--control-rate", type=float, default=50.0, metavar="HZ",
+                        help="assisted driving loop rate (default: 50)")
+    args, _ = parser.parse_known_args(argv)  # Leave Qt's own options alone
+    return args
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = RobotControlUI()
+    args = parse_args(sys.argv[1:])
+    video_source = 1 if args.video is None else int(args.video) if args.video.isdigit() else args.video
+    window = RobotControlUI(connect_mqtt=args.replay is None, broker_ip=args.broker, port=args.port,
+                            video_source=video_source, rules_path=args.rules, vision_workers=args.vision,
+                            assist=[name for name in args.assist.split(",") if name not in ("", "none")],
+                            control_rate=args.control_rate, record_video=args.record_video,
+                            video_max_bytes=args.video_max_mb * 1024 ** 2)
+    # Connected after teleop.stop, so its final STP is handed over before the transport disconnects
+    app.aboutToQuit.connect(window.mqtt_client.stop)
+
+    if args.metrics:
+        app.aboutToQuit.connect(lambda: window.export_metrics(args.metrics))
+
+    if args.record:
+        recorder = TelemetryRecorder(args.record)
+        window.mqtt_client.add_raw_listener(recorder.record)
+        app.aboutToQuit.connect(recorder.close)
+
+    if args.replay:
+        reader = RecordingReader(args.replay)
+        player = ReplayPlayer(reader, window.handle_mqtt_message, speed=args.speed, parent=window)
+        player.finished.connect(
+            lambda: window.log_panel.add_log(f"[REPLAY] finished, {player.replayed} messages", topic="REPLAY")
+        )
+        # The history plot's time axis becomes seconds into the recording, not since startup
+        player.seeked.connect(lambda t: window.history.rebase(reader.start_time))
+        window.log_panel.add_log(
+            f"[REPLAY] {args.replay}: {reader.duration:.1f} s in {len(reader.index)} chunks", topic="REPLAY"
+        )
+        player.start(reader.start_time + args.seek)
+
     window.show()
     sys.exit(app.exec_())
@@ -1,36 +1,100 @@
 # mqtt_client.py
 
 from PyQt5.QtCore import QObject, pyqtSignal
-import paho.mqtt.client as mqtt
+import time
+
+from instrumentation import metrics, timed
+from mqtt_ingest import IngestQueue
+from mqtt_transport import DEFAULT_BROKER, DEFAULT_PORT, AsyncMqttTransport
+from occupancy_map import OccupancyMapper
+from stream_stats import StreamProcessor
+from telemetry import robot_topic
+from topic_router import FLEET_SUBSCRIPTIONS, TopicRouter
 
 class MQTTClient(QObject):
-    message_received = pyqtSignal(str, str)  # topic, payload
+    batch_ready = pyqtSignal()  # parsed messages are waiting in take_batch()
+    connection_changed = pyqtSignal(str)  # mqtt_transport state, details in connection_status()
 
-    def __init__(self, broker_ip='broker.hivemq.com', port=1883):
+    def __init__(self, broker_ip=DEFAULT_BROKER, port=DEFAULT_PORT, connect=True):
         super().__init__()
-        self.client = mqtt.Client()
-        self.client.on_connect = self.on_connect
-        self.client.on_message = self.on_message
-        self.client.connect(broker_ip, port)
-        self.client.loop_start()
-
-    def on_connect(self, client, userdata, flags, rc):
-        print("Connected to MQTT Broker with result code " + str(rc))
-        # Subscribe to all relevant sensor topics
-        topics = [
-            "roboai/neobot/sensor/dht/temperature",
-            "roboai/neobot/sensor/dht/humidity",
-            "roboai/neobot/sensor/mq2",
-            "roboai/neobot/sensor/ldr",
-            "roboai/neobot/sensor/imu/accel",
-            "roboai/neobot/sensor/imu/gyro",
-            "roboai/neobot/sensor/distance"
-        ]
-        for topic in topics:
-            client.subscribe(topic)
+        # Decoding, parsing, derived statistics and mapping run on the ingest worker, the GUI gets one event per batch
+        self.stream = StreamProcessor()
+        self.mapper = OccupancyMapper()
+        self.ingest = IngestQueue(on_batch=self.batch_ready.emit, process=self.derive)
+        self.raw_listeners = []
+        self.direct_routes = TopicRouter()
+        self.has_direct_routes = False
+
+        # Wildcards cover every robot on this one connection, see topic_router.py.
+        # The transport resubscribes after every reconnect and queues publishes while offline.
+        self.transport = AsyncMqttTransport(broker_ip, port, FLEET_SUBSCRIPTIONS, self.on_message,
+                                            on_state=self.connection_changed.emit)
+        if connect:
+            # Non-blocking: the transport thread connects (and retries) so a slow
+            # or unreachable broker never delays the window
+            self.transport.start()
 
+    @timed("mqtt.on_message")
     def on_message(self, client, userdata, msg):
-        self.message_received.emit(msg.topic, msg.payload.decode())
+        metrics.count("mqtt.received")
+        if self.raw_listeners:
+            t = time.time()
+            for listener in self.raw_listeners:
+                listener(msg.topic, msg.payload, t)
+        if self.has_direct_routes:
+            matches = self.direct_routes.match(msg.topic)
+            if matches:
+                for listener, _ in matches:
+                    listener(msg.topic, msg.payload)
+                return
+        self.ingest.put(msg.topic, msg.payload)
+
+    @timed("stream.derive")
+    def derive(self, batch):
+        """Derived channel messages for a parsed batch (ingest worker), also shown to raw listeners"""
+        derived = self.stream.process(batch)
+        self.mapper.process(batch)
+        if derived and self.raw_listeners:
+            for message in derived:
+                topic = robot_topic(message.topic, message.robot)
+                for listener in self.raw_listeners:
+                    listener(topic, message.payload, message.received_at)
+        return derived
+
+    def add_raw_listener(self, listener):
+        """listener(topic, payload, t) sees every raw message, received or published.
+
+        Received messages are reported on the transport's network thread and
+        derived channels on the ingest worker, so listeners must be
+        thread-safe and must not block.
+        """
+        self.raw_listeners.append(listener)
+
+    def add_direct_listener(self, topic_filter, listener):
+        """listener(topic, payload) handles matching messages on the transport's network thread.
+
+        Matching messages skip the ingest queue and the GUI entirely, for
+        latency-sensitive traffic such as command acks.
+        """
+        self.direct_routes.add(topic_filter, listener)
+        self.has_direct_routes = True
+
+    def take_batch(self):
+        return self.ingest.take_batch()
+
+    def stats(self):
+        return self.ingest.stats()
+
+    def connection_status(self):
+        return self.transport.status()
+
+    def publish(self, topic, message, qos=0, ttl=None):
+        """Never blocks; while offline the message waits up to ttl seconds for a reconnect"""
+        self.transport.publish(topic, message, qos, ttl)
+        self.mapper.on_publish(topic, message, time.time())
+        for listener in self.raw_listeners:
+            listener(topic, message, time.time())
 
-    def publish(self, topic, message):
-        self.client.publish(topic, message)
+    def stop(self):
+        self.transport.stop()
+        self.ingest.stop()
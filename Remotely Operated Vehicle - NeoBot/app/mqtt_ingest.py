@@ -0,0 +1,162 @@
+# mqtt_ingest.py
+
+import threading
+import time
+from collections import deque, namedtuple
+
+from telemetry import DEFAULT_ROBOT_ID, TOPIC_TELEMETRY, parse_payload
+from telemetry_frame import FrameError, decode_frame
+from topic_router import canonical_topic
+
+# topic is the canonical roboai/neobot/... topic and robot the id taken from
+# the received topic, so handlers match on the TOPIC_* constants for every
+# robot. payload is str for text topics and bytes for binary frames; value is
+# the parsed reading (or TelemetryFrame), None when the payload was malformed.
+Message = namedtuple("Message", ["topic", "payload", "value", "received_at", "robot"],
+                     defaults=[DEFAULT_ROBOT_ID])
+
+
+def parse_message(topic, payload, received_at):
+    topic, robot = canonical_topic(topic)
+    if topic == TOPIC_TELEMETRY:
+        try:
+            value = decode_frame(payload)
+        except FrameError:
+            value = None
+        return Message(topic, payload, value, received_at, robot)
+
+    text = payload if isinstance(payload, str) else payload.decode(errors="replace")
+    return Message(topic, text, parse_payload(topic, text), received_at, robot)
+
+
+class IngestQueue:
+    """Bounded queue that parses MQTT messages on a worker thread and hands them over in batches.
+
+    put() runs on paho's network thread and never blocks. When the queue is
+    full a message replaces the pending one on the same topic (coalesced) or,
+    if there is none, the oldest queued message is dropped. The worker only
+    drains the queue once the consumer has taken the previous batch, so a
+    slow UI shows up as queue depth and coalesced/dropped counts instead of
+    an unbounded event backlog.
+
+    process(batch), if given, runs on the worker after parsing and returns
+    extra messages (e.g. derived channels) appended to the batch.
+    """
+
+    def __init__(self, on_batch, capacity=1024, batch_interval=1 / 60, parse=parse_message, process=None):
+        self.on_batch = on_batch
+        self.capacity = capacity
+        self.batch_interval = batch_interval
+        self.parse = parse
+        self.process = process
+
+        self._queue = deque()
+        self._pending = {}  # topic -> newest queued entry for that topic
+        self._cond = threading.Condition()
+        self._outbox = None
+        self._outbox_taken = threading.Event()
+        self._outbox_taken.set()
+
+        self.received = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.max_depth = 0
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="mqtt-ingest", daemon=True)
+        self._thread.start()
+
+    # --- Producer side (paho network thread)
+
+    def put(self, topic, payload):
+        now = time.time()
+        with self._cond:
+            self.received += 1
+            if len(self._queue) >= self.capacity:
+                entry = self._pending.get(topic)
+                if entry is not None:
+                    entry[1] = payload
+                    entry[2] = now
+                    self.coalesced += 1
+                    return
+                oldest = self._queue.popleft()
+                if self._pending.get(oldest[0]) is oldest:
+                    del self._pending[oldest[0]]
+                self.dropped += 1
+
+            entry = [topic, payload, now]
+            self._queue.append(entry)
+            self._pending[topic] = entry
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify()
+
+    # --- Consumer side (GUI thread)
+
+    def take_batch(self):
+        """Returns the parsed messages delivered since the last call"""
+        with self._cond:
+            batch = self._outbox
+            self._outbox = None
+        if batch is None:
+            return []
+        self._outbox_taken.set()
+        return batch
+
+    def stats(self):
+        with self._cond:
+            return {
+                "received": self.received,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "depth": len(self._queue),
+                "max_depth": self.max_depth,
+                "batches": self.batches,
+            }
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify()
+        self._outbox_taken.set()
+        self._thread.join(timeout=1.0)
+
+    # --- Worker thread
+
+    def _run(self):
+        last_batch = 0.0
+        while self._running:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+            if not self._running:
+                break
+
+            # Backpressure: wait until the consumer took the previous batch
+            self._outbox_taken.wait()
+            if not self._running:
+                break
+
+            # Cap the hand-over rate so bursts arrive as one batch per frame
+            wait = self.batch_interval - (time.monotonic() - last_batch)
+            if wait > 0:
+                time.sleep(wait)
+
+            with self._cond:
+                raw = self._queue
+                self._queue = deque()
+                self._pending = {}
+
+            batch = [self.parse(topic, payload, received_at) for topic, payload, received_at in raw]
+            if self.process is not None:
+                batch.extend(self.process(batch))
+
+            self._outbox_taken.clear()
+            with self._cond:
+                if self._outbox is None:
+                    self._outbox = batch
+                else:
+                    self._outbox.extend(batch)
+                self.batches += 1
+            last_batch = time.monotonic()
+            self.on_batch()
@@ -0,0 +1,321 @@
+# mqtt_transport.py
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import paho.mqtt.client as mqtt
+
+# Point the dashboard (or gateway) at a local broker / firmware simulator without code changes
+DEFAULT_BROKER = os.environ.get("NEOBOT_BROKER", "broker.hivemq.com")
+DEFAULT_PORT = int(os.environ.get("NEOBOT_PORT", "1883"))
+
+CONNECTING = "connecting"
+CONNECTED = "connected"
+WAITING = "waiting"  # Offline, backing off before the next attempt
+STOPPED = "stopped"
+
+
+class OutboundQueue:
+    """Bounded FIFO of messages published while offline, each with an expiry time.
+
+    Full: the oldest message is dropped. Flushing skips expired messages, so
+    a drive command queued during an outage is never sent long after the fact.
+    Only used from the transport's event loop thread.
+    """
+
+    def __init__(self, capacity=256, default_ttl=30.0):
+        self.items = deque()
+        self.capacity = capacity
+        self.default_ttl = default_ttl
+        self.dropped = 0
+        self.expired = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def put(self, topic, payload, qos=0, ttl=None, now=None):
+        now = time.monotonic() if now is None else now
+        if len(self.items) >= self.capacity:
+            self.items.popleft()
+            self.dropped += 1
+        self.items.append((now + (self.default_ttl if ttl is None else ttl), topic, payload, qos))
+
+    def drain(self, now=None):
+        """Removes and returns the unexpired (topic, payload, qos) in publish order"""
+        now = time.monotonic() if now is None else now
+        live = [(topic, payload, qos) for expires, topic, payload, qos in self.items if expires >= now]
+        self.expired += len(self.items) - len(live)
+        self.items.clear()
+        return live
+
+
+class Backoff:
+    """Exponential reconnect delay (base, 2*base, ... up to cap) with random jitter"""
+
+    def __init__(self, base=0.5, cap=30.0, jitter=0.3, rng=None):
+        self.base = base
+        self.cap = cap
+        self.jitter = jitter
+        self.attempt = 0
+        self.rng = rng or random.Random()
+
+    def next(self):
+        delay = min(self.cap, self.base * 2 ** self.attempt)
+        self.attempt += 1
+        # Jitter keeps a fleet of dashboards from reconnecting in lockstep after a broker restart
+        return delay * (1.0 - self.jitter * self.rng.random())
+
+    def reset(self):
+        self.attempt = 0
+
+
+class AsyncMqttTransport:
+    """MQTT connection owned by one asyncio coroutine.
+
+    paho still encodes the protocol, but its socket is registered with the
+    asyncio loop (add_reader/add_writer) instead of paho's loop thread. The
+    supervisor coroutine connects without blocking the loop, waits for
+    CONNACK, resubscribes, flushes the offline queue in order, and after a
+    connection loss waits an exponential backoff before the next attempt.
+
+    start() runs it on a background thread with its own loop (the Qt
+    dashboard, which forwards on_state through a queued signal); run() is
+    the same coroutine for callers that already have a loop (gateway.py).
+    on_message(client, userdata, msg) and on_state(state) are called on the
+    loop thread. No Qt here, so headless tools can import it.
+    """
+
+    CONNACK_TIMEOUT = 5.0
+    MISC_INTERVAL = 1.0  # Keepalive pings and timeout checks
+
+    def __init__(self, host, port, subscriptions, on_message, keepalive=15,
+                 queue_capacity=256, default_ttl=30.0, backoff=None, on_state=None):
+        self.host = host
+        self.port = port
+        self.subscriptions = list(subscriptions)
+        self.keepalive = keepalive
+        self.queue = OutboundQueue(queue_capacity, default_ttl)
+        self.backoff = backoff or Backoff()
+        self.on_state = on_state
+
+        self.state = STOPPED
+        self.attempts = 0  # Since the last successful connect
+        self.connects = 0
+        self.last_error = ""
+        self.retry_at = None
+        self.offline_since = None
+        self.last_outage = None  # s from losing the connection to the next CONNACK
+        self.last_flush = (0, 0)  # (sent, expired) on the last reconnect
+
+        self.client = mqtt.Client()
+        self.client.connect_timeout = 3.0
+        self.client.on_connect = self._on_connect
+        self.client.on_disconnect = self._on_disconnect
+        self.client.on_message = on_message
+        self.client.on_socket_open = self._on_socket_open
+        self.client.on_socket_close = self._on_socket_close
+        self.client.on_socket_register_write = self._on_socket_register_write
+        self.client.on_socket_unregister_write = self._on_socket_unregister_write
+
+        self.client_rc = None
+        self._loop = None
+        self._loop_thread = None
+        self._thread = None
+        self._running = True  # Until stop(); run() returns at once after that
+        self._connack = None
+        self._lost = None
+        self._wake = None
+
+    # --- Any thread
+
+    def start(self):
+        """Runs the transport on its own thread and event loop"""
+        loop = self._loop = asyncio.new_event_loop()
+
+        def run():
+            loop.run_until_complete(self.run())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="mqtt-transport", daemon=True)
+        self._thread.start()
+
+    async def run(self):
+        """Owns the connection until stop(), on whatever loop awaits it"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._wake = asyncio.Event()
+        await self._supervise()
+
+    def stop(self, timeout=2.0):
+        """Sends what is already handed over, disconnects and ends run() (and the loop thread)"""
+        if self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._request_stop)
+        except RuntimeError:
+            pass  # Loop already closed
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def publish(self, topic, payload, qos=0, ttl=None):
+        """Publishes now if connected, otherwise queues until expiry (ttl seconds)"""
+        if self._loop is None:
+            self.queue.put(topic, payload, qos, ttl)  # Not started (e.g. replay), loop thread not running
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._publish, topic, payload, qos, ttl)
+        except RuntimeError:
+            pass  # Stopped
+
+    def status(self):
+        """Snapshot for the UI, safe to read from any thread"""
+        return {
+            "state": self.state,
+            "host": f"{self.host}:{self.port}",
+            "attempts": self.attempts,
+            "connects": self.connects,
+            "retry_in": max(0.0, self.retry_at - time.monotonic()) if self.retry_at else None,
+            "offline_for": time.monotonic() - self.offline_since if self.offline_since else None,
+            "last_outage": self.last_outage,
+            "last_error": self.last_error,
+            "queued": len(self.queue),
+            "queue_dropped": self.queue.dropped,
+            "queue_expired": self.queue.expired,
+            "last_flush": self.last_flush,
+        }
+
+    # --- Loop thread
+
+    def _set_state(self, state):
+        self.state = state
+        if self.on_state is not None:
+            self.on_state(state)
+
+    def _publish(self, topic, payload, qos, ttl):
+        if self.state == CONNECTED:
+            info = self.client.publish(topic, payload, qos=qos)
+            if info.rc != mqtt.MQTT_ERR_NO_CONN:
+                return
+        self.queue.put(topic, payload, qos, ttl)
+
+    def _request_stop(self):
+        self._running = False
+        if self._wake is not None:
+            self._wake.set()
+        if self._connack is not None:
+            self._connack.set()  # A connect in progress gives up instead of waiting for CONNACK
+        if self._lost is not None:
+            self._lost.set()
+
+    async def _sleep(self, seconds):
+        """Sleeps unless stop() wakes us up first"""
+        try:
+            await asyncio.wait_for(self._wake.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _supervise(self):
+        loop = asyncio.get_running_loop()
+        misc = loop.create_task(self._misc())
+        self.offline_since = time.monotonic()
+        while self._running:
+            self._connack = asyncio.Event()
+            self._lost = asyncio.Event()
+            self.retry_at = None
+            self.attempts += 1
+            self._set_state(CONNECTING)
+            try:
+                # DNS and the TCP handshake block, so they run in the default executor
+                await loop.run_in_executor(None, self.client.connect, self.host, self.port, self.keepalive)
+                await asyncio.wait_for(self._connack.wait(), self.CONNACK_TIMEOUT)
+                if not self._running:
+                    break
+                if self.client_rc:
+                    raise ConnectionError(mqtt.connack_string(self.client_rc))
+            except (OSError, ValueError, asyncio.TimeoutError) as e:
+                self.last_error = str(e) or type(e).__name__
+                self.client.disconnect()
+                delay = self.backoff.next()
+                self.retry_at = time.monotonic() + delay
+                self._set_state(WAITING)
+                await self._sleep(delay)
+                continue
+
+            self._on_connected()
+            await self._lost.wait()
+            if self.state == CONNECTED:
+                self.offline_since = time.monotonic()
+            if self._running:
+                # First retry after a drop is quick; backoff grows only while attempts keep failing
+                delay = self.backoff.next()
+                self.retry_at = time.monotonic() + delay
+                self._set_state(WAITING)
+                await self._sleep(delay)
+
+        misc.cancel()
+        self.client.disconnect()
+        await asyncio.sleep(0)  # Let the DISCONNECT go out
+        self._set_state(STOPPED)
+
+    def _on_connected(self):
+        self.backoff.reset()
+        self.attempts = 0
+        self.connects += 1
+        self.last_error = ""
+        if self.offline_since is not None and self.connects > 1:
+            self.last_outage = time.monotonic() - self.offline_since
+        self.offline_since = None
+        # Clean session: the broker forgot our filters, so every connect resubscribes
+        self.client.subscribe([(topic_filter, 0) for topic_filter in self.subscriptions])
+        pending = self.queue.expired
+        queued = self.queue.drain()
+        for topic, payload, qos in queued:
+            self.client.publish(topic, payload, qos=qos)
+        self.last_flush = (len(queued), self.queue.expired - pending)
+        self._set_state(CONNECTED)
+
+    async def _misc(self):
+        while True:
+            await asyncio.sleep(self.MISC_INTERVAL)
+            if self.state == CONNECTED:
+                self.client.loop_misc()  # Pings, and drops the connection if PINGRESP never comes
+
+    # --- paho callbacks (loop thread, or the executor thread during connect)
+
+    def _in_loop(self, callback, *args):
+        """Runs callback now on the loop thread, otherwise hands it over in call order"""
+        if threading.get_ident() == self._loop_thread:
+            callback(*args)
+        else:
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    def _on_connect(self, client, userdata, flags, rc):
+        self.client_rc = rc
+        self._in_loop(self._connack.set)
+
+    def _on_disconnect(self, client, userdata, rc):
+        if rc:
+            self.last_error = mqtt.error_string(rc)
+        if self._lost is not None:
+            self._in_loop(self._lost.set)
+
+    def _on_socket_open(self, client, userdata, sock):
+        self._in_loop(self._loop.add_reader, sock, self._read)
+
+    def _on_socket_close(self, client, userdata, sock):
+        self._in_loop(self._loop.remove_reader, sock)
+        self._in_loop(self._loop.remove_writer, sock)
+
+    def _on_socket_register_write(self, client, userdata, sock):
+        self._in_loop(self._loop.add_writer, sock, self.client.loop_write)
+
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        self._in_loop(self._loop.remove_writer, sock)
+
+    def _read(self):
+        self.client.loop_read(max_packets=64)  # Level-triggered, so anything left calls us again
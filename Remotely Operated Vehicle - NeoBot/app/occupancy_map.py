@@ -0,0 +1,340 @@
+# occupancy_map.py
+#
+# Occupancy-grid mapping from the ultrasonic distance sensor. Pose is dead
+# reckoned per robot: heading from the gyro's z rate, travel from the drive
+# commands the dashboard sent (and their dead-man expiry). Every distance
+# reading is a ray from that pose along the heading. The cells it passes
+# become more likely free, and the cell it ends in more likely occupied
+# (log-odds). Rays are cast in batches with NumPy. The grid lives in sparse
+# fixed-size tiles allocated on first touch, so memory follows the explored
+# area, not the map bounds. The same code runs on the ingest worker live,
+# on the GUI thread during replay and in tools/build_map.py over whole
+# recordings. No Qt here.
+#
+# The gyro is integrated directly when it arrives several times a second,
+# like the firmware's 10 Hz frames. Sparser readings, such as the 2 s text
+# topics of older firmware, cannot follow a turn that starts and stops
+# between them. Then the commands say when the robot turns, and gyro readings
+# taken mid-turn measure how fast (the learnt turn rate), so motors slower or
+# faster than TURN_RATE are still tracked, only more coarsely.
+
+import math
+import threading
+import time
+
+import numpy as np
+
+from telemetry import TOPIC_COMMAND, TOPIC_DISTANCE, TOPIC_IMU_GYRO, TOPIC_TELEMETRY
+from topic_router import canonical_topic
+
+CELL_CM = 5.0
+TILE_SHIFT = 6
+TILE = 1 << TILE_SHIFT  # Cells per tile side: 64 x 64 cells = 3.2 x 3.2 m, 16 KiB
+TILE_MASK = TILE - 1
+
+# Log-odds per observation, and the clamp that keeps cells able to change their mind
+L_FREE = -0.4
+L_OCC = 0.85
+L_MIN = -4.0
+L_MAX = 4.0
+
+MIN_RANGE_CM = 3.0  # pulseIn() timeouts read as 0: no echo, no information
+MAX_RANGE_CM = 300.0  # Readings beyond this only clear space up to it
+
+# Dead reckoning. Speed is the robot's nominal drive speed (firmware_sim uses the same),
+# calibrate it for real motors. Turns come from the gyro; between sparse gyro readings
+# from the turn commands, at the rate the gyro measured during turns (TURN_RATE until then).
+DRIVE_SPEED_CM_S = 40.0
+TURN_RATE = 1.2  # rad/s
+TURN_SETTLE = 0.2  # s into a turn before a gyro reading counts as its rate
+TURN_RATE_GAIN = 0.2  # Weight of a new mid-turn reading in the learnt rate, once 5 are in
+DEADMAN_TIMEOUT = 0.6  # s, the firmware stops this long after the last "CMD#seq" keepalive
+MAX_STEP = 0.5  # s; longer gaps between readings are not integrated
+FRAME_TIMEOUT = 5.0  # s without binary frames before text distance/gyro topics are used
+
+# Everything the mapper reads, so per-message callers can skip the rest cheaply
+MAP_TOPICS = frozenset([TOPIC_TELEMETRY, TOPIC_COMMAND, TOPIC_DISTANCE, TOPIC_IMU_GYRO])
+
+FLUSH_RAYS = 64
+FLUSH_INTERVAL = 0.1  # s
+
+
+class TiledGrid:
+    """Log-odds grid of float32 tiles keyed by (tile x, tile y), allocated on first update"""
+
+    def __init__(self):
+        self.tiles = {}
+        self.dirty = set()
+
+    def update(self, cx, cy, delta):
+        """Adds delta[i] to cell (cx[i], cy[i]); int64 cell coordinates, may be negative"""
+        if not len(cx):
+            return
+        tx = cx >> TILE_SHIFT
+        ty = cy >> TILE_SHIFT
+        local = ((cy & TILE_MASK) << TILE_SHIFT) | (cx & TILE_MASK)
+        key = (tx << 32) + (ty & 0xFFFFFFFF)
+        order = np.argsort(key, kind="stable")
+        key = key[order]
+        starts = np.concatenate(([0], np.flatnonzero(key[1:] != key[:-1]) + 1))
+        ends = np.append(starts[1:], len(key))
+        local = local[order]
+        delta = delta[order]
+        tx = tx[order]
+        ty = ty[order]
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            tile_key = (int(tx[start]), int(ty[start]))
+            tile = self.tiles.get(tile_key)
+            if tile is None:
+                tile = self.tiles[tile_key] = np.zeros((TILE, TILE), np.float32)
+            flat = tile.reshape(-1)
+            flat += np.bincount(local[start:end], delta[start:end], minlength=TILE * TILE).astype(np.float32)
+            np.clip(tile, L_MIN, L_MAX, out=tile)
+            self.dirty.add(tile_key)
+
+    def value(self, cx, cy):
+        tile = self.tiles.get((cx >> TILE_SHIFT, cy >> TILE_SHIFT))
+        return 0.0 if tile is None else float(tile[cy & TILE_MASK, cx & TILE_MASK])
+
+    def nbytes(self):
+        return len(self.tiles) * TILE * TILE * 4
+
+    def dense_nbytes(self):
+        """What one array covering the same bounds would take"""
+        if not self.tiles:
+            return 0
+        xs = [k[0] for k in self.tiles]
+        ys = [k[1] for k in self.tiles]
+        return (max(xs) - min(xs) + 1) * (max(ys) - min(ys) + 1) * TILE * TILE * 4
+
+    def to_array(self):
+        """(log-odds array over the explored bounds, x of column 0, y of row 0) in cells"""
+        xs = [k[0] for k in self.tiles]
+        ys = [k[1] for k in self.tiles]
+        x0, y0 = min(xs), min(ys)
+        out = np.zeros(((max(ys) - y0 + 1) * TILE, (max(xs) - x0 + 1) * TILE), np.float32)
+        for (tx, ty), tile in self.tiles.items():
+            out[(ty - y0) * TILE:(ty - y0 + 1) * TILE, (tx - x0) * TILE:(tx - x0 + 1) * TILE] = tile
+        return out, x0 * TILE, y0 * TILE
+
+
+def cast_rays(x, y, heading, ranges):
+    """(cell x, cell y, log-odds delta) arrays for a batch of readings from poses (cm, rad)"""
+    hit = ranges <= MAX_RANGE_CM
+    ranges = np.minimum(ranges, MAX_RANGE_CM)
+    cos = np.cos(heading)
+    sin = np.sin(heading)
+
+    # Free space: samples every half cell, stopping half a cell short of the echo
+    step = CELL_CM / 2
+    counts = np.maximum(((ranges - step) / step).astype(np.int64), 0)
+    ray = np.repeat(np.arange(len(ranges)), counts)
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    d = (np.arange(len(ray)) - first) * step
+    fx = np.floor((x[ray] + d * cos[ray]) / CELL_CM).astype(np.int64)
+    fy = np.floor((y[ray] + d * sin[ray]) / CELL_CM).astype(np.int64)
+    # Consecutive samples of one ray often share a cell, clear each cell once per ray
+    keep = np.ones(len(ray), bool)
+    keep[1:] = (fx[1:] != fx[:-1]) | (fy[1:] != fy[:-1]) | (ray[1:] != ray[:-1])
+    fx = fx[keep]
+    fy = fy[keep]
+
+    hx = np.floor((x + ranges * cos) / CELL_CM).astype(np.int64)[hit]
+    hy = np.floor((y + ranges * sin) / CELL_CM).astype(np.int64)[hit]
+    delta = np.concatenate((np.full(len(fx), L_FREE, np.float32), np.full(len(hx), L_OCC, np.float32)))
+    return np.concatenate((fx, hx)), np.concatenate((fy, hy)), delta
+
+
+class DeadReckoning:
+    """Planar pose (cm, cm, rad) from drive commands and gyro z, in host time"""
+
+    SPEEDS = {"FWD": DRIVE_SPEED_CM_S, "BWD": -DRIVE_SPEED_CM_S}
+    TURNS = {"LFT": 1.0, "RHT": -1.0}  # Times the turn rate
+
+    def __init__(self):
+        self.x = 0.0
+        self.y = 0.0
+        self.heading = 0.0
+        self.command = "STP"
+        self.moving_until = math.inf
+        self.t = None
+        self.gyro_t = None
+        self.gyro_dense = False  # Readings at most MAX_STEP apart: the gyro alone turns the pose
+        self.turn_rate = TURN_RATE  # Learnt from gyro readings taken mid-turn
+        self.turn_samples = 0
+        self.command_t = 0.0  # When the current command started
+        self.travelled = 0.0
+
+    def advance(self, t):
+        """Integrates the current command up to t"""
+        if self.t is None or t <= self.t:
+            self.t = t if self.t is None else self.t
+            return
+        dt = min(t, self.moving_until) - self.t
+        self.t = t
+        if dt <= 0 or dt > MAX_STEP:
+            return
+        speed = self.SPEEDS.get(self.command)
+        if speed:
+            self.x += speed * dt * math.cos(self.heading)
+            self.y += speed * dt * math.sin(self.heading)
+            self.travelled += abs(speed) * dt
+        if not self.gyro_dense or t - self.gyro_t > MAX_STEP:
+            self.heading += self.TURNS.get(self.command, 0.0) * self.turn_rate * dt
+
+    def on_command(self, payload, t):
+        self.advance(t)
+        action, sep, _ = payload.partition("#")
+        if action != self.command:
+            self.command_t = t
+        self.command = action
+        # Only "CMD#seq" arms the firmware's dead-man, like a plain "FWD" from older dashboards does not
+        self.moving_until = t + DEADMAN_TIMEOUT if sep and action != "STP" else math.inf
+
+    def on_gyro(self, gz, t):
+        self.advance(t)
+        gap = t - self.gyro_t if self.gyro_t is not None else math.inf
+        # After a sparse gap advance() already turned the pose by the commands up to t
+        if self.gyro_dense and 0 < gap <= MAX_STEP:
+            self.heading += gz * gap
+        self.gyro_dense = 0 < gap <= MAX_STEP
+        self.gyro_t = t
+        # Mid-turn readings calibrate the rate used between sparse readings
+        direction = self.TURNS.get(self.command)
+        if direction and t - self.command_t >= TURN_SETTLE and t < self.moving_until and gz * direction > 0:
+            self.turn_samples += 1
+            gain = max(1.0 / self.turn_samples, TURN_RATE_GAIN)  # Plain mean of the first few
+            self.turn_rate += gain * (abs(gz) - self.turn_rate)
+
+
+class RobotMap:
+    """One robot's pose, grid and the readings waiting to be cast"""
+
+    def __init__(self):
+        self.pose = DeadReckoning()
+        self.grid = TiledGrid()
+        self.pending = []  # (x, y, heading, range)
+        self.last_frame = -math.inf
+        self.readings = 0
+
+    def on_distance(self, distance, t):
+        """Queues a ray from the current pose; True once FLUSH_RAYS are waiting"""
+        self.pose.advance(t)
+        if distance < MIN_RANGE_CM or distance != distance:
+            return False
+        pose = self.pose
+        self.pending.append((pose.x, pose.y, pose.heading, distance))
+        self.readings += 1
+        return len(self.pending) >= FLUSH_RAYS
+
+    def flush(self):
+        if not self.pending:
+            return 0
+        x, y, heading, ranges = np.array(self.pending, np.float64).T
+        self.pending = []
+        self.grid.update(*cast_rays(x, y, heading, ranges))
+        return len(x)
+
+
+class OccupancyMapper:
+    """Per-robot maps fed with parsed Messages (commands included).
+
+    process() and on_publish() may run on different threads (ingest worker,
+    teleop publisher) and the map panel reads tiles on the GUI thread, so
+    every entry point takes one lock. Rays are cast FLUSH_RAYS at a time or
+    every FLUSH_INTERVAL, whichever comes first.
+    """
+
+    def __init__(self):
+        self.maps = {}
+        self._lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.flush_due = False
+        self.rays = 0
+        self.flush_time = 0.0
+
+    def get(self, robot):
+        robot_map = self.maps.get(robot)
+        if robot_map is None:
+            robot_map = self.maps[robot] = RobotMap()
+        return robot_map
+
+    def process(self, batch):
+        with self._lock:
+            for message in batch:
+                self._apply(message)
+            self._maybe_flush()
+
+    def on_publish(self, topic, payload, t):
+        """Drive commands as they are published (they are not subscribed, so never come back)"""
+        topic, robot = canonical_topic(topic)
+        if topic == TOPIC_COMMAND:
+            with self._lock:
+                self.get(robot).pose.on_command(payload, t)
+
+    def _apply(self, message):
+        topic = message.topic
+        value = message.value
+        t = message.received_at
+        if topic == TOPIC_TELEMETRY:
+            if value is None:
+                return
+            robot_map = self.get(message.robot)
+            robot_map.last_frame = t
+            robot_map.pose.on_gyro(value.gyro[2], t)
+            if robot_map.on_distance(value.distance, t):
+                self.flush_due = True
+        elif topic == TOPIC_COMMAND:
+            self.get(message.robot).pose.on_command(message.payload, t)  # Replayed from a recording
+        elif topic == TOPIC_DISTANCE or topic == TOPIC_IMU_GYRO:
+            robot_map = self.get(message.robot)
+            if value is None or t - robot_map.last_frame < FRAME_TIMEOUT:
+                return  # Frames carry the same readings with both vectors in one sample
+            if topic == TOPIC_IMU_GYRO:
+                robot_map.pose.on_gyro(value[2], t)
+            elif isinstance(value, (int, float)) and robot_map.on_distance(value, t):
+                self.flush_due = True
+
+    def _maybe_flush(self):
+        now = time.monotonic()
+        if self.flush_due or now - self.last_flush >= FLUSH_INTERVAL:
+            self._flush(now)
+
+    def _flush(self, now=None):
+        start = time.perf_counter()
+        for robot_map in self.maps.values():
+            self.rays += robot_map.flush()
+        self.flush_time += time.perf_counter() - start
+        self.last_flush = time.monotonic() if now is None else now
+        self.flush_due = False
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def take_dirty(self, robot, everything=False):
+        """({tile key: log-odds copy} changed since the last call, pose) for the map panel"""
+        with self._lock:
+            robot_map = self.maps.get(robot)
+            if robot_map is None:
+                return {}, None
+            robot_map.flush()
+            grid = robot_map.grid
+            keys = grid.tiles if everything else grid.dirty
+            tiles = {key: grid.tiles[key].copy() for key in keys}
+            grid.dirty.clear()
+            pose = robot_map.pose
+            return tiles, (pose.x, pose.y, pose.heading)
+
+    def stats(self):
+        with self._lock:
+            return {
+                robot: {
+                    "readings": m.readings,
+                    "tiles": len(m.grid.tiles),
+                    "bytes": m.grid.nbytes(),
+                    "dense_bytes": m.grid.dense_nbytes(),
+                    "travelled_cm": m.pose.travelled,
+                }
+                for robot, m in self.maps.items()
+            }
@@ -0,0 +1,156 @@
+# orientation.py
+
+import math
+
+import numpy as np
+
+
+def accel_to_roll_pitch(accel):
+    """Roll and pitch (rad) of the gravity vector, works on (3,) or (N, 3) arrays"""
+    accel = np.asarray(accel, dtype=np.float64)
+    ax, ay, az = accel[..., 0], accel[..., 1], accel[..., 2]
+    roll = np.arctan2(ay, az)
+    pitch = np.arctan2(-ax, np.sqrt(ay * ay + az * az))
+    return roll, pitch
+
+
+def euler_to_quaternion(roll, pitch, yaw):
+    """ZYX Euler angles to unit quaternions [w, x, y, z], vectorized"""
+    cr, sr = np.cos(np.multiply(roll, 0.5)), np.sin(np.multiply(roll, 0.5))
+    cp, sp = np.cos(np.multiply(pitch, 0.5)), np.sin(np.multiply(pitch, 0.5))
+    cy, sy = np.cos(np.multiply(yaw, 0.5)), np.sin(np.multiply(yaw, 0.5))
+    return np.stack([
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy,
+    ], axis=-1)
+
+
+def quaternion_to_euler(q):
+    """Unit quaternions [w, x, y, z] to (roll, pitch, yaw), vectorized"""
+    q = np.asarray(q, dtype=np.float64)
+    w, x, y, z = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    roll = np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+    pitch = np.arcsin(np.clip(2 * (w * y - z * x), -1.0, 1.0))
+    yaw = np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+    return roll, pitch, yaw
+
+
+class ComplementaryFilter:
+    """Fuses accelerometer and gyroscope samples into an attitude quaternion.
+
+    Roll and pitch integrate the gyro and are pulled towards the gravity
+    direction from the accelerometer with weight (1 - alpha) per sample; yaw
+    has no absolute reference (no magnetometer) and is integrated only.
+    Gyro rates are rad/s and timestamps are seconds.
+    """
+
+    def __init__(self, alpha=0.98, max_dt=0.5):
+        self.alpha = alpha
+        self.max_dt = max_dt  # Gaps longer than this (e.g. reconnects) are not integrated
+        self.reset()
+
+    def reset(self):
+        self.roll = 0.0
+        self.pitch = 0.0
+        self.yaw = 0.0
+        self.last_t = None
+
+    def quaternion(self):
+        """Current attitude as (w, x, y, z); scalar math, no NumPy overhead per step"""
+        cr, sr = math.cos(self.roll * 0.5), math.sin(self.roll * 0.5)
+        cp, sp = math.cos(self.pitch * 0.5), math.sin(self.pitch * 0.5)
+        cy, sy = math.cos(self.yaw * 0.5), math.sin(self.yaw * 0.5)
+        return (
+            cr * cp * cy + sr * sp * sy,
+            sr * cp * cy - cr * sp * sy,
+            cr * sp * cy + sr * cp * sy,
+            cr * cp * sy - sr * sp * cy,
+        )
+
+    def update(self, accel, gyro, t):
+        """Advances the filter by one sample and returns the new quaternion"""
+        ax, ay, az = accel
+        gx, gy, gz = gyro
+        roll_acc = math.atan2(ay, az)
+        pitch_acc = math.atan2(-ax, math.sqrt(ay * ay + az * az))
+
+        if self.last_t is None:
+            self.roll, self.pitch = roll_acc, pitch_acc
+        else:
+            dt = min(max(t - self.last_t, 0.0), self.max_dt)
+            a = self.alpha
+            self.roll = a * (self.roll + gx * dt) + (1 - a) * roll_acc
+            self.pitch = a * (self.pitch + gy * dt) + (1 - a) * pitch_acc
+            self.yaw += gz * dt
+        self.last_t = t
+        return self.quaternion()
+
+    def replay(self, accel, gyro, t):
+        """Runs the filter over N recorded samples and returns (N, 4) quaternions.
+
+        Produces the same result as calling update() per sample, and leaves the
+        filter in the state after the last sample so live updates can continue.
+        """
+        accel = np.asarray(accel, dtype=np.float64)
+        gyro = np.asarray(gyro, dtype=np.float64)
+        t = np.asarray(t, dtype=np.float64)
+        n = len(t)
+        if n == 0:
+            return np.empty((0, 4))
+
+        roll_acc, pitch_acc = accel_to_roll_pitch(accel)
+        dt = np.empty(n)
+        dt[1:] = np.diff(t)
+        dt[0] = 0.0 if self.last_t is None else t[0] - self.last_t
+        np.clip(dt, 0.0, self.max_dt, out=dt)
+
+        roll = np.empty(n)
+        pitch = np.empty(n)
+        if self.last_t is None:
+            # The first sample initialises from gravity, as update() does
+            roll[0], pitch[0] = roll_acc[0], pitch_acc[0]
+            first = 1
+        else:
+            first = 0
+        y_roll = roll[0] if first else self.roll
+        y_pitch = pitch[0] if first else self.pitch
+        roll[first:] = self._blend(y_roll, gyro[first:, 0] * dt[first:], roll_acc[first:])
+        pitch[first:] = self._blend(y_pitch, gyro[first:, 1] * dt[first:], pitch_acc[first:])
+        yaw = self.yaw + np.cumsum(gyro[:, 2] * dt)
+
+        self.roll, self.pitch, self.yaw = float(roll[-1]), float(pitch[-1]), float(yaw[-1])
+        self.last_t = float(t[-1])
+        return euler_to_quaternion(roll, pitch, yaw)
+
+    def _blend(self, y0, delta, measured):
+        """Solves y[k] = a * (y[k-1] + delta[k]) + (1 - a) * measured[k] block-wise.
+
+        Within a block the recurrence has the closed form
+        y[k] = a^(k+1) * y0 + a^k * cumsum(u[j] / a^j), u = a * delta + (1 - a) * measured;
+        blocks are sized so a^-j stays within float precision.
+        """
+        a = self.alpha
+        n = len(delta)
+        out = np.empty(n)
+        if n == 0:
+            return out
+        if a <= 0.0:
+            out[:] = measured
+            return out
+        if a >= 1.0:
+            return y0 + np.cumsum(delta)
+
+        block = int(max(1, min(256, math.log(1e6) / -math.log(a))))
+        powers = a ** np.arange(block + 1)
+        inv_powers = 1.0 / powers[:-1]
+        u = a * delta + (1 - a) * measured
+
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            m = stop - start
+            acc = np.cumsum(u[start:stop] * inv_powers[:m])
+            out[start:stop] = powers[1:m + 1] * y0 + powers[:m] * acc
+            y0 = out[stop - 1]
+        return out
@@ -1,14 +1,77 @@
-import cv2
 from PyQt5.QtWidgets import (
-    QWidget, QLabel, QVBoxLayout, QComboBox, QHBoxLayout, QSizePolicy
+    QApplication, QWidget, QLabel, QVBoxLayout, QComboBox, QHBoxLayout, QSizePolicy, QInputDialog
 )
-from PyQt5.QtGui import QPixmap, QImage
-from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtGui import QPainter, QColor, QPen
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 import time
 
+from camera_capture import CaptureWorker
+from instrumentation import metrics, timed
+from telemetry import MQTT_SOURCE
+from video_sources import VideoStreamWorker
+
+
+class FrameView(QWidget):
+    """Paints the current pooled frame straight from its buffer.
+
+    Replaces QLabel.setPixmap, which converted every frame into a new
+    QPixmap. The frame is held (not copied) until the next one arrives and
+    is then handed back to its pool. Obstacle boxes from the detector are
+    drawn on top until they are older than BOX_LIFETIME.
+    """
+
+    BOX_LIFETIME = 1.0
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.frame = None
+        self.message = ""
+        self.boxes = []
+        self.boxes_time = 0.0
+        self.box_pen = QPen(QColor("#F0B429"), 2)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def set_frame(self, frame):
+        previous = self.frame
+        self.frame = frame
+        self.message = ""
+        if previous is not None:
+            previous.release()
+        self.update()
+
+    def set_message(self, text):
+        self.set_frame(None)
+        self.message = text
+
+    def set_boxes(self, boxes):
+        """(x, y, w, h) boxes as fractions of the frame"""
+        self.boxes = boxes
+        self.boxes_time = time.time()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if self.frame is not None:
+            # Scales only if the widget size differs from the capture size
+            painter.drawImage(self.rect(), self.frame.image)
+            if self.boxes and time.time() - self.boxes_time < self.BOX_LIFETIME:
+                w, h = self.width(), self.height()
+                painter.setPen(self.box_pen)
+                for x, y, bw, bh in self.boxes:
+                    painter.drawRect(int(x * w), int(y * h), int(bw * w), int(bh * h))
+        else:
+            painter.fillRect(self.rect(), QColor("#0F1C2E"))
+            painter.setPen(QColor("grey"))
+            painter.drawText(self.rect(), Qt.AlignCenter, self.message)
+        painter.end()
+
 
 class CameraPanel(QWidget):
-    def __init__(self):
+    """Local USB cameras or a network stream from the robot (MJPEG/RTSP/UDP URL or JPEG over MQTT)"""
+
+    quality_changed = pyqtSignal(int, int)  # decode downscale, requested JPEG quality
+    obstacles_detected = pyqtSignal(object)  # vision_detector.Detections, from the collector thread
+
+    def __init__(self, source=1, vision_workers=0, record_dir=None, record_max_bytes=2 * 1024 ** 3):
         super().__init__()
 
         self.setStyleSheet("background-color: #0F1C2E;")
@@ -17,9 +80,15 @@ class CameraPanel(QWidget):
         main_layout = QVBoxLayout()
         top_bar = QHBoxLayout()
 
-        # --- Camera Selector
+        # --- Source Selector (item data: USB index, MQTT_SOURCE or a stream URL)
         self.camera_selector = QComboBox()
-        self.camera_selector.addItems(["Camera 0", "Camera 1"])
+        self.camera_selector.addItem("Camera 0", 0)
+        self.camera_selector.addItem("Camera 1", 1)
+        self.camera_selector.addItem("Robot camera (MQTT)", MQTT_SOURCE)
+        self.camera_selector.addItem("Stream URL…", None)
+        if isinstance(source, str) and source != MQTT_SOURCE:
+            self.add_stream_item(source)
+        self.camera_selector.setCurrentIndex(self.camera_selector.findData(source))
         self.camera_selector.currentIndexChanged.connect(self.change_camera)
         self.camera_selector.setStyleSheet("""
             QComboBox {
@@ -30,7 +99,7 @@ class CameraPanel(QWidget):
             }
         """)
 
-        # --- FPS Label
+        # --- FPS Label (received / decoded / displayed)
         self.fps_label = QLabel("FPS: 0")
         self.fps_label.setStyleSheet("color: grey; font-size: 10px; margin-left: 10px;")
         top_bar.addWidget(self.camera_selector)
@@ -38,46 +107,159 @@ class CameraPanel(QWidget):
         top_bar.addStretch()
 
         # --- Camera Feed Display
-        self.image_label = QLabel()
-        self.image_label.setAlignment(Qt.AlignCenter)
+        self.frame_view = FrameView()
 
         # Reduce camera size to 4/5 of card width and height
-        self.image_label.setFixedSize(int(310), int(220))  # 4/5 of card approx
-        self.image_label.setStyleSheet("border-radius: 10px;")
+        self.frame_view.setFixedSize(int(310), int(220))  # 4/5 of card approx
 
         # --- Add widgets
         main_layout.addLayout(top_bar)
-        main_layout.addWidget(self.image_label)
+        main_layout.addWidget(self.frame_view)
         self.setLayout(main_layout)
 
-        # --- Timer and Capture
-        self.cap = cv2.VideoCapture(1)
+        # --- Obstacle detection in worker processes (optional, fed by the capture worker)
+        self.detector = None
+        if vision_workers:
+            from vision_detector import DetectorPool
+            self.detector = DetectorPool(workers=vision_workers, on_result=self.obstacles_detected.emit)
+            self.obstacles_detected.connect(self.on_detections)
+
+        # --- Video recording (optional, encoded on its own thread from the capture worker's frames)
+        self.recorder = None
+        self.last_recorded = 0
+        if record_dir:
+            from video_recorder import VideoRecorder
+            self.recorder = VideoRecorder(record_dir, max_bytes=record_max_bytes)
+
+        # --- Capture worker (grab/receive, decode and resize run off the GUI thread)
+        self.capture = None
+        self.source = None
+        self.frames_displayed = 0
+        self.last_analysed = 0
         self.last_time = time.time()
+        self.start_capture(source)
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_frame)
-        self.timer.start(30)
+        self.fps_timer = QTimer(self)
+        self.fps_timer.timeout.connect(self.update_fps)
+        self.fps_timer.start(1000)
+
+        # Child widgets never get closeEvent when the main window closes
+        QApplication.instance().aboutToQuit.connect(self.stop_capture)
+        QApplication.instance().aboutToQuit.connect(self.stop_detector)
+        QApplication.instance().aboutToQuit.connect(self.stop_recorder)  # After capture: no more frames
+
+    # --- Sources
+
+    def add_stream_item(self, url):
+        index = self.camera_selector.count() - 1  # Above "Stream URL…"
+        self.camera_selector.insertItem(index, url, url)
+        return index
+
+    def start_capture(self, source):
+        size = (self.frame_view.width(), self.frame_view.height())
+        if isinstance(source, int):
+            worker = CaptureWorker(index=source, size=size)
+            worker.camera_opened.connect(self.on_camera_opened)
+        else:
+            worker = VideoStreamWorker(source, size=size)
+            worker.source_opened.connect(self.on_source_opened)
+            worker.quality_changed.connect(self.quality_changed.emit)
+        worker.frame_available.connect(self.update_frame)
+        worker.analyzer = self.detector
+        worker.recorder = self.recorder
+        self.capture = worker
+        self.source = source
+        self.last_counts = (0, 0, self.frames_displayed)  # New worker counts from zero
+        worker.start()
+
+    def stop_capture(self):
+        if self.capture is not None:
+            self.capture.stop()
+
+    def stop_detector(self):
+        if self.detector is not None:
+            self.detector.stop()
+
+    def stop_recorder(self):
+        if self.recorder is not None:
+            self.recorder.stop()
 
     def change_camera(self, index):
-        self.cap.release()
-        self.cap = cv2.VideoCapture(index)
+        source = self.camera_selector.itemData(index)
+        if source is None:
+            url, ok = QInputDialog.getText(self, "Video stream", "MJPEG (http://), RTSP or UDP URL:")
+            if not ok or not url.strip():
+                self.camera_selector.blockSignals(True)
+                self.camera_selector.setCurrentIndex(max(0, self.camera_selector.findData(self.source)))
+                self.camera_selector.blockSignals(False)
+                return
+            self.camera_selector.setCurrentIndex(self.add_stream_item(url.strip()))  # Re-enters with the URL
+            return
+        if isinstance(source, int) and isinstance(self.source, int):
+            self.capture.change_camera(source)  # Same USB worker reopens the device
+            self.source = source
+            return
+        self.stop_capture()
+        self.frame_view.set_message(f"Connecting to {self.camera_selector.itemText(index)}…")
+        self.start_capture(source)
 
+    def push_jpeg(self, payload):
+        """JPEG frame from the robot's camera topic; called on the MQTT network thread"""
+        worker = self.capture
+        if self.source == MQTT_SOURCE and worker is not None:
+            worker.push_jpeg(payload)
+
+    def on_camera_opened(self, index, ok):
+        if not ok:
+            self.frame_view.set_message(f"Camera {index} unavailable")
+            self.fps_label.setText("FPS: 0")
+
+    def on_source_opened(self, source, ok):
+        if source == self.source and not ok:
+            self.frame_view.set_message(f"{source} unavailable, retrying")
+
+    # --- Frames
+
+    @timed("camera.update_frame")
     def update_frame(self):
-        ret, frame = self.cap.read()
-        if ret:
-            frame = cv2.resize(frame, (self.image_label.width(), self.image_label.height()))
-            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_image.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            self.image_label.setPixmap(QPixmap.fromImage(qt_image))
-
-            # FPS calculation
-            current_time = time.time()
-            fps = 1.0 / (current_time - self.last_time)
-            self.fps_label.setText(f"FPS: {fps:.1f}")
-            self.last_time = current_time
+        frame = self.capture.latest_frame()
+        if frame is None:
+            return
+        self.frame_view.set_frame(frame)
+        self.frames_displayed += 1
+        metrics.count("camera.frames_displayed")
+
+    def on_detections(self, detections):
+        self.frame_view.set_boxes(detections.boxes)
+
+    def update_fps(self):
+        """Received, decoded and displayed rates over the last second"""
+        current_time = time.time()
+        elapsed = max(current_time - self.last_time, 1e-6)
+        counts = (self.capture.received, self.capture.decoded, self.frames_displayed)
+        rx, dec, disp = ((now - last) / elapsed for now, last in zip(counts, self.last_counts))
+        text = f"rx {rx:.1f} · dec {dec:.1f} · disp {disp:.1f} fps"
+        quality = getattr(self.capture, "quality", None)
+        if quality is not None and quality.scale > 1:
+            text += f" · 1/{quality.scale}"
+        if self.detector is not None:
+            # Analysis rate, submit-to-result latency and how busy the worker processes were
+            analysed = self.detector.analysed
+            rate = (analysed - self.last_analysed) / elapsed
+            self.last_analysed = analysed
+            latency = self.detector.latency.summary()["p50_ms"]
+            text += f" · det {rate:.1f}/s {latency:.0f} ms {self.detector.utilisation():.0%}"
+        if self.recorder is not None:
+            recorded = self.recorder.recorded
+            text += f" · rec {(recorded - self.last_recorded) / elapsed:.1f} fps"
+            self.last_recorded = recorded
+            if self.recorder.error:
+                text += " (error)"
+            self.fps_label.setToolTip(self.recorder.error or "")
+        self.fps_label.setText(text)
+        self.last_counts = counts
+        self.last_time = current_time
 
     def closeEvent(self, event):
-        self.cap.release()
+        self.stop_capture()
         event.accept()
@@ -1,9 +1,23 @@
 # panels/controller_panel.py
 
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QGridLayout
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QGridLayout, QLabel
 from PyQt5.QtCore import Qt, QPropertyAnimation, QRect
 from PyQt5.QtGui import QFont
 
+try:
+    from PyQt5.QtGamepad import QGamepad, QGamepadManager
+except ImportError:  # QtGamepad is an optional Qt module
+    QGamepad = None
+
+# Hold-to-drive keys (arrows and WASD)
+KEY_COMMANDS = {
+    Qt.Key_Up: "FWD", Qt.Key_W: "FWD",
+    Qt.Key_Down: "BWD", Qt.Key_S: "BWD",
+    Qt.Key_Left: "LFT", Qt.Key_A: "LFT",
+    Qt.Key_Right: "RHT", Qt.Key_D: "RHT",
+}
+GAMEPAD_DEADZONE = 0.5
+
 class ControllerPanel(QWidget):
     def __init__(self, command_callback=None):
         super().__init__()
@@ -28,9 +42,30 @@ class ControllerPanel(QWidget):
         self.grid.addWidget(self.btn_right, 1, 2, alignment=Qt.AlignCenter)
         self.grid.addWidget(self.btn_backward, 2, 1, alignment=Qt.AlignCenter)
 
+        self.latency_label = QLabel("ack latency: --")
+        self.latency_label.setFont(QFont("Arial", 8))
+        self.latency_label.setStyleSheet("color: grey;")
+        self.latency_label.setAlignment(Qt.AlignCenter)
+
+        self.control_label = QLabel("assist: --")
+        self.control_label.setFont(QFont("Arial", 8))
+        self.control_label.setStyleSheet("color: grey;")
+        self.control_label.setAlignment(Qt.AlignCenter)
+
         layout.addLayout(self.grid)
+        layout.addWidget(self.latency_label)
+        layout.addWidget(self.control_label)
         self.setLayout(layout)
 
+        # Keys currently held, newest last; the newest one drives
+        self.held_keys = []
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.gamepad = None
+        self.gamepad_command = "STP"
+        if QGamepad is not None:
+            QGamepadManager.instance().connectedGamepadsChanged.connect(self.connect_gamepad)
+            self.connect_gamepad()
+
     def create_button(self, icon, command):
         btn = QPushButton(icon)
         btn.setFixedSize(60, 60)
@@ -57,6 +92,71 @@ class ControllerPanel(QWidget):
         if self.command_callback:
             self.command_callback(cmd)
 
+    def handle_key(self, event, pressed):
+        """Drives while an arrow/WASD key is held; returns False for other keys"""
+        cmd = KEY_COMMANDS.get(event.key())
+        if cmd is None:
+            return False
+        if event.isAutoRepeat():
+            return True  # The teleop channel sends its own keepalives
+        key = event.key()
+        if key in self.held_keys:
+            self.held_keys.remove(key)
+        if pressed:
+            self.held_keys.append(key)
+        active = KEY_COMMANDS[self.held_keys[-1]] if self.held_keys else "STP"
+        if self.command_callback:
+            self.command_callback(active)
+        return True
+
+    def keyPressEvent(self, event):
+        if not self.handle_key(event, True):
+            super().keyPressEvent(event)
+
+    def keyReleaseEvent(self, event):
+        if not self.handle_key(event, False):
+            super().keyReleaseEvent(event)
+
+    def connect_gamepad(self):
+        pads = QGamepadManager.instance().connectedGamepads()
+        if not pads or self.gamepad is not None:
+            return
+        self.gamepad = QGamepad(pads[0], self)
+        self.gamepad.axisLeftXChanged.connect(self.update_gamepad)
+        self.gamepad.axisLeftYChanged.connect(self.update_gamepad)
+
+    def update_gamepad(self, _value=None):
+        x = self.gamepad.axisLeftX()
+        y = self.gamepad.axisLeftY()
+        if abs(y) >= abs(x) and abs(y) > GAMEPAD_DEADZONE:
+            cmd = "FWD" if y < 0 else "BWD"
+        elif abs(x) > GAMEPAD_DEADZONE:
+            cmd = "LFT" if x < 0 else "RHT"
+        else:
+            cmd = "STP"
+        if cmd != self.gamepad_command and self.command_callback:
+            self.gamepad_command = cmd
+            self.command_callback(cmd)
+
+    def set_latency(self, percentiles, stats):
+        if not percentiles:
+            self.latency_label.setText(f"ack latency: -- ({stats['sent']} sent)")
+            return
+        self.latency_label.setText(
+            f"ack p50 {percentiles[50]:.0f} · p95 {percentiles[95]:.0f} · "
+            f"p99 {percentiles[99]:.0f} ms ({stats['acked']}/{stats['sent']})"
+        )
+
+    def set_control_stats(self, stats):
+        """Assist loop state from ControlLoop.stats(); turns amber while a behaviour overrides"""
+        active = stats["active"]
+        text = (f"{active or 'assist'} · {stats['rate_hz']:.0f} Hz · jitter p99 {stats['jitter']['p99_ms']:.1f} ms"
+                f" · {stats['overruns']} overruns")
+        if stats["blind"]:
+            text += f" · stale readings: {', '.join(stats['blind'])}"
+        self.control_label.setText(text)
+        self.control_label.setStyleSheet("color: #F0B429;" if active or stats["blind"] else "color: grey;")
+
     def animate_button(self, button):
         animation = QPropertyAnimation(button, b"geometry")
         rect = button.geometry()
@@ -0,0 +1,109 @@
+# panels/fleet_panel.py
+
+import time
+
+from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QGridLayout, QPushButton, QScrollArea
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont
+
+from telemetry import TOPIC_TEMP, TOPIC_HUMIDITY, TOPIC_GAS_AIR, TOPIC_DISTANCE
+
+STALE_AFTER = 10.0  # s without messages before a tile is greyed out
+
+
+def format_value(value, fmt):
+    return fmt.format(value) if isinstance(value, (int, float)) else "--"
+
+
+class RobotTile(QPushButton):
+    """One robot's summary; clicking it opens that robot in the detail view"""
+
+    def __init__(self, robot_id):
+        super().__init__()
+        self.robot_id = robot_id
+        self.setMinimumSize(180, 110)
+        self.setCursor(Qt.PointingHandCursor)
+        self.setStyleSheet("""
+            QPushButton {
+                background-color: #1C2A3A;
+                border-radius: 12px;
+                text-align: left;
+            }
+            QPushButton:hover {
+                background-color: #243B55;
+            }
+            QLabel {
+                color: white;
+                background: transparent;
+            }
+        """)
+
+        layout = QVBoxLayout(self)
+        self.title = QLabel(robot_id)
+        self.title.setFont(QFont("Arial", 11, QFont.Bold))
+        self.body = QLabel("waiting for data")
+        self.body.setFont(QFont("Arial", 9))
+        self.status = QLabel("")
+        self.status.setFont(QFont("Arial", 8))
+        layout.addWidget(self.title)
+        layout.addWidget(self.body)
+        layout.addWidget(self.status)
+
+    def update_state(self, state, now):
+        latest = state.latest
+        self.body.setText(
+            f"🌡 {format_value(latest.get(TOPIC_TEMP), '{:.1f} °C')}   "
+            f"💧 {format_value(latest.get(TOPIC_HUMIDITY), '{:.0f} %')}\n"
+            f"🌫 {format_value(latest.get(TOPIC_GAS_AIR), '{}')}   "
+            f"📏 {format_value(latest.get(TOPIC_DISTANCE), '{:.0f} cm')}"
+        )
+        age = now - state.last_seen
+        stale = age > STALE_AFTER
+        self.status.setText(f"{state.message_rate(now):.1f} msg/s · {age:.0f} s ago")
+        self.status.setStyleSheet("color: #FF7043;" if stale else "color: #66BB6A;")
+
+
+class FleetPanel(QScrollArea):
+    """Tiled overview of every robot seen on the shared connection.
+
+    Tiles are refreshed from the fleet's RobotState objects on a slow timer,
+    so incoming messages never touch these widgets directly.
+    """
+
+    robot_selected = pyqtSignal(str)
+
+    def __init__(self, fleet, columns=3, refresh_hz=2):
+        super().__init__()
+        self.fleet = fleet
+        self.columns = columns
+        self.tiles = {}
+
+        self.setWidgetResizable(True)
+        self.setStyleSheet("QScrollArea { border: none; background: transparent; }")
+        container = QWidget()
+        self.grid = QGridLayout(container)
+        self.grid.setSpacing(10)
+        self.grid.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        self.setWidget(container)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(int(1000 / refresh_hz))
+
+    def add_robot(self, robot_id):
+        if robot_id in self.tiles:
+            return
+        tile = RobotTile(robot_id)
+        tile.clicked.connect(lambda _=False, r=robot_id: self.robot_selected.emit(r))
+        n = len(self.tiles)
+        self.grid.addWidget(tile, n // self.columns, n % self.columns)
+        self.tiles[robot_id] = tile
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        now = time.time()
+        for state in self.fleet:
+            tile = self.tiles.get(state.robot_id)
+            if tile is not None:
+                tile.update_state(state, now)
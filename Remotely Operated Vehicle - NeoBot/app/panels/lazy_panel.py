@@ -0,0 +1,53 @@
+# panels/lazy_panel.py
+
+import time
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+
+
+class LazyPanel(QWidget):
+    """Placeholder that builds the real panel the first time it is shown.
+
+    factory() runs one event-loop turn after the placeholder is first
+    painted, so the window appears before heavy imports (OpenGL, OpenCV,
+    pyqtgraph) and device setup happen. Until then `panel` is None and
+    callers should skip updates.
+    """
+
+    built = pyqtSignal(QWidget)
+
+    def __init__(self, factory, name="panel"):
+        super().__init__()
+        self.factory = factory
+        self.name = name
+        self.panel = None
+        self.build_time = None  # seconds spent in factory()
+        self._scheduled = False
+
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self.placeholder = QLabel(f"Loading {name}…")
+        self.placeholder.setAlignment(Qt.AlignCenter)
+        self.placeholder.setStyleSheet("color: grey;")
+        self._layout.addWidget(self.placeholder)
+
+    def paintEvent(self, event):
+        # Scheduled from the first paint rather than showEvent, so the window
+        # (placeholder included) is on screen before the factory runs
+        super().paintEvent(event)
+        if self.panel is None and not self._scheduled:
+            self._scheduled = True
+            QTimer.singleShot(0, self.build)
+
+    def build(self):
+        if self.panel is not None:
+            return self.panel
+        start = time.perf_counter()
+        self.panel = self.factory()
+        self.build_time = time.perf_counter() - start
+        self._layout.removeWidget(self.placeholder)
+        self.placeholder.deleteLater()
+        self._layout.addWidget(self.panel)
+        self.built.emit(self.panel)
+        return self.panel
@@ -1,27 +1,186 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTextEdit
+from collections import deque
 
-class LogPanel(QWidget):
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QListView, QComboBox, QCheckBox, QAbstractItemView
+)
+from PyQt5.QtCore import (
+    Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel, QTimer
+)
+
+from instrumentation import timed
+
+ALL_TOPICS = "All topics"
+
+
+class RingBuffer:
+    """Fixed-capacity FIFO with O(1) append and O(1) random access"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._items = [None] * capacity
+        self._start = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        return self._items[(self._start + i) % self.capacity]
+
+    def append(self, item):
+        """Appends item, overwriting the oldest entry when full"""
+        end = (self._start + self._count) % self.capacity
+        self._items[end] = item
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def drop_oldest(self, n):
+        for _ in range(min(n, self._count)):
+            self._items[self._start] = None
+            self._start = (self._start + 1) % self.capacity
+            self._count -= 1
+
+
+class LogModel(QAbstractListModel):
+    TopicRole = Qt.UserRole + 1
+
+    def __init__(self, capacity=5000, parent=None):
+        super().__init__(parent)
+        self.rows = RingBuffer(capacity)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        topic, message = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return message
+        if role == LogModel.TopicRole:
+            return topic
+        return None
+
+    def extend(self, entries):
+        """Appends a batch of (topic, message) entries with one insert notification"""
+        capacity = self.rows.capacity
+        entries = list(entries)[-capacity:]
+        if not entries:
+            return
+
+        overflow = len(self.rows) + len(entries) - capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self.rows.drop_oldest(overflow)
+            self.endRemoveRows()
+
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        for entry in entries:
+            self.rows.append(entry)
+        self.endInsertRows()
+
+
+class TopicFilterModel(QSortFilterProxyModel):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.topic = None
+
+    def set_topic(self, topic):
+        self.topic = topic
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.topic is None:
+            return True
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        return self.sourceModel().data(index, LogModel.TopicRole) == self.topic
+
+
+class LogPanel(QWidget):
+    FLUSH_INTERVAL_MS = 250
+
+    def __init__(self, parent=None, capacity=5000):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.pending = deque(maxlen=capacity)
+        self.known_topics = set()
         self.init_ui()
 
     def init_ui(self):
         layout = QVBoxLayout()
 
-        self.log_box = QTextEdit()
-        self.log_box.setReadOnly(True)
-        self.log_box.setStyleSheet("""
+        # --- Filter bar
+        filter_bar = QHBoxLayout()
+        self.topic_selector = QComboBox()
+        self.topic_selector.addItem(ALL_TOPICS)
+        self.topic_selector.currentTextChanged.connect(self.on_topic_selected)
+        self.topic_selector.setStyleSheet("""
+            QComboBox {
+                background-color: #1C2A3A;
+                color: white;
+                padding: 3px;
+                border-radius: 5px;
+            }
+        """)
+        self.pause_checkbox = QCheckBox("Pause scroll")
+        self.pause_checkbox.setStyleSheet("color: #CCCCCC; font-size: 11px;")
+        filter_bar.addWidget(self.topic_selector)
+        filter_bar.addWidget(self.pause_checkbox)
+        filter_bar.addStretch()
+
+        # --- Buffered model, only the visible rows are rendered
+        self.model = LogModel(self.capacity, self)
+        self.filter_model = TopicFilterModel(self)
+        self.filter_model.setSourceModel(self.model)
+
+        self.log_view = QListView()
+        self.log_view.setModel(self.filter_model)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.log_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.log_view.setStyleSheet("""
             background-color: #0b2740;
             color: #CCCCCC;
             border-radius: 10px;
             font-size: 11px;
         """)
 
-        layout.addWidget(self.log_box)
+        layout.addLayout(filter_bar)
+        layout.addWidget(self.log_view)
         self.setLayout(layout)
 
+        # --- Appends are collected and flushed a few times per second
+        self.flush_timer = QTimer(self)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start(self.FLUSH_INTERVAL_MS)
+
         # Initial system message
         self.add_log("🟢 NeoBot Controller is Ready")
+        self.flush()
+
+    def add_log(self, message, topic=None):
+        self.pending.append((topic, message))
+
+    @timed("log.flush")
+    def flush(self):
+        if not self.pending:
+            return
+        entries = list(self.pending)
+        self.pending.clear()
+
+        for topic, _ in entries:
+            if topic is not None and topic not in self.known_topics:
+                self.known_topics.add(topic)
+                self.topic_selector.addItem(topic)
+
+        self.model.extend(entries)
+        if not self.pause_checkbox.isChecked():
+            self.log_view.scrollToBottom()
 
-    def add_log(self, message):
-        self.log_box.append(message)
+    def on_topic_selected(self, text):
+        self.filter_model.set_topic(None if text == ALL_TOPICS else text)
+        if not self.pause_checkbox.isChecked():
+            self.log_view.scrollToBottom()
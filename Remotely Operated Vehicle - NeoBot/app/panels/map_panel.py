@@ -0,0 +1,103 @@
+# panels/map_panel.py
+
+import math
+
+import numpy as np
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QTimer, QRectF, QPointF
+from PyQt5.QtGui import QPainter, QColor, QPen, QBrush, QImage, QPolygonF
+
+from instrumentation import timed
+from occupancy_map import CELL_CM, L_MAX, TILE
+
+
+def tile_image(log_odds):
+    """QImage of one tile: free white, unknown grey, occupied black.
+
+    Converted to RGB32 once here, so painting never converts from grayscale.
+    """
+    pixels = np.ascontiguousarray(127.0 - log_odds * (127.0 / L_MAX), dtype=np.uint8)
+    return QImage(pixels.data, TILE, TILE, TILE, QImage.Format_Grayscale8).convertToFormat(QImage.Format_RGB32)
+
+
+class MapPanel(QWidget):
+    """Occupancy grid of the selected robot, centred on its dead-reckoned pose.
+
+    Every REFRESH_MS it takes only the tiles the mapper changed since the
+    previous refresh and re-renders just those into cached images. Painting
+    is one scaled drawImage per visible tile.
+    """
+
+    REFRESH_MS = 200
+    CELL_PX = 1.5  # 200 px = 200 cells = 10 m at 5 cm cells
+
+    def __init__(self, mapper, robot_id):
+        super().__init__()
+        self.mapper = mapper
+        self.robot_id = robot_id
+        self.images = {}  # (tile x, tile y) -> QImage
+        self.pose = None
+        self.reload = True
+        self.setMinimumSize(300, 200)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.robot_pen = QPen(QColor("#3EBD93"), 0)
+        self.robot_brush = QBrush(QColor("#3EBD93"))
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(self.REFRESH_MS)
+
+    def set_robot(self, robot_id):
+        if robot_id != self.robot_id:
+            self.robot_id = robot_id
+            self.images = {}
+            self.pose = None
+            self.reload = True
+            self.refresh()
+
+    @timed("ui.map_refresh")
+    def refresh(self):
+        if not self.isVisible():
+            return
+        tiles, pose = self.mapper.take_dirty(self.robot_id, everything=self.reload)
+        if pose is None:
+            return
+        self.reload = False
+        for key, log_odds in tiles.items():
+            self.images[key] = tile_image(log_odds)
+        if tiles or pose != self.pose:
+            self.pose = pose
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#0F1C2E"))
+        if self.pose is None:
+            painter.setPen(QColor("grey"))
+            painter.drawText(self.rect(), Qt.AlignCenter, "waiting for distance readings")
+            painter.end()
+            return
+
+        # Map coordinates in cells, y up; the robot stays in the middle of the panel
+        x, y, heading = self.pose
+        cx, cy = x / CELL_CM, y / CELL_CM
+        scale = self.CELL_PX
+        half_w = self.width() / (2 * scale)
+        half_h = self.height() / (2 * scale)
+        painter.translate(self.width() / 2, self.height() / 2)
+        painter.scale(scale, -scale)
+        painter.translate(-cx, -cy)
+
+        x0, x1 = int((cx - half_w) // TILE), int((cx + half_w) // TILE)
+        y0, y1 = int((cy - half_h) // TILE), int((cy + half_h) // TILE)
+        for (tx, ty), image in self.images.items():
+            if x0 <= tx <= x1 and y0 <= ty <= y1:
+                # Row 0 is the tile's lowest y, the flipped axis draws it at the bottom
+                painter.drawImage(QRectF(tx * TILE, ty * TILE, TILE, TILE), image)
+
+        painter.translate(cx, cy)
+        painter.rotate(math.degrees(heading))
+        painter.setPen(self.robot_pen)
+        painter.setBrush(self.robot_brush)
+        painter.drawPolygon(QPolygonF([QPointF(4, 0), QPointF(-3, 2.5), QPointF(-3, -2.5)]))
+        painter.end()
@@ -0,0 +1,118 @@
+# panels/perf_panel.py
+
+import time
+
+from PyQt5.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QLabel, QPushButton
+from PyQt5.QtCore import Qt, QObject, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont
+
+from instrumentation import memory_rss_bytes, metrics
+
+
+class EventLoopLagMonitor(QObject):
+    """Measures how late a periodic timer fires, i.e. how long the GUI thread was busy"""
+
+    def __init__(self, interval_ms=50, parent=None):
+        super().__init__(parent)
+        self.interval = interval_ms / 1000.0
+        self.hist = metrics.histogram("ui.event_loop_lag")
+        self.last = time.perf_counter()
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+        self.timer.start(interval_ms)
+
+    def tick(self):
+        now = time.perf_counter()
+        self.hist.record(max(0.0, now - self.last - self.interval))
+        self.last = now
+
+
+class PerfPanel(QFrame):
+    """Translucent overlay with per-stage latency, message rates, event-loop lag and memory"""
+
+    export_requested = pyqtSignal()
+
+    def __init__(self, parent=None, refresh_ms=500):
+        super().__init__(parent)
+        self.setStyleSheet("""
+            QFrame {
+                background-color: rgba(8, 16, 28, 220);
+                border-radius: 10px;
+            }
+            QLabel {
+                color: #CFD8DC;
+                background: transparent;
+            }
+            QPushButton {
+                background-color: #1C2A3A;
+                color: white;
+                padding: 2px 8px;
+                border-radius: 4px;
+            }
+        """)
+
+        layout = QVBoxLayout(self)
+        header = QHBoxLayout()
+        title = QLabel("Performance")
+        title.setFont(QFont("Arial", 9, QFont.Bold))
+        self.export_button = QPushButton("Export")
+        self.export_button.clicked.connect(self.export_requested.emit)
+        self.reset_button = QPushButton("Reset")
+        self.reset_button.clicked.connect(metrics.reset)
+        header.addWidget(title)
+        header.addStretch()
+        header.addWidget(self.reset_button)
+        header.addWidget(self.export_button)
+
+        self.table = QLabel()
+        self.table.setFont(QFont("Consolas", 8))
+        self.table.setTextFormat(Qt.PlainText)
+        layout.addLayout(header)
+        layout.addWidget(self.table)
+
+        self.last_counters = {}
+        self.last_refresh = time.perf_counter()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(refresh_ms)
+        self.hide()
+
+    def refresh(self):
+        now = time.perf_counter()
+        elapsed = max(now - self.last_refresh, 1e-6)
+        self.last_refresh = now
+        counters = dict(metrics.counters)
+        rates = {name: (n - self.last_counters.get(name, 0)) / elapsed for name, n in counters.items()}
+        self.last_counters = counters
+        if not self.isVisible():
+            return
+
+        lines = [f"{'stage':<38}{'n':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}  ms"]
+        for name, h in sorted(metrics.histograms.items()):
+            if not h.count:
+                continue
+            s = h.summary()
+            lines.append(
+                f"{name[:37]:<38}{h.count:>8}{s['p50_ms']:>8.2f}{s['p95_ms']:>8.2f}"
+                f"{s['p99_ms']:>8.2f}{s['max_ms']:>8.1f}"
+            )
+        lines.append("")
+        for name, rate in sorted(rates.items()):
+            lines.append(f"{name:<38}{rate:>10.1f} /s")
+        lines.append(f"{'memory (RSS)':<38}{memory_rss_bytes() / 2 ** 20:>10.1f} MiB")
+        self.table.setText("\n".join(lines))
+        self.adjustSize()
+        self.dock()
+
+    def dock(self):
+        """Keeps the overlay in the parent's top-right corner"""
+        parent = self.parentWidget()
+        if parent is not None:
+            self.move(max(0, parent.width() - self.width() - 12), 44)
+
+    def toggle(self):
+        self.setVisible(not self.isVisible())
+        if self.isVisible():
+            self.raise_()
+            self.refresh()
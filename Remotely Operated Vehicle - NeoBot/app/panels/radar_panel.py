@@ -1,14 +1,15 @@
 import sys
 import math
 import time
-import random
 from PyQt5.QtWidgets import (
-    QApplication, QGraphicsView, QGraphicsScene, QGraphicsEllipseItem,
+    QApplication, QGraphicsView, QGraphicsScene, QGraphicsEllipseItem, QGraphicsRectItem,
     QGraphicsTextItem, QVBoxLayout, QWidget
 )
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QPen, QBrush, QColor, QPainter, QFont
 
+from instrumentation import timed
+
 class RadarPanel(QGraphicsView):
     def __init__(self):
         super().__init__()
@@ -21,22 +22,55 @@ class RadarPanel(QGraphicsView):
         self.scene = QGraphicsScene(self)
         self.setScene(self.scene)
 
+        self.blip_lifetime = 2.0
+        self.pool_size = 64
+
         self.radar_rings = []
         self.range_labels = []
-        self.blips = []
-        self.scan_line = None
         self.angle = 0
 
         self.draw_static_elements()
 
+        # Collision warning from the derived distance channel, hidden until it fires
+        self.warning = QGraphicsTextItem("")
+        self.warning.setDefaultTextColor(QColor("#EF4E4E"))
+        self.warning.setFont(QFont("Arial", 9, QFont.Bold))
+        self.warning.setPos(5, 5)
+        self.warning.setZValue(1)
+        self.warning.setVisible(False)
+        self.scene.addItem(self.warning)
+
+        # Scan line is created once and moved every tick
+        self.scan_line = self.scene.addLine(self.radius, self.radius, 2 * self.radius, self.radius, QPen(Qt.green))
+
+        # Fixed pool of blip items, reused round-robin so the scene never grows
+        self.blips = []
+        self.blip_times = [0.0] * self.pool_size
+        self.next_blip = 0
+        for _ in range(self.pool_size):
+            dot = QGraphicsEllipseItem(-3, -3, 6, 6)
+            dot.setPen(QPen(Qt.red))
+            dot.setBrush(QBrush(Qt.red))
+            dot.setVisible(False)
+            self.scene.addItem(dot)
+            self.blips.append(dot)
+
+        # Camera obstacles, replaced as a set by every detector result
+        self.obstacle_lifetime = 1.0
+        self.obstacle_time = 0.0
+        self.obstacles = []
+        for _ in range(8):
+            marker = QGraphicsRectItem(-4, -4, 8, 8)
+            marker.setPen(QPen(QColor("#F0B429")))
+            marker.setBrush(QBrush(QColor(240, 180, 41, 120)))
+            marker.setVisible(False)
+            self.scene.addItem(marker)
+            self.obstacles.append(marker)
+
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_radar)
         self.timer.start(50)
 
-        self.cleanup_timer = QTimer()
-        self.cleanup_timer.timeout.connect(self.cleanup_blips)
-        self.cleanup_timer.start(500)
-
     def draw_static_elements(self):
         pen = QPen(QColor("green"))
         for r in range(50, self.max_range_cm + 1, 50):
@@ -53,42 +87,67 @@ class RadarPanel(QGraphicsView):
             self.scene.addItem(label)
             self.range_labels.append(label)
 
+    @timed("radar.update_radar")
     def update_radar(self):
-        if self.scan_line:
-            self.scene.removeItem(self.scan_line)
-
         angle_rad = math.radians(self.angle)
         x = self.radius + self.radius * math.cos(angle_rad)
         y = self.radius - self.radius * math.sin(angle_rad)
-        self.scan_line = self.scene.addLine(self.radius, self.radius, x, y, QPen(Qt.green))
+        self.scan_line.setLine(self.radius, self.radius, x, y)
 
         now = time.time()
-        for item, t in self.blips:
-            if now - t < 2.0:
-                item.setVisible(True)
-            else:
-                item.setVisible(False)
-
-        if random.random() < 0.15:
-            distance = random.randint(20, 180)
-            self.add_blip(self.angle, distance)
+        for i, item in enumerate(self.blips):
+            if item.isVisible():
+                age = now - self.blip_times[i]
+                if age >= self.blip_lifetime:
+                    item.setVisible(False)
+                else:
+                    item.setOpacity(1.0 - age / self.blip_lifetime)
+
+        if now - self.obstacle_time >= self.obstacle_lifetime:
+            for marker in self.obstacles:
+                marker.setVisible(False)
 
         self.angle = (self.angle + 3) % 180
 
-    def add_blip(self, angle_deg, distance_cm):
+    def set_distance(self, distance_cm):
+        """Plots a distance reading at the current sweep angle"""
+        try:
+            distance_cm = float(distance_cm)
+        except (TypeError, ValueError):
+            return
+        if 0 < distance_cm <= self.max_range_cm:
+            self.add_blip(self.angle, distance_cm)
+
+    def set_collision_warning(self, stats):
+        """Shows time to contact while the derived distance channel flags an approach"""
+        if stats.get("anomaly") == "approach" and stats.get("ttc") is not None:
+            self.warning.setPlainText(f"⚠ contact in {stats['ttc']:.1f} s ({stats['value']:.0f} cm)")
+            self.warning.setVisible(True)
+        elif self.warning.isVisible():
+            self.warning.setVisible(False)
+
+    def set_obstacles(self, detections):
+        """Places the camera's obstacles (radar angle, distance) and hides the markers left over"""
+        points = [p for p in detections.obstacles if p is not None and p[1] <= self.max_range_cm]
+        for i, marker in enumerate(self.obstacles):
+            if i < len(points):
+                angle_deg, distance_cm = points[i]
+                marker.setPos(*self.to_scene(angle_deg, distance_cm))
+                marker.setVisible(True)
+            else:
+                marker.setVisible(False)
+        self.obstacle_time = time.time()
+
+    def to_scene(self, angle_deg, distance_cm):
         angle_rad = math.radians(angle_deg)
         r = self.radius * (distance_cm / self.max_range_cm)
-        x = self.radius + r * math.cos(angle_rad)
-        y = self.radius - r * math.sin(angle_rad)
-
-        dot = QGraphicsEllipseItem(x - 3, y - 3, 6, 6)
-        dot.setPen(QPen(Qt.red))
-        dot.setBrush(QBrush(Qt.red))
-        self.scene.addItem(dot)
-        self.blips.append((dot, time.time()))
-
-    def cleanup_blips(self):
-        now = time.time()
-        self.blips = [(item, t) for item, t in self.blips if now - t < 2.0]
-
+        return self.radius + r * math.cos(angle_rad), self.radius - r * math.sin(angle_rad)
 
+    def add_blip(self, angle_deg, distance_cm):
+        x, y = self.to_scene(angle_deg, distance_cm)
+        dot = self.blips[self.next_blip]
+        dot.setPos(x, y)
+        dot.setOpacity(1.0)
+        dot.setVisible(True)
+        self.blip_times[self.next_blip] = time.time()
+        self.next_blip = (self.next_blip + 1) % self.pool_size
@@ -1,11 +1,26 @@
 from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QHBoxLayout
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, pyqtSignal
+
+from sensor_rules import UNKNOWN_DISPLAY, load_rules
 
 
 class SensorPanel(QWidget):
-    def __init__(self, temp_val, humidity_val, air_quality_val, light_val):
+    """Sensor cards whose icon/status come from the rules table (sensor_rules.py).
+
+    Card widgets are only touched when a sensor's status bucket or its
+    displayed text actually changes, not on every sample.
+    """
+
+    status_changed = pyqtSignal(str, str, bool, str)  # sensor, status, alert, displayed value
+
+    # Derived channel (stream_stats.py) -> card, and the window its trend line summarises
+    STATS_CARDS = {"temperature": "temperature", "humidity": "humidity", "gas": "air_quality", "light": "light"}
+    STATS_WINDOW = "60s"
+
+    def __init__(self, temp_val, humidity_val, air_quality_val, light_val, rules=None):
         super().__init__()
+        self.rules = rules if rules is not None else load_rules()
 
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
@@ -23,6 +38,12 @@ class SensorPanel(QWidget):
         self.sensor_layout.addWidget(self.humidity_widget)
         self.sensor_layout.addWidget(self.air_quality_widget)
         self.sensor_layout.addWidget(self.light_widget)
+        self.widgets = {
+            "temperature": self.temp_widget,
+            "humidity": self.humidity_widget,
+            "air_quality": self.air_quality_widget,
+            "light": self.light_widget,
+        }
 
         # Set initial values
         self.set_temperature(temp_val)
@@ -49,77 +70,84 @@ class SensorPanel(QWidget):
         status_label.setStyleSheet("color: grey;")
         status_label.setAlignment(Qt.AlignCenter)
 
+        trend_label = QLabel("")
+        trend_label.setFont(QFont("Arial", 8))
+        trend_label.setStyleSheet("color: #9FB3C8;")
+        trend_label.setAlignment(Qt.AlignCenter)
+
         layout.addWidget(icon_label)
         layout.addWidget(value_label)
         layout.addWidget(status_label)
+        layout.addWidget(trend_label)
 
         widget.setLayout(layout)
         widget.icon_label = icon_label
         widget.value_label = value_label
         widget.status_label = status_label
+        widget.trend_label = trend_label
+        widget.bucket = None  # Nothing shown yet
+        widget.value_text = None
 
         return widget
 
     def evaluate_sensor(self, sensor_type, value):
-        try:
-            val = float(value)
-        except:
-            val = value
-
-        if sensor_type == "temperature":
-            if val < 15:
-                return "🥶", "Cold", "blue"
-            elif 15 <= val < 30:
-                return "🌤️", "Moderate", "green"
-            else:
-                return "🔥", "High", "red"
-
-        elif sensor_type == "humidity":
-            if val < 30:
-                return "💨", "Dry", "yellow"
-            elif 30 <= val <= 60:
-                return "💧", "Moderate", "green"
-            else:
-                return "🌊", "High", "red"
-
-        elif sensor_type == "air_quality":
-            if val == "Good":
-                return "🍃", "Good", "green"
-            elif val == "Moderate":
-                return "🌫️", "Moderate", "yellow"
-            else:
-                return "💨", "Poor", "red"
-
-        elif sensor_type == "light":
-            if val == 0:
-                return "🌞", "Safe", "green"
-            elif val == 1:
-                return "🌙", "Risk", "blue"
-            else:
-                return "❓", "Unknown", "grey"
-
-        return "❓", "Unknown", "grey"
-
-    def update_sensor_widget(self, widget, icon, status, color, value):
-        widget.icon_label.setText(icon)
-        widget.value_label.setText(str(value))
-        widget.status_label.setText(status)
-        widget.status_label.setStyleSheet(f"color: {color};")
+        """(icon, status, color) for one reading, without hysteresis"""
+        rule = self.rules.get(sensor_type)
+        if rule is None:
+            return UNKNOWN_DISPLAY
+        index, _ = rule.evaluate(value)
+        return rule.display_for(index)
+
+    def update_sensor(self, sensor_type, value):
+        rule = self.rules[sensor_type]
+        widget = self.widgets[sensor_type]
+        index, calibrated = rule.evaluate(value, widget.bucket)
+
+        text = rule.format_value(calibrated)
+        if text != widget.value_text:
+            widget.value_text = text
+            widget.value_label.setText(text)
+
+        if index != widget.bucket:
+            first = widget.bucket is None
+            widget.bucket = index
+            icon, status, color = rule.display_for(index)
+            widget.icon_label.setText(icon)
+            widget.status_label.setText(status)
+            widget.status_label.setStyleSheet(f"color: {color};")
+            if not first:
+                self.status_changed.emit(sensor_type, status, index >= 0 and rule.alerts[index], text)
+
+    def set_stats(self, stats):
+        """Trend line under a card from a derived-channel snapshot: rate and rolling mean ± std"""
+        sensor = self.STATS_CARDS.get(stats.get("channel"))
+        if sensor is None:
+            return
+        window = stats["windows"].get(self.STATS_WINDOW)
+        if not window or not window["n"]:
+            return
+        rule = self.rules[sensor]
+        rate = stats["rate"]
+        arrow = "▲" if rate > 0 else "▼" if rate < 0 else "▶"
+        text = f"{arrow} {rate:+.2g}/s · μ {rule.format_value(window['mean'])} ± {window['std']:.2g}"
+        label = self.widgets[sensor].trend_label
+        if text != label.text():
+            label.setText(text)
+            label.setToolTip(
+                f"{self.STATS_WINDOW}: min {rule.format_value(window['min'])}, "
+                f"max {rule.format_value(window['max'])}, {window['n']} readings"
+            )
 
     # === External methods for each sensor update ===
 
     def set_temperature(self, temp):
-        icon, status, color = self.evaluate_sensor("temperature", temp)
-        self.update_sensor_widget(self.temp_widget, icon, status, color, f"{temp}°C")
+        self.update_sensor("temperature", temp)
 
     def set_humidity(self, humidity):
-        icon, status, color = self.evaluate_sensor("humidity", humidity)
-        self.update_sensor_widget(self.humidity_widget, icon, status, color, f"{humidity}%")
+        self.update_sensor("humidity", humidity)
 
     def set_air_quality(self, quality):
-        icon, status, color = self.evaluate_sensor("air_quality", quality)
-        self.update_sensor_widget(self.air_quality_widget, icon, status, color, quality)
+        self.update_sensor("air_quality", quality)
 
     def set_light(self, light_level):
-        icon, status, color = self.evaluate_sensor("light", light_level)
-        self.update_sensor_widget(self.light_widget, icon, status, color, light_level)
+        self.update_sensor("light", light_level)
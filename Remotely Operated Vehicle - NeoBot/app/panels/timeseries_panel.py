@@ -0,0 +1,107 @@
+# panels/timeseries_panel.py
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QComboBox
+from PyQt5.QtCore import QTimer
+
+import pyqtgraph as pg
+
+from instrumentation import timed
+from timeseries_buffer import TimeSeriesStore
+
+# Plot group -> [(channel, colour)]
+GROUPS = {
+    "Temperature (°C)": [("temperature", "#FF7043")],
+    "Humidity (%)": [("humidity", "#29B6F6")],
+    "Gas MQ2 (raw)": [("gas", "#FFCA28")],
+    "Light LDR (raw)": [("light", "#D4E157")],
+    "Distance (cm)": [("distance", "#66BB6A")],
+    "Accel (m/s²)": [("accel_x", "r"), ("accel_y", "g"), ("accel_z", "#42A5F5")],
+    "Gyro (rad/s)": [("gyro_x", "r"), ("gyro_y", "g"), ("gyro_z", "#42A5F5")],
+}
+
+# Visible time window in seconds (None shows the whole buffer)
+WINDOWS = {"1 min": 60, "10 min": 600, "1 h": 3600, "All": None}
+
+
+class TimeSeriesPanel(QWidget):
+    def __init__(self, store=None, capacity=131072, fps=30):
+        super().__init__()
+        # Preallocated ring buffers, owned by the store so recording can start before the plot exists
+        self.store = store if store is not None else TimeSeriesStore(capacity)
+        self.buffers = self.store.buffers
+        self.drawn_versions = {}
+
+        layout = QVBoxLayout()
+        top_bar = QHBoxLayout()
+
+        self.group_selector = QComboBox()
+        self.group_selector.addItems(list(GROUPS))
+        self.group_selector.currentTextChanged.connect(self.select_group)
+        self.window_selector = QComboBox()
+        self.window_selector.addItems(list(WINDOWS))
+        self.window_selector.currentTextChanged.connect(lambda _: self.refresh(force=True))
+        for combo in [self.group_selector, self.window_selector]:
+            combo.setStyleSheet("""
+                QComboBox {
+                    background-color: #1C2A3A;
+                    color: white;
+                    padding: 3px;
+                    border-radius: 5px;
+                }
+            """)
+        top_bar.addWidget(self.group_selector)
+        top_bar.addWidget(self.window_selector)
+        top_bar.addStretch()
+
+        self.plot = pg.PlotWidget()
+        self.plot.setBackground("#0b2740")
+        self.plot.showGrid(x=True, y=True, alpha=0.2)
+        self.plot.setLabel("bottom", "time", units="s")
+        # Downsampling and clip-to-view keep one setData per frame cheap with hours of samples
+        self.plot.setDownsampling(auto=True, mode="peak")
+        self.plot.setClipToView(True)
+        self.plot.setMinimumHeight(120)
+        self.curves = {}
+
+        layout.addLayout(top_bar)
+        layout.addWidget(self.plot)
+        self.setLayout(layout)
+
+        self.select_group(self.group_selector.currentText())
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(int(1000 / fps))
+
+    def select_group(self, group):
+        self.plot.clear()
+        self.curves = {}
+        self.drawn_versions = {}
+        for channel, color in GROUPS[group]:
+            self.curves[channel] = self.plot.plot(pen=pg.mkPen(color, width=1.5), name=channel)
+        self.refresh(force=True)
+
+    @timed("history.refresh")
+    def refresh(self, force=False):
+        if not self.isVisible() and not force:
+            return
+
+        changed = False
+        latest = None
+        for channel, curve in self.curves.items():
+            buf = self.buffers[channel]
+            if not force and self.drawn_versions.get(channel) == buf.version:
+                continue
+            t, y = buf.view()
+            curve.setData(t, y)
+            self.drawn_versions[channel] = buf.version
+            changed = True
+            if len(t):
+                latest = t[-1] if latest is None else max(latest, t[-1])
+
+        window = WINDOWS[self.window_selector.currentText()]
+        if changed and latest is not None:
+            if window is None:
+                self.plot.enableAutoRange(x=True)
+            else:
+                self.plot.setXRange(max(0.0, latest - window), latest, padding=0)
@@ -0,0 +1,186 @@
+# sensor_rules.py
+#
+# Status rules for the sensor cards, loaded from sensor_rules.json (or the
+# file given with --rules / $NEOBOT_RULES). Each sensor lists its buckets in
+# increasing order:
+#
+#   "temperature": {
+#       "topic": "roboai/neobot/sensor/dht/temperature",
+#       "format": "{:.1f}°C",
+#       "hysteresis": 0.5,                       # same unit as the calibrated value
+#       "calibration": {"raw": [...], "value": [...]},   # optional, piecewise linear
+#       "labels": {"Cold": 0},                   # optional, text payloads -> bucket
+#       "buckets": [
+#           {"below": 15, "icon": "🥶", "status": "Cold", "color": "blue"},
+#           {"upto": 30, ...},                   # upper bound included
+#           {"icon": "🔥", "status": "High", "color": "red", "alert": true}
+#       ]
+#   }
+
+import json
+import os
+from bisect import bisect_right
+
+import numpy as np
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sensor_rules.json")
+
+UNKNOWN_BUCKET = -1
+UNKNOWN_DISPLAY = ("❓", "Unknown", "grey")
+
+
+def interpolate(x, xs, ys):
+    """Piecewise-linear lookup of one value, clamped at the ends (scalar np.interp)"""
+    i = bisect_right(xs, x)
+    if i == 0:
+        return ys[0]
+    if i == len(xs):
+        return ys[-1]
+    x0, x1 = xs[i - 1], xs[i]
+    return ys[i - 1] + (ys[i] - ys[i - 1]) * (x - x0) / (x1 - x0)
+
+
+class SensorRule:
+    """One sensor's rule compiled into sorted breakpoints.
+
+    Bucket i covers bounds[i-1] <= value < bounds[i]. With hysteresis h a
+    reading only leaves its current bucket once it is more than h past the
+    boundary, so a value hovering around a threshold does not flicker.
+    classify() applies the same rule to whole NumPy series.
+    """
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.topic = spec.get("topic")
+        self.format = spec.get("format", "{}")
+        self.hysteresis = float(spec.get("hysteresis", 0.0))
+
+        buckets = spec["buckets"]
+        bounds = []
+        for bucket in buckets[:-1]:
+            if "below" in bucket:
+                bounds.append(float(bucket["below"]))
+            elif "upto" in bucket:
+                bounds.append(float(np.nextafter(float(bucket["upto"]), np.inf)))
+            else:
+                raise ValueError(f"{name}: every bucket but the last needs 'below' or 'upto'")
+        if bounds != sorted(bounds):
+            raise ValueError(f"{name}: bucket bounds must increase")
+        self.bounds = bounds
+        self.upper = [b + self.hysteresis for b in bounds]
+        self.lower = [b - self.hysteresis for b in bounds]
+        self.bounds_array = np.array(bounds)
+
+        self.display = [
+            (b.get("icon", UNKNOWN_DISPLAY[0]), b.get("status", UNKNOWN_DISPLAY[1]), b.get("color", UNKNOWN_DISPLAY[2]))
+            for b in buckets
+        ]
+        self.alerts = [bool(b.get("alert", False)) for b in buckets]
+        self.labels = {str(label): int(index) for label, index in spec.get("labels", {}).items()}
+
+        calibration = spec.get("calibration")
+        if calibration is None:
+            self.calibration = None
+        else:
+            raw = [float(x) for x in calibration["raw"]]
+            if raw != sorted(raw) or len(raw) != len(calibration["value"]) or len(raw) < 2:
+                raise ValueError(f"{name}: calibration needs two or more increasing raw points with values")
+            self.calibration = (raw, [float(y) for y in calibration["value"]])
+
+    def display_for(self, index):
+        return UNKNOWN_DISPLAY if index < 0 else self.display[index]
+
+    def calibrate(self, raw):
+        return raw if self.calibration is None else interpolate(raw, *self.calibration)
+
+    def bucket(self, value, current=None):
+        """Bucket index of a calibrated value, staying in `current` within the hysteresis band"""
+        if current is None or current < 0 or not self.hysteresis:
+            return bisect_right(self.bounds, value)
+        return min(max(current, bisect_right(self.upper, value)), bisect_right(self.lower, value))
+
+    def evaluate(self, value, current=None):
+        """(bucket index, calibrated value) for one reading; UNKNOWN_BUCKET if unreadable"""
+        if isinstance(value, str):
+            index = self.labels.get(value)
+            if index is not None:
+                return index, value
+            try:
+                value = float(value)
+            except ValueError:
+                return UNKNOWN_BUCKET, value
+        if value != value:  # NaN
+            return UNKNOWN_BUCKET, value
+        value = self.calibrate(value)
+        return self.bucket(value, current), value
+
+    def format_value(self, value):
+        if isinstance(value, str):
+            return value
+        try:
+            return self.format.format(value)
+        except (ValueError, TypeError):
+            return str(value)
+
+    def classify(self, values):
+        """Bucket per reading of a whole series, with hysteresis, as an int array (-1 for NaN).
+
+        Readings outside every hysteresis band are bucketed with one
+        searchsorted; only those inside a band depend on the previous bucket
+        and get a scalar pass.
+        """
+        values = np.asarray(values, dtype=float)
+        if self.calibration is not None:
+            values = np.interp(values, *self.calibration)
+        buckets = np.searchsorted(self.bounds_array, values, side="right")
+        nan = np.isnan(values)
+        buckets[nan] = UNKNOWN_BUCKET
+        if not self.hysteresis or not len(values):
+            return buckets
+
+        up = np.searchsorted(self.bounds_array + self.hysteresis, values, side="right")
+        down = np.searchsorted(self.bounds_array - self.hysteresis, values, side="right")
+        banded = np.flatnonzero((up != down) & ~nan)
+        if len(banded):
+            result = buckets.tolist()
+            for i, lo, hi in zip(banded.tolist(), up[banded].tolist(), down[banded].tolist()):
+                current = result[i - 1] if i else UNKNOWN_BUCKET
+                if current >= 0:
+                    result[i] = min(max(current, lo), hi)
+            buckets = np.array(result)
+        return buckets
+
+    def transitions(self, times, values, alerts_only=False):
+        """[(t, value, bucket)] where the bucket changes along a series (the first reading included)"""
+        if not len(values):
+            return []
+        buckets = self.classify(values)
+        changes = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        result = []
+        for i in changes.tolist():
+            index = int(buckets[i])
+            if alerts_only and (index < 0 or not self.alerts[index]):
+                continue
+            result.append((times[i], values[i], index))
+        return result
+
+
+class SensorRules:
+    """Every sensor's rule, by card name and by canonical topic"""
+
+    def __init__(self, spec):
+        self.rules = {name: SensorRule(name, rule) for name, rule in spec.items()}
+        self.by_topic = {rule.topic: rule for rule in self.rules.values() if rule.topic}
+
+    def get(self, name):
+        return self.rules.get(name)
+
+    def __getitem__(self, name):
+        return self.rules[name]
+
+
+def load_rules(path=None):
+    """Reads a rules file (default: $NEOBOT_RULES or sensor_rules.json next to this module)"""
+    path = path or os.environ.get("NEOBOT_RULES") or DEFAULT_RULES_PATH
+    with open(path, encoding="utf-8") as f:
+        return SensorRules(json.load(f))
@@ -0,0 +1,284 @@
+# stream_stats.py
+#
+# Derived telemetry channels, computed incrementally on the ingest worker:
+# rolling mean/std/min/max over several window lengths, rate of change and
+# anomaly flags per robot and channel. Snapshots come out as Messages on
+# roboai/<id>/derived/<channel> (JSON payload), so the GUI routes them like
+# any other topic and the recorder stores them next to the raw traffic.
+
+import json
+import math
+from collections import deque
+
+from mqtt_ingest import Message
+from telemetry import (
+    DERIVED_CHANNELS, TOPIC_IMU_ACCEL, TOPIC_IMU_GYRO, TOPIC_TELEMETRY, derived_topic
+)
+from telemetry_frame import FRAME_TOPICS, frame_to_topics
+from timeseries_buffer import SCALAR_TOPICS
+
+WINDOWS = (1.0, 10.0, 60.0)  # s; the first gives the rate of change, the last the anomaly baseline
+FRAME_TIMEOUT = 5.0  # s without binary frames before per-sensor text topics are used
+
+CHANNEL_TOPICS = dict(SCALAR_TOPICS, **{TOPIC_IMU_ACCEL: "accel", TOPIC_IMU_GYRO: "gyro"})
+assert sorted(CHANNEL_TOPICS.values()) == sorted(DERIVED_CHANNELS)
+
+# spike: reading far above the longest window's mean (z-score and absolute rise).
+# approach: closing in fast enough that contact is less than `ttc` seconds away.
+ANOMALY_RULES = {
+    "gas": {"kind": "spike", "z": 4.0, "min_rise": 60.0, "min_samples": 20},
+    "accel": {"kind": "spike", "z": 6.0, "min_rise": 2.0, "min_samples": 50},  # |accel|, bumps and impacts
+    "distance": {"kind": "approach", "ttc": 1.5, "within": 100.0},
+}
+
+
+class RollingWindow:
+    """Statistics of the last `length` seconds in O(1) per sample and fixed memory.
+
+    Samples are summarised into blocks of length / resolution seconds:
+    Welford updates inside the open block, Chan's formulas to add or remove
+    whole blocks from the window total. Min and max come from monotonic
+    deques of block extremes. The window edge is exact to one block, and
+    memory does not depend on the sample rate.
+    """
+
+    __slots__ = (
+        "length", "block", "blocks", "n", "mean", "m2", "mins", "maxs",
+        "cn", "cmean", "cm2", "clo", "chi", "ct0", "t", "x",
+    )
+
+    def __init__(self, length, resolution=50):
+        self.length = length
+        self.block = length / resolution
+        self.blocks = deque()  # Closed blocks: (t_end, n, mean, m2, t_first)
+        self.n = 0  # Total of the closed blocks
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.mins = deque()  # (t_end, lo), lo increasing
+        self.maxs = deque()  # (t_end, hi), hi decreasing
+        self.cn = 0  # Open block
+        self.cmean = 0.0
+        self.cm2 = 0.0
+        self.clo = self.chi = 0.0
+        self.ct0 = 0.0
+        self.t = self.x = None  # Newest sample
+
+    def add(self, t, x):
+        if self.cn and t - self.ct0 >= self.block:
+            self._close()
+            self._evict(t - self.length)
+        if not self.cn:
+            self.ct0 = t
+            self.clo = self.chi = x
+        elif x < self.clo:
+            self.clo = x
+        elif x > self.chi:
+            self.chi = x
+        self.cn += 1
+        d = x - self.cmean
+        self.cmean += d / self.cn
+        self.cm2 += d * (x - self.cmean)
+        self.t, self.x = t, x
+
+    def _close(self):
+        n, mean, m2 = self.cn, self.cmean, self.cm2
+        self.blocks.append((self.t, n, mean, m2, self.ct0))
+        total = self.n + n
+        d = mean - self.mean
+        self.mean += d * n / total
+        self.m2 += m2 + d * d * self.n * n / total
+        self.n = total
+        lo, hi = self.clo, self.chi
+        while self.mins and self.mins[-1][1] >= lo:
+            self.mins.pop()
+        self.mins.append((self.t, lo))
+        while self.maxs and self.maxs[-1][1] <= hi:
+            self.maxs.pop()
+        self.maxs.append((self.t, hi))
+        self.cn = 0
+        self.cmean = self.cm2 = 0.0
+
+    def _evict(self, horizon):
+        blocks = self.blocks
+        while blocks and blocks[0][0] < horizon:
+            _, n, mean, m2, _ = blocks.popleft()
+            rest = self.n - n
+            if rest <= 0:
+                self.n, self.mean, self.m2 = 0, 0.0, 0.0
+                continue
+            rest_mean = (self.n * self.mean - n * mean) / rest
+            d = mean - rest_mean
+            self.m2 = max(0.0, self.m2 - m2 - d * d * rest * n / self.n)  # Rounding can dip below 0
+            self.mean = rest_mean
+            self.n = rest
+        while self.mins and self.mins[0][0] < horizon:
+            self.mins.popleft()
+        while self.maxs and self.maxs[0][0] < horizon:
+            self.maxs.popleft()
+
+    def summary(self):
+        """(count, mean, std, min, max) including the open block"""
+        n, cn = self.n, self.cn
+        total = n + cn
+        if not total:
+            return 0, math.nan, math.nan, math.nan, math.nan
+        if not cn:
+            mean, m2 = self.mean, self.m2
+        else:
+            d = self.cmean - self.mean
+            mean = self.mean + d * cn / total
+            m2 = self.m2 + self.cm2 + d * d * n * cn / total
+        std = math.sqrt(m2 / (total - 1)) if total > 1 else 0.0
+        lo, hi = (self.clo, self.chi) if cn else (math.inf, -math.inf)
+        if self.mins:
+            lo = min(lo, self.mins[0][1])
+            hi = max(hi, self.maxs[0][1])
+        return total, mean, std, lo, hi
+
+    def rate(self):
+        """Change per second from the oldest block's mean to the open block's (less noisy than endpoints)"""
+        if not self.blocks or not self.cn:
+            return 0.0
+        t_end, _, mean, _, t_first = self.blocks[0]
+        dt = (self.ct0 + self.t - t_first - t_end) / 2
+        return (self.cmean - mean) / dt if dt > 0 else 0.0
+
+
+class ChannelStats:
+    """Every window of one robot's channel plus its anomaly state"""
+
+    __slots__ = ("windows", "rule", "anomaly", "changed", "ttc", "last_emit")
+
+    def __init__(self, windows=WINDOWS, rule=None):
+        self.windows = [RollingWindow(length) for length in windows]
+        self.rule = rule
+        self.anomaly = None  # Rule kind while flagged
+        self.changed = False  # Anomaly flag changed since the last snapshot
+        self.ttc = None
+        self.last_emit = -math.inf
+
+    def add(self, t, x):
+        rule = self.rule
+        if rule is not None and rule["kind"] == "spike":
+            # Compare against the baseline before this reading joins it
+            n, mean, std, _, _ = self.windows[-1].summary()
+            rise = x - mean if n >= rule["min_samples"] else 0.0
+            z = rise / std if std > 0 else (math.inf if rise > 0 else 0.0)
+            if self.anomaly is None:
+                flagged = rise >= rule["min_rise"] and z >= rule["z"]
+            else:
+                flagged = rise >= rule["min_rise"] / 2 and z >= rule["z"] / 2
+            self._flag(flagged)
+        for window in self.windows:
+            window.add(t, x)
+        if rule is not None and rule["kind"] == "approach":
+            rate = self.windows[0].rate()
+            self.ttc = x / -rate if rate < 0 and x > 0 else None
+            if self.anomaly is None:
+                flagged = self.ttc is not None and x <= rule["within"] and self.ttc <= rule["ttc"]
+            else:
+                flagged = self.ttc is not None and x <= 1.2 * rule["within"] and self.ttc <= 2 * rule["ttc"]
+            self._flag(flagged)
+
+    def _flag(self, flagged):
+        state = self.rule["kind"] if flagged else None
+        if state != self.anomaly:
+            self.anomaly = state
+            self.changed = True
+
+    def snapshot(self, channel):
+        newest = self.windows[0]
+        windows = {}
+        for window in self.windows:
+            n, mean, std, lo, hi = window.summary()
+            windows[f"{window.length:g}s"] = {"n": n, "mean": mean, "std": std, "min": lo, "max": hi}
+        return {
+            "channel": channel,
+            "t": newest.t,
+            "value": newest.x,
+            "rate": newest.rate(),
+            "anomaly": self.anomaly,
+            "changed": self.changed,
+            "ttc": self.ttc,
+            "windows": windows,
+        }
+
+
+def channel_readings(message):
+    """[(channel, value)] of the numeric readings in one parsed message"""
+    if message.value is None:
+        return []
+    if message.topic == TOPIC_TELEMETRY:
+        readings = frame_to_topics(message.value)
+    else:
+        readings = [(message.topic, message.value)]
+    result = []
+    for topic, value in readings:
+        channel = CHANNEL_TOPICS.get(topic)
+        if channel is None:
+            continue
+        if isinstance(value, list):
+            value = math.sqrt(value[0] * value[0] + value[1] * value[1] + value[2] * value[2])
+        elif not isinstance(value, (int, float)) or value != value:
+            continue  # Text labels ("Poor", "Day") and NaN carry no statistics
+        result.append((channel, value))
+    return result
+
+
+class StreamProcessor:
+    """Feeds parsed messages into per-robot ChannelStats and returns derived Messages.
+
+    Runs on the ingest worker (see IngestQueue's process hook), never on the
+    GUI thread. A channel's snapshot is emitted at most every emit_interval
+    seconds while it updates, and at once when its anomaly flag changes.
+    A robot's text topics are skipped while its frames carry the same
+    readings, so no sample is counted twice.
+    """
+
+    def __init__(self, windows=WINDOWS, rules=ANOMALY_RULES, emit_interval=0.2):
+        self.windows = windows
+        self.rules = rules
+        self.emit_interval = emit_interval
+        self.channels = {}  # (robot, channel) -> ChannelStats
+        self.last_frame = {}  # robot -> time of its latest frame
+        self.samples = 0
+        self.emitted = 0
+        self.anomalies = 0
+
+    def get(self, robot, channel):
+        stats = self.channels.get((robot, channel))
+        if stats is None:
+            stats = self.channels[robot, channel] = ChannelStats(self.windows, self.rules.get(channel))
+        return stats
+
+    def process(self, batch):
+        updated = {}
+        for message in batch:
+            t = message.received_at
+            if message.topic == TOPIC_TELEMETRY and message.value is not None:
+                self.last_frame[message.robot] = t
+            elif message.topic in FRAME_TOPICS and t - self.last_frame.get(message.robot, -math.inf) < FRAME_TIMEOUT:
+                continue
+            for channel, value in channel_readings(message):
+                stats = self.get(message.robot, channel)
+                stats.add(t, value)
+                updated[message.robot, channel] = stats
+                self.samples += 1
+
+        derived = []
+        for (robot, channel), stats in updated.items():
+            t = stats.windows[0].t
+            if not stats.changed and t - stats.last_emit < self.emit_interval:
+                continue
+            if stats.changed and stats.anomaly is not None:
+                self.anomalies += 1
+            snapshot = stats.snapshot(channel)
+            stats.changed = False
+            stats.last_emit = t
+            derived.append(Message(derived_topic(channel), json.dumps(snapshot), snapshot, t, robot))
+        self.emitted += len(derived)
+        return derived
+
+    def stats(self):
+        return {"samples": self.samples, "emitted": self.emitted, "anomalies": self.anomalies,
+                "channels": len(self.channels)}
@@ -0,0 +1,87 @@
+# telemetry.py
+
+import json
+
+DEFAULT_ROBOT_ID = "neobot"
+
+# MQTT topics published by NeoBot_Firmware.ino
+TOPIC_TEMP = "roboai/neobot/sensor/dht/temperature"
+TOPIC_HUMIDITY = "roboai/neobot/sensor/dht/humidity"
+TOPIC_GAS_AIR = "roboai/neobot/sensor/mq2"
+TOPIC_LDR = "roboai/neobot/sensor/ldr"
+TOPIC_IMU_ACCEL = "roboai/neobot/sensor/imu/accel"
+TOPIC_IMU_GYRO = "roboai/neobot/sensor/imu/gyro"
+TOPIC_DISTANCE = "roboai/neobot/sensor/distance"
+TOPIC_COMMAND = "roboai/neobot/command"
+TOPIC_ACK = "roboai/neobot/ack"  # Firmware echoes command sequence numbers here
+TOPIC_LOG = "roboai/neobot/log"
+
+# Optional robot camera: JPEG images, and the JPEG quality the dashboard asks for
+TOPIC_CAMERA = "roboai/neobot/camera"
+TOPIC_CAMERA_CONFIG = "roboai/neobot/camera/config"
+MQTT_SOURCE = "mqtt"  # Camera source name for frames arriving on TOPIC_CAMERA
+
+# Binary batched frame carrying every channel at once (see telemetry_frame.py)
+TOPIC_TELEMETRY = "roboai/neobot/telemetry"
+
+# Rolling statistics and anomaly flags the dashboard derives per channel (stream_stats.py).
+# Not published to the broker; they reach the panels and recordings as roboai/<id>/derived/<channel>.
+TOPIC_DERIVED = "roboai/neobot/derived"
+DERIVED_CHANNELS = ["temperature", "humidity", "gas", "light", "distance", "accel", "gyro"]
+
+SENSOR_TOPICS = [
+    TOPIC_TEMP,
+    TOPIC_HUMIDITY,
+    TOPIC_GAS_AIR,
+    TOPIC_LDR,
+    TOPIC_IMU_ACCEL,
+    TOPIC_IMU_GYRO,
+    TOPIC_DISTANCE,
+]
+
+
+def robot_topic(topic, robot_id):
+    """Rewrites one of the topics above for another robot, e.g. roboai/neobot2/..."""
+    return topic.replace(f"roboai/{DEFAULT_ROBOT_ID}/", f"roboai/{robot_id}/", 1)
+
+
+def derived_topic(channel):
+    return f"{TOPIC_DERIVED}/{channel}"
+
+
+DERIVED_TOPICS = {derived_topic(channel): channel for channel in DERIVED_CHANNELS}
+
+
+def parse_scalar(payload):
+    """Parses "21.50" / "512", falling back to the raw string (e.g. "Poor", "Day")"""
+    try:
+        return float(payload) if "." in payload else int(payload)
+    except ValueError:
+        return payload
+
+
+def parse_vector3(payload):
+    """Parses an "x,y,z" payload, returns None if it is malformed"""
+    try:
+        x, y, z = map(float, payload.split(","))
+    except ValueError:
+        return None
+    return [x, y, z]
+
+
+def parse_json(payload):
+    try:
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+PARSERS = {
+    TOPIC_IMU_ACCEL: parse_vector3,
+    TOPIC_IMU_GYRO: parse_vector3,
+}
+PARSERS.update((topic, parse_json) for topic in DERIVED_TOPICS)
+
+
+def parse_payload(topic, payload):
+    return PARSERS.get(topic, parse_scalar)(payload)
@@ -0,0 +1,74 @@
+# telemetry_dispatcher.py
+
+import time
+
+from PyQt5.QtCore import QObject, QTimer
+
+from instrumentation import metrics
+
+
+def stage_name(fn):
+    """"panel.SensorPanel.set_temperature" for a bound method"""
+    owner = getattr(fn, "__self__", None)
+    if owner is not None:
+        return f"panel.{type(owner).__name__}.{fn.__name__}"
+    return f"panel.{getattr(fn, '__qualname__', repr(fn))}"
+
+
+class TelemetryDispatcher(QObject):
+    """Routes parsed telemetry to panel handlers at most once per display frame.
+
+    Only the latest value per topic is kept between frames, so a burst of N
+    messages on a topic costs one handler call and one repaint instead of N.
+    """
+
+    def __init__(self, fps=30, parent=None):
+        super().__init__(parent)
+        self.routes = {}  # topic -> (handler, render)
+        self.stages = {}  # handler / render -> latency histogram
+        self.latest = {}
+        self.dirty = {}  # insertion-ordered set of topics
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(int(1000 / fps))
+        self.timer.timeout.connect(self.flush)
+
+    def route(self, topic, handler, render=None):
+        """Registers handler(value) for topic.
+
+        render() is called once per frame after all handlers sharing it ran,
+        for panels that combine several topics (e.g. IMU accel + gyro).
+        """
+        self.routes[topic] = (handler, render)
+        for fn in (handler, render):
+            if fn is not None and fn not in self.stages:
+                self.stages[fn] = metrics.histogram(stage_name(fn))
+
+    def submit(self, topic, value):
+        if topic not in self.routes:
+            return
+        self.latest[topic] = value
+        self.dirty[topic] = None
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        dirty = self.dirty
+        self.dirty = {}
+
+        perf_counter = time.perf_counter
+        stages = self.stages
+        renders = {}
+        for topic in dirty:
+            handler, render = self.routes[topic]
+            start = perf_counter()
+            handler(self.latest[topic])
+            stages[handler].record(perf_counter() - start)
+            if render is not None:
+                renders[render] = None
+
+        for render in renders:
+            start = perf_counter()
+            render()
+            stages[render].record(perf_counter() - start)
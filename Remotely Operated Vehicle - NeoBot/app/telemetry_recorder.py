@@ -0,0 +1,216 @@
+# telemetry_recorder.py
+
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+# Recording layout (all little-endian):
+#
+#   <name>.ntr  file header, then chunks appended back to back
+#       FILE_HEADER   b"NTREC\x00" + uint16 version
+#       chunk header  b"CHNK", uint32 record count, uint32 body bytes,
+#                     float64 first timestamp, float64 last timestamp
+#       record        float64 timestamp, uint16 topic length, uint32 payload
+#                     length, topic bytes (utf-8), payload bytes
+#   <name>.ntr.idx  one INDEX_DTYPE entry per chunk, appended after the
+#                   chunk is on disk; rebuilt from the chunk headers if lost
+FILE_MAGIC = b"NTREC\x00"
+FILE_VERSION = 1
+FILE_HEADER = FILE_MAGIC + struct.pack("<H", FILE_VERSION)
+CHUNK_HEADER = struct.Struct("<4sIIdd")
+CHUNK_MAGIC = b"CHNK"
+RECORD_HEADER = struct.Struct("<dHI")
+
+INDEX_DTYPE = np.dtype([("t_first", "<f8"), ("t_last", "<f8"), ("offset", "<u8")])
+
+
+class RecordingError(ValueError):
+    pass
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+class TelemetryRecorder:
+    """Append-only chunked recorder for raw MQTT messages.
+
+    record() is cheap and thread-safe (it runs on paho's network thread);
+    chunks are written by a background thread once they reach chunk_bytes
+    or every flush_interval seconds, so at most that much is lost on a crash.
+    """
+
+    def __init__(self, path, chunk_bytes=256 * 1024, flush_interval=1.0):
+        self.path = path
+        self.chunk_bytes = chunk_bytes
+        self.flush_interval = flush_interval
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._data = open(path, "ab")
+        if new_file:
+            self._data.write(FILE_HEADER)
+            self._data.flush()
+        self._index = open(index_path(path), "ab")
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._chunk = bytearray()
+        self._sealed = []
+        self._count = 0
+        self._t_first = 0.0
+        self._t_last = 0.0
+        self.records = 0
+        self.chunks = 0
+
+        self._wake = threading.Event()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="telemetry-recorder", daemon=True)
+        self._thread.start()
+
+    def record(self, topic, payload, t=None):
+        if t is None:
+            t = time.time()
+        topic_bytes = topic.encode()
+        if isinstance(payload, str):
+            payload = payload.encode()
+        with self._lock:
+            if not self._count:
+                self._t_first = t
+            self._t_last = t
+            self._chunk += RECORD_HEADER.pack(t, len(topic_bytes), len(payload))
+            self._chunk += topic_bytes
+            self._chunk += payload
+            self._count += 1
+            self.records += 1
+            if len(self._chunk) < self.chunk_bytes:
+                return
+            self._seal_locked()
+        self._wake.set()
+
+    def _seal_locked(self):
+        """Closes the open chunk and queues it for the writer thread"""
+        header = CHUNK_HEADER.pack(CHUNK_MAGIC, self._count, len(self._chunk), self._t_first, self._t_last)
+        self._sealed.append((header, self._chunk, self._t_first, self._t_last))
+        self._chunk = bytearray()
+        self._count = 0
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                if self._count:
+                    self._seal_locked()
+                sealed = self._sealed
+                self._sealed = []
+
+            # File I/O happens outside self._lock so record() never waits on the disk
+            for header, body, t_first, t_last in sealed:
+                offset = self._data.tell()
+                self._data.write(header)
+                self._data.write(body)
+                self._data.flush()
+                # The index entry is only written once its chunk is on disk
+                entry = np.array([(t_first, t_last, offset)], dtype=INDEX_DTYPE)
+                self._index.write(entry.tobytes())
+                self.chunks += 1
+            self._index.flush()
+
+    def close(self):
+        self._running = False
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        self._data.close()
+        self._index.close()
+
+    def _run(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+class RecordingReader:
+    """Memory-mapped reader with time-indexed seeking.
+
+    Opening only maps the file and its index, so it is instant regardless of
+    the recording size; records are decoded lazily while iterating.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.path.getsize(path)
+        if size < len(FILE_HEADER):
+            raise RecordingError(f"{path} is not a telemetry recording")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(FILE_MAGIC)] != FILE_MAGIC:
+            raise RecordingError(f"{path} is not a telemetry recording")
+        version, = struct.unpack_from("<H", self._mm, len(FILE_MAGIC))
+        if version != FILE_VERSION:
+            raise RecordingError(f"unsupported recording version {version}")
+
+        idx = index_path(path)
+        if os.path.exists(idx) and os.path.getsize(idx) >= INDEX_DTYPE.itemsize:
+            count = os.path.getsize(idx) // INDEX_DTYPE.itemsize
+            self.index = np.memmap(idx, dtype=INDEX_DTYPE, mode="r", shape=(count,))
+        else:
+            self.index = self.rebuild_index()
+
+    def rebuild_index(self):
+        """Scans chunk headers (skipping bodies) when the .idx file is missing"""
+        entries = []
+        offset = len(FILE_HEADER)
+        end = len(self._mm)
+        while offset + CHUNK_HEADER.size <= end:
+            magic, _count, length, t_first, t_last = CHUNK_HEADER.unpack_from(self._mm, offset)
+            if magic != CHUNK_MAGIC or offset + CHUNK_HEADER.size + length > end:
+                break  # Truncated tail from a crash
+            entries.append((t_first, t_last, offset))
+            offset += CHUNK_HEADER.size + length
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+    @property
+    def start_time(self):
+        return float(self.index["t_first"][0]) if len(self.index) else 0.0
+
+    @property
+    def end_time(self):
+        return float(self.index["t_last"][-1]) if len(self.index) else 0.0
+
+    @property
+    def duration(self):
+        return self.end_time - self.start_time
+
+    def chunk_for(self, t):
+        """Index of the first chunk that can contain records at or after t"""
+        return int(np.searchsorted(self.index["t_last"], t, side="left"))
+
+    def iter_records(self, start_time=None):
+        """Yields (t, topic, payload bytes) in recording order from start_time on"""
+        first = 0 if start_time is None else self.chunk_for(start_time)
+        mm = self._mm
+        for i in range(first, len(self.index)):
+            offset = int(self.index["offset"][i])
+            magic, count, length, _t_first, _t_last = CHUNK_HEADER.unpack_from(mm, offset)
+            if magic != CHUNK_MAGIC:
+                raise RecordingError(f"corrupt chunk at offset {offset}")
+            pos = offset + CHUNK_HEADER.size
+            for _ in range(count):
+                t, topic_len, payload_len = RECORD_HEADER.unpack_from(mm, pos)
+                pos += RECORD_HEADER.size
+                topic = mm[pos:pos + topic_len].decode()
+                pos += topic_len
+                payload = mm[pos:pos + payload_len]
+                pos += payload_len
+                if start_time is not None and t < start_time:
+                    continue
+                yield t, topic, payload
+
+    def close(self):
+        self.index = None
+        self._mm.close()
+        self._file.close()
@@ -0,0 +1,73 @@
+# telemetry_replay.py
+
+import time
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+
+class ReplayPlayer(QObject):
+    """Feeds a RecordingReader back into the dashboard on the GUI thread.
+
+    speed is a multiple of real time (1.0 = as recorded); speed 0 replays as
+    fast as possible in batches that still leave the event loop responsive.
+    """
+
+    finished = pyqtSignal()
+    seeked = pyqtSignal(float)  # Recording time replay continues from
+
+    MAX_RECORDS_PER_TICK = 2000
+
+    def __init__(self, reader, deliver, speed=1.0, parent=None):
+        super().__init__(parent)
+        self.reader = reader
+        self.deliver = deliver  # deliver(topic, payload, t)
+        self.speed = speed
+        self.records = None
+        self.pending = None
+        self.replayed = 0
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.tick)
+
+    def start(self, start_time=None):
+        self.seek(self.reader.start_time if start_time is None else start_time)
+        self.timer.start(0 if not self.speed else 10)
+
+    def stop(self):
+        self.timer.stop()
+
+    def seek(self, t):
+        """Jumps to recording time t through the chunk index"""
+        self.records = self.reader.iter_records(start_time=t)
+        self.pending = None
+        self.origin_recording = t
+        self.origin_wall = time.monotonic()
+        self.seeked.emit(t)
+
+    def set_speed(self, speed):
+        # Re-anchor so the position does not jump when the speed changes
+        self.origin_recording = self.position()
+        self.origin_wall = time.monotonic()
+        self.speed = speed
+        self.timer.setInterval(0 if not speed else 10)
+
+    def position(self):
+        if not self.speed:
+            return self.pending[0] if self.pending else self.origin_recording
+        return self.origin_recording + (time.monotonic() - self.origin_wall) * self.speed
+
+    def tick(self):
+        target = None if not self.speed else self.position()
+        for _ in range(self.MAX_RECORDS_PER_TICK):
+            if self.pending is None:
+                self.pending = next(self.records, None)
+                if self.pending is None:
+                    self.timer.stop()
+                    self.finished.emit()
+                    return
+            t, topic, payload = self.pending
+            if target is not None and t > target:
+                return
+            self.deliver(topic, payload, t)
+            self.replayed += 1
+            self.pending = None
@@ -0,0 +1,162 @@
+# teleop.py
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+STOP = "STP"
+
+# Offline queue lifetimes: a queued drive command older than the firmware's
+# 600 ms dead-man must never start the robot after a reconnect, while STP
+# stays worth delivering for much longer
+MOTION_TTL = 0.5
+STOP_TTL = 10.0
+
+
+def format_command(cmd, seq):
+    """Wire format "FWD#42"; the firmware echoes 42 on its ack topic"""
+    return f"{cmd}#{seq}"
+
+
+class TeleopChannel:
+    """Drive command publisher with its own thread.
+
+    The UI only sets the desired command (set_command is cheap and never
+    blocks). The thread publishes a change as soon as the rate limit allows,
+    coalescing anything that changed in between, and repeats the current
+    command every keepalive_interval while driving so the robot's dead-man
+    timeout only fires when the dashboard or the link goes away. STP is sent
+    immediately, bypassing the rate limit, at QoS 1. While the broker is
+    unreachable the transport holds commands only for MOTION_TTL / STOP_TTL.
+
+    Every publish carries a sequence number; on_ack() matches the echoed
+    number and records the command-to-ack round trip.
+    """
+
+    def __init__(self, publish, topic, max_rate_hz=20.0, keepalive_interval=0.2, history=500):
+        self.publish = publish  # publish(topic, payload, qos, ttl)
+        self.topic = topic
+        self.min_interval = 1.0 / max_rate_hz
+        self.keepalive_interval = keepalive_interval
+
+        self.desired = STOP
+        self.last_sent = STOP
+        self.last_send_time = 0.0
+        self.seq = 0
+        self.sent = 0
+        self.acked = 0
+        self.coalesced = 0
+
+        self._in_flight = {}  # seq -> send time, oldest first
+        self._max_in_flight = history
+        self._latencies = deque(maxlen=history)  # ms
+
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="teleop", daemon=True)
+        self._thread.start()
+
+    # --- UI side
+
+    def set_command(self, cmd):
+        with self._cond:
+            if cmd == self.desired:
+                return
+            if self.desired != self.last_sent:
+                self.coalesced += 1  # Previous change was never sent
+            self.desired = cmd
+            self._cond.notify()
+
+    def retarget(self, topic):
+        """Stops the robot currently driven and sends future commands to topic"""
+        with self._cond:
+            if self.last_sent != STOP:
+                self._send_locked(STOP, time.perf_counter())
+            self.topic = topic
+            self.desired = STOP
+            self._cond.notify()
+
+    def stop(self):
+        """Sends a final STP and stops the thread"""
+        self.set_command(STOP)
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+
+    # --- Acks (paho network thread)
+
+    def on_ack(self, payload, t=None):
+        t = time.perf_counter() if t is None else t
+        try:
+            seq = int(payload)
+        except ValueError:
+            return
+        with self._cond:
+            sent_at = self._in_flight.pop(seq, None)
+            if sent_at is None:
+                return  # Duplicate or too old
+            self.acked += 1
+            self._latencies.append((t - sent_at) * 1000.0)
+
+    def latency_percentiles(self, percentiles=(50, 95, 99)):
+        """{p: ms} over the recent acks, empty until the first ack arrives"""
+        with self._cond:
+            samples = list(self._latencies)
+        if not samples:
+            return {}
+        values = np.percentile(samples, percentiles)
+        return dict(zip(percentiles, values.tolist()))
+
+    def stats(self):
+        with self._cond:
+            return {
+                "sent": self.sent,
+                "acked": self.acked,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight),
+            }
+
+    # --- Publisher thread
+
+    def _run(self):
+        with self._cond:
+            while True:
+                now = time.perf_counter()
+                since_send = now - self.last_send_time
+                changed = self.desired != self.last_sent
+                moving = self.desired != STOP
+
+                if changed and (self.desired == STOP or since_send >= self.min_interval):
+                    self._send_locked(self.desired, now)
+                    continue
+                if not changed and moving and since_send >= self.keepalive_interval:
+                    self._send_locked(self.desired, now)
+                    continue
+                if not self._running:
+                    return
+
+                if changed:
+                    timeout = self.min_interval - since_send
+                elif moving:
+                    timeout = self.keepalive_interval - since_send
+                else:
+                    timeout = None  # Stopped, sleep until the next command
+                self._cond.wait(timeout)
+
+    def _send_locked(self, cmd, now):
+        self.seq += 1
+        seq = self.seq
+        self._in_flight[seq] = now
+        if len(self._in_flight) > self._max_in_flight:
+            del self._in_flight[next(iter(self._in_flight))]
+        self.last_sent = cmd
+        self.last_send_time = now
+        self.sent += 1
+        # The transport's publish only queues the packet, so holding the lock here is fine
+        if cmd == STOP:
+            self.publish(self.topic, format_command(cmd, seq), 1, STOP_TTL)
+        else:
+            self.publish(self.topic, format_command(cmd, seq), 0, MOTION_TTL)
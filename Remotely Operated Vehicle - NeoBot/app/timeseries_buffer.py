@@ -0,0 +1,107 @@
+# timeseries_buffer.py
+
+import time
+
+import numpy as np
+
+from telemetry import (
+    TOPIC_TEMP, TOPIC_HUMIDITY, TOPIC_GAS_AIR, TOPIC_LDR,
+    TOPIC_IMU_ACCEL, TOPIC_IMU_GYRO, TOPIC_DISTANCE
+)
+
+SCALAR_TOPICS = {
+    TOPIC_TEMP: "temperature",
+    TOPIC_HUMIDITY: "humidity",
+    TOPIC_GAS_AIR: "gas",
+    TOPIC_LDR: "light",
+    TOPIC_DISTANCE: "distance",
+}
+VECTOR_TOPICS = {
+    TOPIC_IMU_ACCEL: ("accel_x", "accel_y", "accel_z"),
+    TOPIC_IMU_GYRO: ("gyro_x", "gyro_y", "gyro_z"),
+}
+CHANNELS = list(SCALAR_TOPICS.values()) + [c for channels in VECTOR_TOPICS.values() for c in channels]
+
+
+class TimeSeriesBuffer:
+    """Preallocated circular buffer of (time, value) samples.
+
+    Every sample is written twice, at i and i + capacity, so the newest
+    `count` samples are always one contiguous slice and view() can hand
+    NumPy views to the plot without copying. append() only assigns into
+    the existing arrays and never allocates.
+    """
+
+    def __init__(self, capacity, dtype=np.float32):
+        self.capacity = capacity
+        self.t = np.zeros(2 * capacity, dtype=np.float64)
+        self.y = np.zeros(2 * capacity, dtype=dtype)
+        self.head = 0  # Next write position in [0, capacity)
+        self.count = 0
+        self.version = 0  # Bumped on every append, lets views detect new data cheaply
+
+    def __len__(self):
+        return self.count
+
+    def append(self, t, y):
+        h = self.head
+        mirror = h + self.capacity
+        self.t[h] = t
+        self.t[mirror] = t
+        self.y[h] = y
+        self.y[mirror] = y
+        self.head = h + 1 if h + 1 < self.capacity else 0
+        if self.count < self.capacity:
+            self.count += 1
+        self.version += 1
+
+    def view(self):
+        """(t, y) views of the stored samples, oldest first, no copy"""
+        end = self.head + self.capacity
+        start = end - self.count
+        return self.t[start:end], self.y[start:end]
+
+    def last(self):
+        if not self.count:
+            return None
+        i = self.head - 1 + self.capacity
+        return self.t[i], self.y[i]
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        self.version += 1
+
+
+class TimeSeriesStore:
+    """One TimeSeriesBuffer per telemetry channel, independent of any widget.
+
+    The dashboard records into this from startup; the history plot is built
+    later (see LazyPanel) and just draws whatever is stored.
+    """
+
+    def __init__(self, capacity=131072):
+        self.t0 = time.time()
+        self.buffers = {channel: TimeSeriesBuffer(capacity) for channel in CHANNELS}
+
+    def record(self, topic, t, value):
+        """Appends one parsed reading (host time t, seconds) to its channel buffers"""
+        t -= self.t0
+        channel = SCALAR_TOPICS.get(topic)
+        if channel is not None:
+            if isinstance(value, (int, float)):
+                self.buffers[channel].append(t, value)
+            return
+        channels = VECTOR_TOPICS.get(topic)
+        if channels is not None:
+            for channel, v in zip(channels, value):
+                self.buffers[channel].append(t, v)
+
+    def clear(self):
+        for buf in self.buffers.values():
+            buf.clear()
+
+    def rebase(self, t0):
+        """Clears the store and measures time from t0 on, e.g. a replayed recording's start"""
+        self.clear()
+        self.t0 = t0
@@ -0,0 +1,84 @@
+# tools/build_map.py
+#
+# Builds the occupancy map of a recording (.ntr) offline, as fast as the
+# mapper can go, and writes one PNG per robot. Recordings made with
+# main.py --record include the drive commands that were sent, which dead
+# reckoning needs for travel; without them the map only rotates in place.
+#
+#   python tools/build_map.py run1.ntr
+#   python tools/build_map.py run1.ntr --robot neobot2 --png maps/run1.png
+
+import argparse
+import os
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+import cv2
+import numpy as np
+
+from mqtt_ingest import parse_message
+from occupancy_map import CELL_CM, L_MAX, OccupancyMapper
+from telemetry_recorder import RecordingReader
+
+BATCH = 256  # Messages per mapper.process() call, about what the ingest worker hands over
+
+
+def build_map(reader, mapper=None):
+    """Feeds every record of reader to mapper (a new one by default) and returns it"""
+    mapper = mapper or OccupancyMapper()
+    batch = []
+    for t, topic, payload in reader.iter_records():
+        batch.append(parse_message(topic, payload, t))
+        if len(batch) >= BATCH:
+            mapper.process(batch)
+            batch = []
+    mapper.process(batch)
+    mapper.flush()
+    return mapper
+
+
+def map_image(grid):
+    """BGR image of a TiledGrid, north up, free white, unknown grey, occupied black"""
+    log_odds, _, _ = grid.to_array()
+    gray = np.clip(127.0 - log_odds * (127.0 / L_MAX), 0, 255).astype(np.uint8)
+    return cv2.cvtColor(gray[::-1], cv2.COLOR_GRAY2BGR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline occupancy map of a recording")
+    parser.add_argument("recording", help=".ntr file written by main.py --record")
+    parser.add_argument("--robot", help="only write this robot's map (default: every robot)")
+    parser.add_argument("--png", help="output path with --robot (default: <recording>-<robot>.png)")
+    args = parser.parse_args()
+
+    reader = RecordingReader(args.recording)
+    start = time.perf_counter()
+    mapper = build_map(reader)
+    elapsed = time.perf_counter() - start
+    stats = mapper.stats()
+    print(f"{reader.duration:.1f} s of recording mapped in {elapsed:.2f} s "
+          f"({reader.duration / elapsed:.0f}x real time), {mapper.rays} rays")
+
+    robots = [args.robot] if args.robot else sorted(mapper.maps)
+    base = os.path.splitext(args.recording)[0]
+    for robot in robots:
+        robot_map = mapper.maps.get(robot)
+        if robot_map is None or not robot_map.grid.tiles:
+            print(f"{robot}: no distance readings")
+            continue
+        path = args.png if args.png and len(robots) == 1 else f"{base}-{robot}.png"
+        image = map_image(robot_map.grid)
+        cv2.imwrite(path, image)
+        s = stats[robot]
+        print(f"{robot}: {s['readings']} readings, {s['travelled_cm'] / 100:.1f} m travelled, "
+              f"{s['tiles']} tiles ({s['bytes'] / 1024:.0f} KiB, dense {s['dense_bytes'] / 1024:.0f} KiB), "
+              f"{image.shape[1] * CELL_CM / 100:.1f} x {image.shape[0] * CELL_CM / 100:.1f} m -> {path}")
+    reader.close()
+
+
+if __name__ == "__main__":
+    main()
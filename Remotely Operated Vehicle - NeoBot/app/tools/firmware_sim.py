@@ -0,0 +1,252 @@
+# tools/firmware_sim.py
+#
+# Stands in for one or more ESP32s running NeoBot_Firmware.ino: publishes the
+# same topics and payload formats as publishTelemetryFrame() (10 Hz) and
+# publishSensorData() (text topics, 0.5 Hz), at configurable rates, and
+# reacts to FWD/BWD/LFT/RHT/STP commands.
+#
+#   python tools/firmware_sim.py --broker 127.0.0.1 --rate 100 --robots 3
+#   python tools/firmware_sim.py --local-broker --rate 10     # no external broker
+
+import argparse
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+import paho.mqtt.client as mqtt
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from telemetry import (
+    DEFAULT_ROBOT_ID, TOPIC_TEMP, TOPIC_HUMIDITY, TOPIC_GAS_AIR, TOPIC_LDR,
+    TOPIC_IMU_ACCEL, TOPIC_IMU_GYRO, TOPIC_DISTANCE, TOPIC_COMMAND, TOPIC_ACK, TOPIC_LOG,
+    TOPIC_TELEMETRY, robot_topic
+)
+from telemetry_frame import encode_frame
+
+
+def robot_ids(count):
+    """neobot, neobot2, neobot3, ... so the first robot matches the real one"""
+    return [DEFAULT_ROBOT_ID] + [f"{DEFAULT_ROBOT_ID}{i}" for i in range(2, count + 1)]
+
+
+class SimulatedRobot:
+    """Sensor model for one vehicle, driven by the commands it receives"""
+
+    SPEED_CM_S = 40.0
+    TURN_RATE = 1.2  # rad/s
+    DEADMAN_TIMEOUT = 0.6  # s, DEADMAN_TIMEOUT in the firmware
+
+    def __init__(self, robot_id, seed=0, epoch_timestamps=False):
+        self.robot_id = robot_id
+        self.rng = random.Random(seed)
+        self.epoch_timestamps = epoch_timestamps
+        self.boot = time.monotonic()
+        self.last_step = self.boot
+        self.seq = 0
+        self.command = "STP"
+        self.last_command_time = 0.0
+        self.deadman_armed = False
+        self.deadman_stops = 0
+        self.distance = 120.0
+        self.topics = {topic: robot_topic(topic, robot_id) for topic in [
+            TOPIC_TEMP, TOPIC_HUMIDITY, TOPIC_GAS_AIR, TOPIC_LDR, TOPIC_IMU_ACCEL,
+            TOPIC_IMU_GYRO, TOPIC_DISTANCE, TOPIC_COMMAND, TOPIC_ACK, TOPIC_LOG, TOPIC_TELEMETRY,
+        ]}
+
+    def on_command(self, msg):
+        """Applies "FWD" or "FWD#42"; returns the sequence number to ack, or None"""
+        action, sep, seq = msg.partition("#")
+        self.command = action
+        self.last_command_time = time.monotonic()
+        # Like the firmware, only senders with keepalives arm the dead-man stop
+        self.deadman_armed = bool(sep) and action != "STP"
+        return seq if sep else None
+
+    def check_deadman(self, now):
+        if self.deadman_armed and now - self.last_command_time > self.DEADMAN_TIMEOUT:
+            self.command = "STP"
+            self.deadman_armed = False
+            self.deadman_stops += 1
+
+    def sample(self):
+        now = time.monotonic()
+        self.check_deadman(now)
+        dt = now - self.last_step
+        self.last_step = now
+        t = now - self.boot
+        rng = self.rng
+
+        # Driving towards / away from a wall changes the ultrasonic reading
+        if self.command == "FWD":
+            self.distance -= self.SPEED_CM_S * dt
+        elif self.command == "BWD":
+            self.distance += self.SPEED_CM_S * dt
+        if self.distance < 5.0 or self.distance > 300.0:
+            self.distance = rng.uniform(40.0, 200.0)  # Turned away or hit something
+        turning = {"LFT": self.TURN_RATE, "RHT": -self.TURN_RATE}.get(self.command, 0.0)
+
+        gas = 150 + 40 * math.sin(t / 30.0) + rng.gauss(0, 8)
+        if rng.random() < 0.002:
+            gas += rng.uniform(200, 500)  # Occasional spike
+
+        if self.epoch_timestamps:
+            timestamp_ms = int(time.time() * 1000) & 0xFFFFFFFF
+        else:
+            timestamp_ms = int(t * 1000) & 0xFFFFFFFF
+
+        s = {
+            "timestamp_ms": timestamp_ms,
+            "temperature": 24.0 + 2.0 * math.sin(t / 120.0) + rng.gauss(0, 0.1),
+            "humidity": 45.0 + 5.0 * math.sin(t / 200.0) + rng.gauss(0, 0.3),
+            "ldr": int(max(0, min(4095, 2000 + 1500 * math.sin(t / 600.0) + rng.gauss(0, 20)))),
+            "gas": int(max(0, min(4095, gas))),
+            "distance": self.distance + rng.gauss(0, 0.5),
+            "accel": (rng.gauss(0, 0.15), rng.gauss(0, 0.15), 9.81 + rng.gauss(0, 0.1)),
+            "gyro": (rng.gauss(0, 0.01), rng.gauss(0, 0.01), turning + rng.gauss(0, 0.02)),
+        }
+        return s
+
+    def text_messages(self, s):
+        """Per-topic payloads formatted like String(value, 2) in publishSensorData()"""
+        topics = self.topics
+        return [
+            (topics[TOPIC_TEMP], f"{s['temperature']:.2f}"),
+            (topics[TOPIC_HUMIDITY], f"{s['humidity']:.2f}"),
+            (topics[TOPIC_LDR], str(s["ldr"])),
+            (topics[TOPIC_GAS_AIR], str(s["gas"])),
+            (topics[TOPIC_DISTANCE], f"{s['distance']:.2f}"),
+            (topics[TOPIC_IMU_ACCEL], ",".join(f"{v:.2f}" for v in s["accel"])),
+            (topics[TOPIC_IMU_GYRO], ",".join(f"{v:.2f}" for v in s["gyro"])),
+        ]
+
+    def frame(self, s):
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        return encode_frame(self.seq, s["timestamp_ms"], s["temperature"], s["humidity"],
+                            s["ldr"], s["gas"], s["distance"], s["accel"], s["gyro"])
+
+
+class FirmwareSimulator:
+    """Publishes simulated telemetry for several robots at a fixed rate.
+
+    payload is "text" (legacy topics), "binary" (telemetry frame) or "both",
+    matching PUBLISH_LEGACY_TOPICS on the firmware. text_rate_hz limits the
+    text topics to a slower rate, as the firmware does (None: every sample).
+    """
+
+    def __init__(self, broker="127.0.0.1", port=1883, robots=1, rate_hz=10.0, payload="both",
+                 epoch_timestamps=False, seed=0, text_rate_hz=None):
+        self.rate_hz = rate_hz
+        self.payload = payload
+        self.text_interval = 1.0 / text_rate_hz if text_rate_hz else 0.0
+        self.next_text = 0.0
+        self.robots = [SimulatedRobot(rid, seed + i, epoch_timestamps) for i, rid in enumerate(robot_ids(robots))]
+        self.published = 0
+        self.late_ticks = 0
+        self._running = False
+        self._thread = None
+
+        # One broker connection per robot, like the real vehicles
+        self.clients = []
+        for robot in self.robots:
+            client = mqtt.Client()
+            client.user_data_set(robot)
+            client.on_connect = self.on_connect
+            client.on_message = self.on_message
+            client.connect(broker, port)
+            client.loop_start()
+            self.clients.append(client)
+
+    def on_connect(self, client, robot, flags, rc):
+        client.subscribe(robot.topics[TOPIC_COMMAND])
+        client.publish(robot.topics[TOPIC_LOG], "System started.")
+
+    def on_message(self, client, robot, msg):
+        seq = robot.on_command(msg.payload.decode(errors="replace"))
+        if seq is not None:
+            client.publish(robot.topics[TOPIC_ACK], seq)
+
+    def publish_once(self):
+        now = time.monotonic()
+        text_due = self.payload in ("text", "both") and now >= self.next_text
+        if text_due:
+            self.next_text = max(self.next_text + self.text_interval, now)
+        for robot, client in zip(self.robots, self.clients):
+            s = robot.sample()
+            if self.payload in ("binary", "both"):
+                client.publish(robot.topics[TOPIC_TELEMETRY], robot.frame(s))
+                self.published += 1
+            if text_due:
+                for topic, payload in robot.text_messages(s):
+                    client.publish(topic, payload)
+                self.published += 7
+
+    def run(self, duration=None):
+        """Publishes on absolute deadlines so the average rate does not drift"""
+        self._running = True
+        period = 1.0 / self.rate_hz
+        start = time.monotonic()
+        next_tick = start
+        while self._running and (duration is None or time.monotonic() - start < duration):
+            self.publish_once()
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -period:
+                self.late_ticks += 1
+                next_tick = time.monotonic()  # Fell behind, skip missed ticks
+
+    def start(self, duration=None):
+        self._thread = threading.Thread(target=self.run, args=(duration,), name="firmware-sim", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+        for client in self.clients:
+            client.loop_stop()
+            client.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NeoBot firmware simulator")
+    parser.add_argument("--broker", default=os.environ.get("NEOBOT_BROKER", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("NEOBOT_PORT", "1883")))
+    parser.add_argument("--local-broker", action="store_true", help="start an in-process broker on --port")
+    parser.add_argument("--robots", type=int, default=1)
+    parser.add_argument("--rate", type=float, default=10.0, help="samples per second per robot (firmware: 10)")
+    parser.add_argument("--text-rate", type=float, default=0.5,
+                        help="text topic samples per second, 0 = with every sample (firmware: 0.5)")
+    parser.add_argument("--payload", choices=["text", "binary", "both"], default="both")
+    parser.add_argument("--duration", type=float, help="seconds to run, default forever")
+    args = parser.parse_args()
+
+    broker = None
+    if args.local_broker:
+        from local_broker import LocalBroker
+        broker = LocalBroker(args.broker, args.port).start_in_thread()
+        print(f"Local MQTT broker listening on {broker.host}:{broker.port}")
+
+    sim = FirmwareSimulator(args.broker, args.port, robots=args.robots, rate_hz=args.rate, payload=args.payload,
+                            text_rate_hz=args.text_rate)
+    print(f"Simulating {args.robots} robot(s) at {args.rate} Hz ({args.payload} payloads)")
+    try:
+        sim.run(args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.stop()
+        if broker is not None:
+            broker.stop()
+    print(f"Published {sim.published} messages, {sim.late_ticks} late ticks")
+
+
+if __name__ == "__main__":
+    main()
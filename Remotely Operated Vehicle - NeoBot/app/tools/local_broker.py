@@ -0,0 +1,207 @@
+# tools/local_broker.py
+#
+# Minimal MQTT 3.1.1 broker for local testing and benchmarks, so the
+# dashboard and the firmware simulator can run with no network access.
+# Supports CONNECT, PUBLISH (QoS 0/1, delivered at QoS 0), SUBSCRIBE and
+# UNSUBSCRIBE with + / # wildcards, PINGREQ and DISCONNECT. No retained
+# messages, sessions, wills or auth.
+#
+#   python tools/local_broker.py [--host 127.0.0.1] [--port 1883]
+
+import argparse
+import asyncio
+import struct
+import threading
+
+CONNECT = 1
+CONNACK = 2
+PUBLISH = 3
+PUBACK = 4
+SUBSCRIBE = 8
+SUBACK = 9
+UNSUBSCRIBE = 10
+UNSUBACK = 11
+PINGREQ = 12
+PINGRESP = 13
+DISCONNECT = 14
+
+
+def topic_matches(topic_filter, topic):
+    f_levels = topic_filter.split("/")
+    t_levels = topic.split("/")
+    for i, f in enumerate(f_levels):
+        if f == "#":
+            return True
+        if i >= len(t_levels):
+            return False
+        if f != "+" and f != t_levels[i]:
+            return False
+    return len(f_levels) == len(t_levels)
+
+
+def encode_length(n):
+    out = bytearray()
+    while True:
+        byte = n % 128
+        n //= 128
+        if n:
+            byte |= 0x80
+        out.append(byte)
+        if not n:
+            return bytes(out)
+
+
+def packet(packet_type, flags, body):
+    return bytes([(packet_type << 4) | flags]) + encode_length(len(body)) + body
+
+
+async def read_packet(reader):
+    first = (await reader.readexactly(1))[0]
+    multiplier, length = 1, 0
+    while True:
+        byte = (await reader.readexactly(1))[0]
+        length += (byte & 0x7F) * multiplier
+        if not byte & 0x80:
+            break
+        multiplier *= 128
+    body = await reader.readexactly(length) if length else b""
+    return first >> 4, first & 0x0F, body
+
+
+class Session:
+    def __init__(self, writer):
+        self.writer = writer
+        self.filters = set()
+
+
+class LocalBroker:
+    def __init__(self, host="127.0.0.1", port=1883):
+        self.host = host
+        self.port = port
+        self.sessions = set()
+        self.published = 0
+        self.delivered = 0
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    async def serve(self):
+        self._server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # Resolves port 0
+        return self._server
+
+    async def handle_client(self, reader, writer):
+        session = Session(writer)
+        self.sessions.add(session)
+        try:
+            while True:
+                packet_type, flags, body = await read_packet(reader)
+                if packet_type == CONNECT:
+                    writer.write(packet(CONNACK, 0, b"\x00\x00"))
+                elif packet_type == PUBLISH:
+                    self.handle_publish(writer, flags, body)
+                elif packet_type == SUBSCRIBE:
+                    self.handle_subscribe(session, body)
+                elif packet_type == UNSUBSCRIBE:
+                    self.handle_unsubscribe(session, body)
+                elif packet_type == PINGREQ:
+                    writer.write(packet(PINGRESP, 0, b""))
+                elif packet_type == DISCONNECT:
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.sessions.discard(session)
+            writer.close()
+
+    def handle_publish(self, writer, flags, body):
+        qos = (flags >> 1) & 0x03
+        topic_len, = struct.unpack_from("!H", body, 0)
+        topic = body[2:2 + topic_len].decode()
+        pos = 2 + topic_len
+        if qos:
+            writer.write(packet(PUBACK, 0, body[pos:pos + 2]))
+            pos += 2
+        payload = body[pos:]
+        self.published += 1
+
+        out = packet(PUBLISH, 0, body[:2 + topic_len] + payload)
+        for session in list(self.sessions):
+            if any(topic_matches(f, topic) for f in session.filters):
+                session.writer.write(out)
+                self.delivered += 1
+
+    def handle_subscribe(self, session, body):
+        packet_id = body[:2]
+        pos = 2
+        granted = bytearray()
+        while pos < len(body):
+            n, = struct.unpack_from("!H", body, pos)
+            session.filters.add(body[pos + 2:pos + 2 + n].decode())
+            pos += 2 + n + 1  # Requested QoS byte, always granted as 0
+            granted.append(0)
+        session.writer.write(packet(SUBACK, 0, packet_id + bytes(granted)))
+
+    def handle_unsubscribe(self, session, body):
+        pos = 2
+        while pos < len(body):
+            n, = struct.unpack_from("!H", body, pos)
+            session.filters.discard(body[pos + 2:pos + 2 + n].decode())
+            pos += 2 + n
+        session.writer.write(packet(UNSUBACK, 0, body[:2]))
+
+    # --- In-process use (tests, benchmarks)
+
+    def start_in_thread(self):
+        """Runs the broker on a background event loop and returns once it listens"""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.serve())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="local-broker", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            for session in list(self.sessions):
+                session.writer.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minimal local MQTT broker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1883)
+    args = parser.parse_args()
+
+    async def run():
+        broker = LocalBroker(args.host, args.port)
+        server = await broker.serve()
+        print(f"Local MQTT broker listening on {broker.host}:{broker.port}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
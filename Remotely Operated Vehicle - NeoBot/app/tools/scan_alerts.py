@@ -0,0 +1,76 @@
+# tools/scan_alerts.py
+#
+# Runs the sensor status rules over a whole recording (.ntr) in bulk and
+# prints every status change, or only changes into alert buckets, per robot.
+#
+#   python tools/scan_alerts.py run1.ntr
+#   python tools/scan_alerts.py run1.ntr --alerts-only --rules my_rules.json
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from mqtt_ingest import parse_message
+from sensor_rules import load_rules
+from telemetry import TOPIC_TELEMETRY
+from telemetry_frame import frame_to_topics
+from telemetry_recorder import RecordingReader
+
+
+def collect_series(reader, topics):
+    """{(robot, topic): ([t], [value])} for the rule topics, text and binary frames alike"""
+    series = defaultdict(lambda: ([], []))
+    for t, topic, payload in reader.iter_records():
+        message = parse_message(topic, payload, t)
+        if message.value is None:
+            continue
+        if message.topic == TOPIC_TELEMETRY:
+            readings = frame_to_topics(message.value)
+        else:
+            readings = [(message.topic, message.value)]
+        for reading_topic, value in readings:
+            if reading_topic in topics and isinstance(value, (int, float)):
+                times, values = series[message.robot, reading_topic]
+                times.append(t)
+                values.append(value)
+    return series
+
+
+def scan(reader, rules, alerts_only=False):
+    """[(t, robot, sensor, value, status, alert)] in time order"""
+    events = []
+    for (robot, topic), (times, values) in collect_series(reader, rules.by_topic).items():
+        rule = rules.by_topic[topic]
+        for t, value, index in rule.transitions(times, values, alerts_only):
+            status = rule.display_for(index)[1]
+            events.append((t, robot, rule.name, rule.format_value(value), status, index >= 0 and rule.alerts[index]))
+    events.sort()
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk sensor status/alert scan of a recording")
+    parser.add_argument("recording", help=".ntr file written by main.py --record")
+    parser.add_argument("--rules", help="rules file (default: $NEOBOT_RULES or sensor_rules.json)")
+    parser.add_argument("--alerts-only", action="store_true", help="only report changes into alert buckets")
+    args = parser.parse_args()
+
+    reader = RecordingReader(args.recording)
+    start = time.perf_counter()
+    events = scan(reader, load_rules(args.rules), args.alerts_only)
+    elapsed = time.perf_counter() - start
+    for t, robot, sensor, value, status, alert in events:
+        stamp = time.strftime("%H:%M:%S", time.localtime(t)) + f".{int(t * 1000) % 1000:03d}"
+        print(f"{stamp}  {robot:<10} {sensor:<12} {status:<9} {value:>10}{'  ALERT' if alert else ''}")
+    print(f"{len(events)} status changes in {reader.duration:.1f} s of recording, scanned in {elapsed:.2f} s")
+    reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# tools/stream_generator.py
+#
+# Synthetic robot camera for testing network video without hardware: serves
+# MJPEG over HTTP and/or publishes JPEG frames on roboai/<id>/camera over
+# MQTT, where it also follows the quality requests the dashboard sends on
+# roboai/<id>/camera/config.
+#
+#   python tools/stream_generator.py --http 8081          # then: python main.py --video http://127.0.0.1:8081/stream.mjpg
+#   python tools/stream_generator.py --mqtt 127.0.0.1     # then: python main.py --broker 127.0.0.1 --video mqtt
+#   python tools/stream_generator.py --http 8081 --size 1280x720 --fps 60 --jitter 20
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+import paho.mqtt.client as mqtt
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from telemetry import DEFAULT_ROBOT_ID, TOPIC_CAMERA, TOPIC_CAMERA_CONFIG, robot_topic
+
+BOUNDARY = "neobotframe"
+
+
+class SyntheticVideo:
+    """Moving test pattern with a frame counter, encoded as JPEG"""
+
+    def __init__(self, width=640, height=480, quality=80):
+        self.width = width
+        self.height = height
+        self.quality = quality
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        self.background = np.dstack([
+            np.broadcast_to(x, (height, width)),
+            np.broadcast_to(y, (height, width)),
+            np.full((height, width), 96, np.float32),
+        ]).astype(np.uint8)
+
+    def render(self, n):
+        frame = np.roll(self.background, (n * 4) % self.width, axis=1)
+        size = self.height // 4
+        x = int((self.width - size) * (0.5 + 0.5 * np.sin(n / 20.0)))
+        y = int((self.height - size) * (0.5 + 0.5 * np.cos(n / 31.0)))
+        cv2.rectangle(frame, (x, y), (x + size, y + size), (255, 255, 255), -1)
+        cv2.putText(frame, f"#{n}", (10, self.height - 12), cv2.FONT_HERSHEY_SIMPLEX,
+                    self.height / 480.0, (0, 0, 0), 2)
+        return frame
+
+    def encode(self, n, quality=None):
+        ok, data = cv2.imencode(".jpg", self.render(n), [cv2.IMWRITE_JPEG_QUALITY, quality or self.quality])
+        return data.tobytes()
+
+
+def paced_frames(video, fps, jitter=0.0, duration=None, seed=0, quality=lambda: None):
+    """Yields (n, jpeg) on absolute deadlines, each delayed by up to `jitter` seconds"""
+    rng = random.Random(seed)
+    period = 1.0 / fps
+    start = time.monotonic()
+    n = 0
+    while duration is None or time.monotonic() - start < duration:
+        deadline = start + n * period + (rng.uniform(0, jitter) if jitter else 0.0)
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        yield n, video.encode(n, quality())
+        n += 1
+
+
+class MjpegServer:
+    """Serves the synthetic video as multipart/x-mixed-replace on /stream.mjpg"""
+
+    def __init__(self, host="127.0.0.1", port=0, fps=30, width=640, height=480, quality=80, jitter=0.0):
+        self.fps = fps
+        self.jitter = jitter
+        self.video = SyntheticVideo(width, height, quality)
+        self.sent = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/stream.mjpg":
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                try:
+                    for _, jpeg in paced_frames(server.video, server.fps, server.jitter):
+                        self.wfile.write(
+                            f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                            f"Content-Length: {len(jpeg)}\r\n\r\n".encode() + jpeg + b"\r\n"
+                        )
+                        server.sent += 1
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Viewer went away
+
+            def log_message(self, fmt, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.host, self.port = self.httpd.server_address[:2]
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/stream.mjpg"
+
+    def start_in_thread(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mjpeg-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class MqttCameraPublisher:
+    """Publishes JPEG frames like a robot camera would, at the quality the dashboard asks for"""
+
+    def __init__(self, broker="127.0.0.1", port=1883, robot_id=DEFAULT_ROBOT_ID, fps=15,
+                 width=640, height=480, quality=80, jitter=0.0):
+        self.fps = fps
+        self.jitter = jitter
+        self.video = SyntheticVideo(width, height, quality)
+        self.requested_quality = None
+        self.published = 0
+        self.topic = robot_topic(TOPIC_CAMERA, robot_id)
+        self.config_topic = robot_topic(TOPIC_CAMERA_CONFIG, robot_id)
+        self.client = mqtt.Client()
+        self.client.on_connect = lambda client, userdata, flags, rc: client.subscribe(self.config_topic)
+        self.client.on_message = self.on_message
+        self.client.connect(broker, port)
+        self.client.loop_start()
+        self._running = False
+
+    def on_message(self, client, userdata, msg):
+        try:
+            self.requested_quality = max(10, min(95, int(msg.payload)))
+        except ValueError:
+            pass
+
+    def run(self, duration=None):
+        self._running = True
+        for _, jpeg in paced_frames(self.video, self.fps, self.jitter, duration,
+                                    quality=lambda: self.requested_quality):
+            if not self._running:
+                break
+            self.client.publish(self.topic, jpeg)
+            self.published += 1
+
+    def stop(self):
+        self._running = False
+        self.client.loop_stop()
+        self.client.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic NeoBot camera stream")
+    parser.add_argument("--http", type=int, metavar="PORT", help="serve MJPEG on this port")
+    parser.add_argument("--mqtt", metavar="BROKER", help="publish JPEG frames to this broker")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("NEOBOT_PORT", "1883")), help="MQTT port")
+    parser.add_argument("--robot", default=DEFAULT_ROBOT_ID)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--size", default="640x480", help="WIDTHxHEIGHT")
+    parser.add_argument("--quality", type=int, default=80, help="JPEG quality until the dashboard asks otherwise")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra delay per frame, ms")
+    parser.add_argument("--duration", type=float, help="seconds to run, default forever")
+    args = parser.parse_args()
+    if args.http is None and args.mqtt is None:
+        parser.error("give --http PORT and/or --mqtt BROKER")
+
+    width, height = map(int, args.size.lower().split("x"))
+    jitter = args.jitter / 1000.0
+    server = publisher = None
+    if args.http is not None:
+        server = MjpegServer("0.0.0.0", args.http, args.fps, width, height, args.quality, jitter).start_in_thread()
+        print(f"MJPEG stream on http://127.0.0.1:{server.port}/stream.mjpg ({width}x{height} @ {args.fps} fps)")
+    try:
+        if args.mqtt is not None:
+            publisher = MqttCameraPublisher(args.mqtt, args.port, args.robot, args.fps,
+                                            width, height, args.quality, jitter)
+            print(f"Publishing {width}x{height} @ {args.fps} fps on {publisher.topic}")
+            publisher.run(args.duration)
+        else:
+            time.sleep(args.duration if args.duration is not None else 1e9)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if publisher is not None:
+            publisher.stop()
+            print(f"Published {publisher.published} frames")
+        if server is not None:
+            server.stop()
+            print(f"Served {server.sent} frames")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# tools/video_frame.py
+#
+# Finds the recorded camera frame closest to a moment, e.g. an alert time
+# printed by tools/scan_alerts.py or a telemetry timestamp, and writes it out.
+# TIME is epoch seconds or local "YYYY-mm-dd HH:MM:SS[.fff]".
+#
+#   python tools/video_frame.py video/ 1700000123.45
+#   python tools/video_frame.py video/ "2024-01-01 12:00:03.250" --out frame.jpg
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+import cv2
+
+from video_recorder import VideoIndex
+
+
+def parse_time(text):
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"not a time: {text!r}")
+
+
+def format_time(t):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t)) + f".{int(t * 1000) % 1000:03d}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recorded camera frame nearest to a time")
+    parser.add_argument("directory", help="directory written by main.py --record-video")
+    parser.add_argument("time", type=parse_time, help="epoch seconds or \"YYYY-mm-dd HH:MM:SS[.fff]\" (local)")
+    parser.add_argument("--out", default="frame.jpg", help="image to write (default: frame.jpg)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = VideoIndex(args.directory)
+    if not len(index):
+        sys.exit(f"{args.directory}: no recorded frames")
+    loaded = time.perf_counter()
+    ref = index.nearest(args.time)
+    looked_up = time.perf_counter()
+    frame = index.read(ref)
+    if frame is None:
+        sys.exit(f"{ref.path}: cannot read frame {ref.frame}")
+    cv2.imwrite(args.out, frame)
+
+    first, last = index.span()
+    print(f"{len(index)} frames in {len(index.paths)} segments, {format_time(first)} .. {format_time(last)} "
+          f"(index loaded in {(loaded - start) * 1000:.1f} ms, lookup {(looked_up - loaded) * 1e6:.0f} µs)")
+    print(f"{os.path.basename(ref.path)} frame {ref.frame} at {format_time(ref.t)} "
+          f"({ref.t - args.time:+.3f} s from {format_time(args.time)}) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
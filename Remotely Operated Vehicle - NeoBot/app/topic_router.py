@@ -0,0 +1,85 @@
+# topic_router.py
+
+from telemetry import (
+    DEFAULT_ROBOT_ID, DERIVED_TOPICS, SENSOR_TOPICS, TOPIC_COMMAND, TOPIC_LOG, TOPIC_TELEMETRY, robot_topic
+)
+
+# Broker-side subscriptions covering every robot on the shared connection
+FLEET_SUBSCRIPTIONS = [
+    "roboai/+/sensor/#",
+    "roboai/+/telemetry",
+    "roboai/+/log",
+    "roboai/+/ack",
+    "roboai/+/camera",
+]
+
+
+class TopicRouter:
+    """MQTT topic filter trie (+ and # wildcards).
+
+    Filters are split into levels once when added; match() walks the topic's
+    levels through nested dicts, so the cost per message is proportional to
+    the topic depth, not to the number of filters. Each match also returns
+    the levels captured by + wildcards (e.g. the robot id).
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, topic_filter, value):
+        node = self.root
+        for level in topic_filter.split("/"):
+            node = node.setdefault(level, {})
+        node[None] = value  # None can never be a topic level
+
+    def match(self, topic):
+        """Returns [(value, captured + levels)] for every filter matching topic"""
+        levels = topic.split("/")
+        results = []
+        self._walk(self.root, levels, 0, (), results)
+        return results
+
+    def first(self, topic):
+        """Like match() but returns only the first (value, captures), or None"""
+        matches = self.match(topic)
+        return matches[0] if matches else None
+
+    def _walk(self, node, levels, i, captures, results):
+        child = node.get("#")
+        if child is not None and None in child:
+            results.append((child[None], captures + ("/".join(levels[i:]),)))
+        if i == len(levels):
+            if None in node:
+                results.append((node[None], captures))
+            return
+        level = levels[i]
+        child = node.get(level)
+        if child is not None:
+            self._walk(child, levels, i + 1, captures, results)
+        child = node.get("+")
+        if child is not None:
+            self._walk(child, levels, i + 1, captures + (level,), results)
+
+
+def build_robot_router():
+    """Maps roboai/<robot>/... topics to the canonical roboai/neobot/... topic"""
+    router = TopicRouter()
+    # Derived topics and sent commands only arrive from recordings, but replay resolves robots the same way
+    for topic in SENSOR_TOPICS + [TOPIC_TELEMETRY, TOPIC_LOG, TOPIC_COMMAND] + list(DERIVED_TOPICS):
+        router.add(robot_topic(topic, "+"), topic)
+    return router
+
+
+_robot_router = build_robot_router()
+
+
+def canonical_topic(topic):
+    """("roboai/neobot2/sensor/mq2") -> ("roboai/neobot/sensor/mq2", "neobot2").
+
+    Unknown topics are returned unchanged with the default robot id.
+    """
+    match = _robot_router.first(topic)
+    if match is None:
+        return topic, DEFAULT_ROBOT_ID
+    canonical, captures = match
+    return canonical, captures[0]
@@ -0,0 +1,304 @@
+# video_recorder.py
+#
+# Background recording of the camera feed next to the telemetry recordings.
+# The capture thread copies each offered frame into a free slot of a small
+# ring of reused buffers and returns. An encoder thread writes the slots with
+# cv2.VideoWriter into fixed-length segments. With no free slot the frame is
+# not recorded, and display never waits for the encoder. Every segment has
+# a timestamp index next to it, so a telemetry time maps to a segment and
+# frame number with two binary searches, then one seek. No Qt here.
+#
+#   <dir>/video-20240101-120000-000Z.avi       MJPG (every frame a keyframe, so seeks are exact)
+#   <dir>/video-20240101-120000-000Z.avi.idx   float64 host time per frame, in frame order
+
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import deque, namedtuple
+
+import cv2
+import numpy as np
+
+from instrumentation import metrics
+
+INDEX_DTYPE = np.dtype("<f8")
+SEGMENT_PREFIX = "video-"
+SEGMENT_EXT = ".avi"
+
+# Nearest recorded frame to a timestamp: file, frame number in it, its time
+FrameRef = namedtuple("FrameRef", ["path", "frame", "t"])
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+def list_segments(directory):
+    """Segment paths in time order (names sort by start time)"""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return [os.path.join(directory, name) for name in sorted(names)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_EXT)]
+
+
+class VideoRecorder:
+    """Records frames offered by a capture worker into rolling video segments.
+
+    submit() runs on the capture thread and costs one copy into a slot;
+    frames are resized to size on the encoder thread. Frames come at
+    whatever rate the camera delivers. max_fps caps that; the index holds
+    the real times, so the fps in the file header is only nominal. Segments
+    rotate every segment_seconds. After each rotation the oldest segments
+    are deleted while the directory, plus room for one more segment like the
+    last, would hold more than max_bytes, and segments older than max_age
+    seconds (None: no age limit).
+    """
+
+    def __init__(self, directory, size=(640, 480), max_fps=15.0, segment_seconds=60.0, max_bytes=2 * 1024 ** 3,
+                 max_age=None, fourcc="MJPG", slots=4):
+        self.directory = directory
+        self.size = size
+        self.interval = 1.0 / max_fps
+        self.max_fps = max_fps
+        self.segment_seconds = segment_seconds
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        os.makedirs(directory, exist_ok=True)
+
+        self.frames = [None] * slots  # Reallocated when the source resolution changes
+        self._resized = np.empty((size[1], size[0], 3), np.uint8)
+        self._free = list(range(slots))
+        self._queue = deque()  # (slot, t)
+        self._cond = threading.Condition()
+        self._running = True
+        self.next_due = 0.0
+
+        self.writer = None
+        self.segment = None
+        self.segment_start = 0.0
+        self._index = None
+
+        self.submitted = 0
+        self.recorded = 0
+        self.skipped_rate = 0  # Ahead of max_fps
+        self.skipped_busy = 0  # Encoder behind, every slot in use
+        self.segments = 0
+        self.deleted = 0
+        self.error = None  # Set when a segment cannot be opened or written (codec missing, disk full)
+        self.encode_time = metrics.histogram("video.encode")
+        self.submit_time = metrics.histogram("video.submit")
+
+        self._thread = threading.Thread(target=self._run, name="video-recorder", daemon=True)
+        self._thread.start()
+
+    # --- Capture thread
+
+    def submit(self, frame, t=None):
+        """Offers a BGR frame; returns False if it was not recorded"""
+        start = time.perf_counter()
+        t = time.time() if t is None else t
+        if t < self.next_due:
+            self.skipped_rate += 1
+            return False
+        with self._cond:
+            if not self._running:
+                return False  # Stopped, or the encoder gave up (see error)
+            slot = self._free.pop() if self._free else None
+        if slot is None:
+            self.skipped_busy += 1
+            return False
+        self.next_due = max(self.next_due + self.interval, t)
+        buf = self.frames[slot]
+        if buf is None or buf.shape != frame.shape:
+            buf = self.frames[slot] = np.empty_like(frame)
+        np.copyto(buf, frame)
+        with self._cond:
+            self._queue.append((slot, t))
+            self._cond.notify()
+        self.submitted += 1
+        self.submit_time.record(time.perf_counter() - start)
+        return True
+
+    # --- Encoder thread
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and self._running:
+                    self._cond.wait()
+                if not self._queue:
+                    break
+                slot, t = self._queue.popleft()
+            try:
+                self._write(self.frames[slot], t)
+            except Exception as e:
+                # Disk full, directory gone, encoder failure: stop recording and say why, never die silently
+                self.error = f"recording stopped: {e}"
+                with self._cond:
+                    self._running = False
+                    self._queue.clear()
+                break
+            finally:
+                with self._cond:
+                    self._free.append(slot)
+        try:
+            self._close_segment()
+        except Exception as e:
+            self.error = self.error or f"cannot close {self.segment}: {e}"
+
+    def _write(self, frame, t):
+        if self.writer is None or t - self.segment_start >= self.segment_seconds:
+            self._close_segment()
+            self._open_segment(t)
+            self.apply_retention(t)
+        if not self.writer.isOpened():
+            return
+        start = time.perf_counter()
+        h, w = frame.shape[:2]
+        if (w, h) != self.size:
+            # MQTT frames change resolution with the decode downscale, the file cannot
+            frame = cv2.resize(frame, self.size, dst=self._resized, interpolation=cv2.INTER_AREA)
+        self.writer.write(frame)  # Releases the GIL while encoding
+        self._index.write(np.float64(t).tobytes())
+        self.encode_time.record(time.perf_counter() - start)
+        self.recorded += 1
+
+    def _open_segment(self, t):
+        # UTC, so names keep sorting by start time across DST changes
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(t)) + f"-{int(t * 1000) % 1000:03d}Z"
+        self.segment = os.path.join(self.directory, f"{SEGMENT_PREFIX}{stamp}{SEGMENT_EXT}")
+        self.writer = cv2.VideoWriter(self.segment, self.fourcc, self.max_fps, self.size)
+        if not self.writer.isOpened():
+            self.error = f"cannot write {self.segment}"
+        self._index = open(index_path(self.segment), "wb")
+        self.segment_start = t
+        self.segments += 1
+
+    def _close_segment(self):
+        if self.writer is not None:
+            writer, index = self.writer, self._index
+            self.writer = None
+            self._index = None
+            writer.release()
+            index.close()
+
+    def apply_retention(self, now):
+        """Deletes the oldest closed segments beyond max_bytes / max_age"""
+        closed = [path for path in list_segments(self.directory) if path != self.segment]
+        sizes = {}
+        mtimes = {}
+        for path in closed:
+            try:
+                sizes[path] = os.path.getsize(path) + os.path.getsize(index_path(path))
+                mtimes[path] = os.path.getmtime(path)
+            except OSError:
+                sizes[path] = 0  # Half deleted, by us or by hand
+                mtimes[path] = 0.0
+        # The segment just opened will grow to about the size of the last one
+        total = sum(sizes.values()) + (sizes[closed[-1]] if closed else 0)
+        for path in closed:
+            too_big = total > self.max_bytes
+            too_old = self.max_age is not None and now - mtimes[path] > self.max_age
+            if not too_big and not too_old:
+                break
+            for victim in (path, index_path(path)):
+                try:
+                    os.remove(victim)
+                except FileNotFoundError:
+                    pass
+            total -= sizes[path]
+            self.deleted += 1
+
+    def disk_bytes(self):
+        total = 0
+        for path in list_segments(self.directory):
+            for name in (path, index_path(path)):
+                try:
+                    total += os.path.getsize(name)
+                except OSError:
+                    pass
+        return total
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "recorded": self.recorded,
+            "skipped_rate": self.skipped_rate,
+            "skipped_busy": self.skipped_busy,
+            "queued": len(self._queue),
+            "segments": self.segments,
+            "deleted": self.deleted,
+            "error": self.error,
+            "encode": self.encode_time.summary(),
+        }
+
+    def stop(self, timeout=5.0):
+        """Encodes what is queued, closes the segment and stops the thread"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout)
+
+
+class VideoIndex:
+    """Timestamp lookup over the segments in a directory.
+
+    Loads each segment's index (8 bytes per frame) once. nearest(t) is a
+    binary search over segment start times, then one inside the segment.
+    Call reload() to see segments written since.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.reload()
+
+    def reload(self):
+        segments = []
+        for path in list_segments(self.directory):
+            try:
+                times = np.fromfile(index_path(path), INDEX_DTYPE)
+            except (FileNotFoundError, ValueError):
+                continue
+            if len(times):
+                segments.append((times[0], path, times))
+        segments.sort(key=lambda segment: segment[0])
+        self.starts = [segment[0] for segment in segments]
+        self.paths = [segment[1] for segment in segments]
+        self.times = [segment[2] for segment in segments]
+
+    def __len__(self):
+        return sum(len(times) for times in self.times)
+
+    def span(self):
+        return (self.times[0][0], self.times[-1][-1]) if self.times else None
+
+    def nearest(self, t):
+        """FrameRef of the frame closest in time to t, or None without frames"""
+        if not self.paths:
+            return None
+        i = max(bisect_right(self.starts, t) - 1, 0)
+        best = None
+        # The closest frame is in this segment or is the first one of the next
+        for j in (i, i + 1):
+            if j >= len(self.times):
+                break
+            times = self.times[j]
+            k = int(np.searchsorted(times, t))
+            for frame in (k - 1, k):
+                if 0 <= frame < len(times) and (best is None or abs(times[frame] - t) < abs(best.t - t)):
+                    best = FrameRef(self.paths[j], frame, float(times[frame]))
+        return best
+
+    def read(self, ref):
+        """Decodes the BGR frame a FrameRef points to, or None"""
+        cap = cv2.VideoCapture(ref.path)
+        try:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, ref.frame)
+            ok, frame = cap.read()
+        finally:
+            cap.release()
+        return frame if ok else None
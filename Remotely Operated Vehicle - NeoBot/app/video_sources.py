@@ -0,0 +1,281 @@
+# video_sources.py
+
+import threading
+import time
+import urllib.request
+
+import cv2
+import numpy as np
+from PyQt5.QtCore import pyqtSignal
+
+from camera_capture import CaptureWorker, LatestFrameSlot
+from instrumentation import metrics
+from telemetry import MQTT_SOURCE
+
+# Reduced imdecode modes let libjpeg skip most of the IDCT work for 1/2, 1/4, 1/8 size
+DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+MAX_JPEG_BYTES = 8 * 1024 * 1024  # Resync if a stream never closes a frame
+
+
+def is_jpeg_source(source):
+    """True for sources decoded here (MJPEG over HTTP, MQTT), False for RTSP/UDP/files"""
+    return source == MQTT_SOURCE or source.startswith(("http://", "https://"))
+
+
+def iter_mjpeg(stream, chunk_size=65536):
+    """Yields JPEG images from a multipart/x-mixed-replace (MJPEG) HTTP body.
+
+    Frames are cut at the JPEG start/end markers rather than by part headers,
+    which works with cameras that omit Content-Length. 0xFFD9 cannot occur
+    inside entropy-coded data (0xFF is byte-stuffed there).
+    """
+    read = getattr(stream, "read1", stream.read)  # read1 returns what has arrived instead of waiting for chunk_size
+    buf = bytearray()
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        buf += chunk
+        while True:
+            start = buf.find(b"\xff\xd8")
+            if start < 0:
+                del buf[:-1]  # Keep a trailing 0xFF, it may start the next marker
+                break
+            end = buf.find(b"\xff\xd9", start + 2)
+            if end < 0:
+                if start:
+                    del buf[:start]
+                if len(buf) > MAX_JPEG_BYTES:
+                    buf.clear()
+                break
+            yield bytes(buf[start:end + 2])
+            del buf[:end + 2]
+
+
+class AdaptiveQuality:
+    """Steps stream resolution and quality down when decoding cannot keep up, and back up when it can.
+
+    Load is (decode time + arrival jitter) / arrival interval, all moving
+    averages. `hold` frames in a row above `high` step one level down; four
+    times as many below `low` step one level up, so a single slow frame or a
+    short burst does not make the picture flip between sizes.
+    Arrivals are fed from the receiving thread and decode times from the
+    decoding thread; they touch separate fields.
+    """
+
+    # (decode downscale, JPEG quality requested from the robot)
+    LEVELS = [(1, 80), (2, 70), (4, 55), (8, 40)]
+
+    def __init__(self, high=0.8, low=0.35, hold=10, alpha=0.1):
+        self.high = high
+        self.low = low
+        self.hold = hold
+        self.alpha = alpha
+        self.level = 0
+        self.decode_time = 0.0
+        self.interval = 0.0
+        self.jitter = 0.0
+        self.last_arrival = None
+        self.over = 0
+        self.under = 0
+
+    @property
+    def scale(self):
+        return self.LEVELS[self.level][0]
+
+    @property
+    def quality(self):
+        return self.LEVELS[self.level][1]
+
+    def on_arrival(self, t):
+        if self.last_arrival is not None:
+            dt = t - self.last_arrival
+            if self.interval <= 0:
+                self.interval = dt
+            else:
+                self.jitter += self.alpha * (abs(dt - self.interval) - self.jitter)
+                self.interval += self.alpha * (dt - self.interval)
+        self.last_arrival = t
+
+    def load(self):
+        if self.interval <= 0:
+            return 0.0
+        return (self.decode_time + self.jitter) / self.interval
+
+    def on_decoded(self, seconds):
+        """Feeds one decode time, returns True if the level changed"""
+        if self.decode_time <= 0:
+            self.decode_time = seconds
+        else:
+            self.decode_time += self.alpha * (seconds - self.decode_time)
+
+        load = self.load()
+        if load > self.high:
+            self.over += 1
+            self.under = 0
+            if self.over >= self.hold and self.level < len(self.LEVELS) - 1:
+                return self.step(1)
+        elif load < self.low:
+            self.under += 1
+            self.over = 0
+            if self.under >= self.hold * 4 and self.level > 0:
+                return self.step(-1)
+        else:
+            self.over = self.under = 0
+        return False
+
+    def step(self, delta):
+        self.level += delta
+        self.over = self.under = 0
+        self.decode_time = 0.0  # Measure the new level from scratch
+        return True
+
+
+class VideoStreamWorker(CaptureWorker):
+    """Receives and decodes a network video stream off the GUI thread.
+
+    JPEG sources (MJPEG over HTTP, frames over MQTT) are split in two: the
+    receiver keeps only the newest compressed frame and this thread decodes
+    whatever is newest when it gets to it, so a slow decoder drops whole
+    frames before spending any time on them. AdaptiveQuality picks the
+    decode downscale and the JPEG quality to request from the robot.
+    RTSP/UDP go through OpenCV's FFmpeg backend, which must decode every
+    packet itself; there, frames the GUI has not caught up with skip only
+    the retrieve and convert steps.
+    Same GUI contract as CaptureWorker: latest_frame() returns pooled
+    FrameBuffers that must be released.
+    """
+
+    source_opened = pyqtSignal(str, bool)  # source, success
+    quality_changed = pyqtSignal(int, int)  # decode downscale, requested JPEG quality
+
+    READ_TIMEOUT = 5.0
+
+    def __init__(self, source, size=(310, 220), parent=None):
+        super().__init__(index=None, size=size, parent=parent)
+        self.source = source
+        self.compressed = LatestFrameSlot()
+        self.compressed_ready = threading.Event()
+        self.quality = AdaptiveQuality()
+        self.skipped = 0  # Frames never converted because the GUI was behind
+        self.errors = 0
+        self.decode_hist = metrics.histogram("video.decode")
+
+    def push_jpeg(self, payload, t=None):
+        """Queues a compressed frame, from the receiver or the MQTT network thread"""
+        self.received += 1
+        self.quality.on_arrival(time.time() if t is None else t)
+        self.compressed.put(payload)
+        self.compressed_ready.set()
+
+    def stop(self):
+        self._running = False
+        self.compressed_ready.set()
+        self.wait()
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "decoded": self.decoded,
+            "dropped": self.compressed.dropped + self.skipped,
+            "errors": self.errors,
+            "scale": self.quality.scale,
+            "decode_ms": self.quality.decode_time * 1000,
+            "jitter_ms": self.quality.jitter * 1000,
+        }
+
+    # --- Worker threads
+
+    def run(self):
+        if not is_jpeg_source(self.source):
+            self.run_opencv()
+            return
+        if self.source == MQTT_SOURCE:
+            self.source_opened.emit(self.source, True)  # Frames arrive through push_jpeg()
+        else:
+            # Daemon: a blocked read must not hold up shutdown, it ends with the next frame or timeout
+            threading.Thread(target=self.receive_mjpeg, name="mjpeg-receiver", daemon=True).start()
+        self.decode_loop()
+
+    def decode_loop(self):
+        perf_counter = time.perf_counter
+        while self._running:
+            if not self.compressed_ready.wait(0.5):
+                continue
+            self.compressed_ready.clear()
+            payload = self.compressed.take()
+            if payload is None:
+                continue
+            if self.slot.pending():
+                self.skipped += 1  # GUI has not shown the previous frame yet, skip the decode
+                continue
+
+            start = perf_counter()
+            frame = cv2.imdecode(np.frombuffer(payload, np.uint8), DECODE_FLAGS[self.quality.scale])
+            if frame is None:
+                self.errors += 1
+                continue
+            self.decoded += 1
+            self.deliver(frame)
+            seconds = perf_counter() - start
+            self.decode_hist.record(seconds)
+            if self.quality.on_decoded(seconds):
+                self.quality_changed.emit(self.quality.scale, self.quality.quality)
+
+    def receive_mjpeg(self):
+        while self._running:
+            try:
+                with urllib.request.urlopen(self.source, timeout=self.READ_TIMEOUT) as stream:
+                    self.source_opened.emit(self.source, True)
+                    for jpeg in iter_mjpeg(stream):
+                        if not self._running:
+                            return
+                        self.push_jpeg(jpeg)
+            except (OSError, ValueError):  # URLError, timeouts, resets, bad URLs
+                pass
+            if self._running:
+                self.source_opened.emit(self.source, False)
+                time.sleep(self.RETRY_INTERVAL)
+
+    def run_opencv(self):
+        cap = None
+        read_buf = None
+        while self._running:
+            if cap is None:
+                cap = cv2.VideoCapture(self.source)
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Keep the backend from queueing stale frames
+                opened = cap.isOpened()
+                self.source_opened.emit(self.source, opened)
+                if not opened:
+                    cap.release()
+                    cap = None
+                    time.sleep(self.RETRY_INTERVAL)
+                    continue
+
+            if not cap.grab():
+                cap.release()  # Stream ended or broke, reconnect
+                cap = None
+                continue
+            self.received += 1
+            self.quality.on_arrival(time.time())
+            if self.slot.pending():
+                self.skipped += 1
+                continue
+
+            start = time.perf_counter()
+            ret, frame = cap.retrieve(read_buf)
+            if not ret:
+                continue
+            read_buf = frame
+            self.decoded += 1
+            self.deliver(frame)
+            self.decode_hist.record(time.perf_counter() - start)
+
+        if cap is not None:
+            cap.release()
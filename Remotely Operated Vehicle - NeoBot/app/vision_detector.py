@@ -0,0 +1,251 @@
+# vision_detector.py
+#
+# Obstacle detection on camera frames in a pool of worker processes. The
+# capture thread downscales the frames it offers straight into a slot of one
+# shared-memory array, so only a slot index crosses the process boundary.
+# Workers run a CPU-only OpenCV detector and send back boxes, which are
+# projected onto the floor for the radar. Analysis runs at its own target
+# rate, independent of the display frame rate, and a frame is skipped
+# whenever every slot is still being analysed.
+# No Qt here: workers are started without re-importing the app's __main__,
+# so they load only this module, instrumentation, cv2 and numpy.
+
+import math
+import multiprocessing as mp
+import sys
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+from instrumentation import metrics
+
+# boxes: (x, y, w, h) as fractions of the frame; obstacles: (radar angle deg, distance cm) or None per box
+Detections = namedtuple("Detections", ["seq", "t", "boxes", "obstacles"])
+
+
+class ObstacleDetector:
+    """Edges and contours inside the floor region ahead of the robot.
+
+    The camera moves with the robot, so background subtraction would flag
+    the whole scene while driving. Edges of objects standing on a plain
+    floor survive that. The region of interest is the lower part of the
+    image, and boxes smaller than min_area (fraction of the ROI) are noise.
+    """
+
+    def __init__(self, roi_top=0.3, canny=(30, 90), min_area=0.003, max_boxes=8):
+        self.roi_top = roi_top
+        self.canny = canny
+        self.min_area = min_area
+        self.max_boxes = max_boxes
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+
+    def detect(self, frame):
+        """Boxes (x, y, w, h) in frame fractions, largest first"""
+        h, w = frame.shape[:2]
+        top = int(h * self.roi_top)
+        gray = cv2.cvtColor(frame[top:], cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        edges = cv2.Canny(gray, *self.canny)
+        edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, self.kernel)  # Join broken outlines
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        min_area = self.min_area * w * (h - top)
+        rects = [cv2.boundingRect(c) for c in contours]
+        rects = sorted((r for r in rects if r[2] * r[3] >= min_area), key=lambda r: r[2] * r[3], reverse=True)
+        return [(round(x / w, 3), round((y + top) / h, 3), round(bw / w, 3), round(bh / h, 3))
+                for x, y, bw, bh in rects[:self.max_boxes]]
+
+
+class CameraGeometry:
+    """Flat-floor pinhole model of the robot camera, for placing boxes on the radar.
+
+    A box's bottom edge is where the obstacle meets the floor. Its row gives
+    the angle below the horizon and so the distance. Its column gives the
+    bearing. Defaults describe the NeoBot's front camera (about 62° x 48°
+    field of view, 12 cm above the floor, tilted 10° down).
+    """
+
+    def __init__(self, hfov=62.0, vfov=48.0, height_cm=12.0, tilt_deg=10.0):
+        self.hfov = hfov
+        self.vfov = vfov
+        self.height_cm = height_cm
+        self.tilt_deg = tilt_deg
+
+    def project(self, box):
+        """(radar angle in degrees, 90 = straight ahead, distance in cm), or None above the horizon"""
+        x, y, w, h = box
+        below_horizon = self.tilt_deg + (y + h - 0.5) * self.vfov
+        if below_horizon <= 0.5:
+            return None
+        bearing = (x + w / 2 - 0.5) * self.hfov  # Positive to the right
+        distance = self.height_cm / math.tan(math.radians(below_horizon))
+        return 90.0 - bearing, distance
+
+
+def worker_main(buffer, shape, tasks, results, detector_options):
+    """Worker process: detects obstacles in the slots named by tasks until it gets None"""
+    cv2.setNumThreads(1)  # One process per core already
+    frames = np.frombuffer(buffer, np.uint8).reshape(shape)
+    detector = ObstacleDetector(**detector_options)
+    perf_counter = time.perf_counter
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        slot, seq, t = task
+        start = perf_counter()
+        boxes = detector.detect(frames[slot])
+        results.put((slot, seq, t, boxes, perf_counter() - start))
+
+
+@contextmanager
+def detached_main():
+    """Processes started inside do not re-import the parent's __main__.
+
+    spawn (and forkserver) children run the parent's main script again as
+    __mp_main__ before unpickling their target. From main.py that is PyQt5,
+    pyqtgraph and every panel, per worker. Without __file__ and __spec__ on
+    __main__ the child skips that step and imports only the target's module.
+    """
+    main = sys.modules["__main__"]
+    saved = {name: main.__dict__.pop(name) for name in ("__file__", "__spec__") if name in main.__dict__}
+    if "__spec__" in saved:
+        main.__spec__ = None  # Read with getattr(), which must still find it
+    try:
+        yield
+    finally:
+        main.__dict__.update(saved)
+
+
+class DetectorPool:
+    """Feeds camera frames to ObstacleDetector workers at up to rate_hz.
+
+    submit() is called on the capture thread. It skips the frame when the
+    target rate says it is too early or when no slot is free, i.e. every
+    worker is busy and has one more frame waiting. Otherwise it resizes the
+    frame into a free slot. A collector thread frees slots as results
+    arrive and passes each Detections to on_result(). Newer results always
+    win, so a slow worker's late answer is dropped.
+    """
+
+    def __init__(self, workers=2, size=(320, 240), rate_hz=10.0, on_result=None, geometry=None,
+                 detector_options=None):
+        self.workers = workers
+        self.size = size
+        self.interval = 1.0 / rate_hz
+        self.on_result = on_result
+        self.geometry = geometry or CameraGeometry()
+
+        # spawn: workers must not inherit the GUI's threads and locks (fork + Qt/OpenCV can deadlock)
+        ctx = mp.get_context("spawn")
+        w, h = size
+        slots = 2 * workers  # One being analysed and one queued per worker
+        shape = (slots, h, w, 3)
+        self.buffer = ctx.RawArray("B", slots * h * w * 3)
+        self.frames = np.frombuffer(self.buffer, np.uint8).reshape(shape)
+        self.tasks = ctx.Queue()
+        self.results = ctx.Queue()
+        self.processes = [
+            ctx.Process(target=worker_main, args=(self.buffer, shape, self.tasks, self.results, detector_options or {}),
+                        name=f"vision-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        with detached_main():  # worker_main only needs this module
+            for process in self.processes:
+                process.start()
+
+        self._lock = threading.Lock()
+        self._free = list(range(slots))
+        self.next_due = 0.0
+        self.seq = 0
+        self.last_seq = 0
+        self.latest = None
+
+        self.submitted = 0
+        self.analysed = 0
+        self.skipped_rate = 0  # Ahead of rate_hz
+        self.skipped_busy = 0  # Every slot in use
+        self.superseded = 0  # Finished after a newer frame
+        self.busy = 0.0  # Worker seconds spent detecting
+        self._util_mark = (time.monotonic(), 0.0)
+        self.latency = metrics.histogram("vision.latency")  # Submit to result, on this side
+        self.detect_time = metrics.histogram("vision.detect")  # Detector alone, in the worker
+
+        self._collector = threading.Thread(target=self._collect, name="vision-collector", daemon=True)
+        self._collector.start()
+
+    def submit(self, frame, t=None):
+        """Offers a BGR frame for analysis; returns False if it was skipped"""
+        now = time.monotonic()
+        if now < self.next_due:
+            self.skipped_rate += 1
+            return False
+        with self._lock:
+            slot = self._free.pop() if self._free else None
+        if slot is None:
+            self.skipped_busy += 1
+            return False
+        # Deadlines advance by the interval so the average rate holds, but never bunch up after a gap
+        self.next_due = max(self.next_due + self.interval, now)
+        cv2.resize(frame, self.size, dst=self.frames[slot], interpolation=cv2.INTER_AREA)
+        self.seq += 1
+        self.submitted += 1
+        self.tasks.put((slot, self.seq, time.time() if t is None else t))
+        return True
+
+    def _collect(self):
+        while True:
+            item = self.results.get()
+            if item is None:
+                break
+            slot, seq, t, boxes, seconds = item
+            with self._lock:
+                self._free.append(slot)
+            self.analysed += 1
+            self.busy += seconds
+            self.detect_time.record(seconds)
+            self.latency.record(time.time() - t)
+            if seq < self.last_seq:
+                self.superseded += 1
+                continue
+            self.last_seq = seq
+            detections = Detections(seq, t, boxes, [self.geometry.project(box) for box in boxes])
+            self.latest = detections
+            if self.on_result is not None:
+                self.on_result(detections)
+
+    def utilisation(self):
+        """Fraction of worker time spent detecting since the previous call"""
+        now = time.monotonic()
+        then, busy = self._util_mark
+        self._util_mark = (now, self.busy)
+        return (self.busy - busy) / ((now - then) * self.workers) if now > then else 0.0
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "submitted": self.submitted,
+            "analysed": self.analysed,
+            "skipped_rate": self.skipped_rate,
+            "skipped_busy": self.skipped_busy,
+            "superseded": self.superseded,
+            "latency": self.latency.summary(),
+            "detect": self.detect_time.summary(),
+        }
+
+    def stop(self, timeout=2.0):
+        if self._collector is None:
+            return
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.results.put(None)
+        self._collector.join(timeout)
+        self._collector = None